@@ -1,4 +1,6 @@
 from .cmd import *
 from .io import *
 
-__all__ = ['SACShell', 'SACLst', 'SACHeader', 'read', 'SACTrace']
+__all__ = ['SACShell', 'SACShellPool', 'SACLst', 'SACHeader',
+           'read', 'read_many', 'iter_traces', 'write', 'write_header', 'headers', 'SACTrace', 'SACCatalog', 'SACStream',
+           'TimeAxis', 'SACDataset']
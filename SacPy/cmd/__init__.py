@@ -1,2 +1,3 @@
 from .sac import SACShell
 from .saclst import SACLst
+from .pool import SACShellPool, SACBatchResult, SACBatchError
@@ -0,0 +1,197 @@
+import os
+import queue
+import threading
+import time
+from itertools import count
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from .sac import SACShell
+
+_SENTINEL = "__sacpy_batch_done__"
+
+
+class SACBatchError(Exception):
+    pass
+
+
+class SACBatchResult:
+    def __init__(self, commands: list, stdout: str, stderr: str, elapsed: float):
+        self.commands = commands
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.stderr.strip() == ''
+
+    def __str__(self):
+        return "{0} commands | {1:.3f} s | stderr: {2}".format(
+            len(self.commands), self.elapsed, self.stderr.strip() or 'none')
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class _SACSession(SACShell):
+    def __init__(self, cwd_folder: Union[str, Path] = None, *, show_log=False, timeout: Optional[float] = None):
+        super().__init__(cwd_folder, show_log=show_log, env=dict(os.environ, SACPY_SENTINEL=_SENTINEL))
+        self._timeout = timeout
+        self._counter = count()
+        self._stdout = queue.Queue()
+        self._stderr = queue.Queue()
+        # both pipes are drained all the time, so a chatty batch can never block sac on a full pipe
+        self._threads = [threading.Thread(target=self._drain, args=(self._sac.stdout, self._stdout), daemon=True),
+                         threading.Thread(target=self._drain, args=(self._sac.stderr, self._stderr), daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    @staticmethod
+    def _drain(pipe, lines: queue.Queue):
+        try:
+            for line in iter(pipe.readline, b''):
+                lines.put(line.decode(errors='replace'))
+        except ValueError:
+            pass
+        lines.put(None)
+
+    @staticmethod
+    def _collect(lines: queue.Queue) -> list:
+        collected = []
+        while True:
+            try:
+                line = lines.get_nowait()
+            except queue.Empty:
+                return collected
+            if line is not None:
+                collected.append(line)
+
+    @property
+    def alive(self) -> bool:
+        return self._sac.poll() is None
+
+    def run(self, commands: Iterable[str]) -> SACBatchResult:
+        commands = list(commands)
+        start = time.perf_counter()
+
+        # the sentinel is echoed by a child shell straight into the pipe, so it arrives even if sac
+        # keeps its own stdout buffered; the command text itself never contains the expanded token
+        n = next(self._counter)
+        token = "{0} {1} {0}".format(_SENTINEL, n)
+        try:
+            for cmd in commands:
+                self.cmd(cmd)
+            self.cmd("sc echo $SACPY_SENTINEL {0} $SACPY_SENTINEL".format(n))
+            self._sac.stdin.flush()
+        except BrokenPipeError:
+            raise SACBatchError("sac session exited before the batch was sent")
+
+        stdout = []
+        while True:
+            try:
+                line = self._stdout.get(timeout=self._timeout)
+            except queue.Empty:
+                raise SACBatchError("no end-of-batch sentinel after {0} s".format(self._timeout))
+            if line is None:
+                raise SACBatchError("sac session exited during the batch: {0}".format(
+                    ''.join(self._collect(self._stderr)).strip()))
+            if token in line:
+                stdout.append(line[:line.index(token)])
+                break
+            stdout.append(line)
+
+        stderr = self._collect(self._stderr)
+        return SACBatchResult(commands, ''.join(stdout), ''.join(stderr), time.perf_counter() - start)
+
+    def close(self) -> None:
+        if self.alive:
+            try:
+                self.q()
+                self._sac.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+            try:
+                self._sac.wait(timeout=10)
+            except Exception:
+                self._sac.kill()
+        for thread in self._threads:
+            thread.join(timeout=1)
+
+
+class SACShellPool:
+    def __init__(self, cwd_folder: Union[str, Path] = None, size: int = 4, *,
+                 show_log=False, timeout: Optional[float] = 600):
+        self._args = (cwd_folder, show_log, timeout)
+        self.size = size
+        self._sessions = queue.Queue()
+        self._lock = threading.Lock()
+        self._all = []
+        for _ in range(size):
+            self._sessions.put(self._new_session())
+        self.cwd_folder = self._all[0].cwd_folder
+
+    def _new_session(self) -> _SACSession:
+        cwd_folder, show_log, timeout = self._args
+        session = _SACSession(cwd_folder, show_log=show_log, timeout=timeout)
+        self._all.append(session)
+        return session
+
+    def run(self, commands: Iterable[str], check: bool = False) -> SACBatchResult:
+        session = self._sessions.get()
+        if session is None:
+            # the pool has no session left, the marker stays for every other waiting batch
+            self._sessions.put(None)
+            raise SACBatchError("no sac session left in the pool")
+        try:
+            result = session.run(commands)
+        except SACBatchError:
+            session.close()
+            self._all.remove(session)
+            session = self._replace()
+            raise
+        finally:
+            # a dead session never goes back, later batches would hang on it or write to nothing
+            if session is not None and session.alive:
+                self._sessions.put(session)
+            elif session is not None:
+                self._discard(session)
+
+        if check and not result.ok:
+            raise SACBatchError(result.stderr.strip())
+        return result
+
+    def _replace(self) -> Optional[_SACSession]:
+        try:
+            return self._new_session()
+        except Exception:
+            self._shrink()
+            return None
+
+    def _discard(self, session: _SACSession) -> None:
+        session.close()
+        if session in self._all:
+            self._all.remove(session)
+        self._shrink()
+
+    def _shrink(self) -> None:
+        with self._lock:
+            self.size -= 1
+            if self.size == 0:
+                self._sessions.put(None)
+
+    def map(self, batches: Iterable[Iterable[str]]) -> list:
+        with ThreadPoolExecutor(max_workers=max(1, self.size)) as executor:
+            return list(executor.map(self.run, batches))
+
+    def close(self) -> None:
+        for session in self._all:
+            session.close()
+        self._all = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -8,7 +8,7 @@ from SacPy.util.logging import get_logger
 
 
 class SACShell:
-    def __init__(self, cwd_folder: Union[str, Path] = None, *, show_log=False):
+    def __init__(self, cwd_folder: Union[str, Path] = None, *, show_log=False, env: dict = None):
         self.args = (cwd_folder, show_log)
         self._show_log = show_log
         self._log_dir = pathlib.Path(__name__).resolve().parent
@@ -23,7 +23,8 @@ class SACShell:
                                      stdout=subprocess.PIPE,
                                      stdin=subprocess.PIPE,
                                      stderr=subprocess.PIPE,
-                                     cwd=self.cwd_folder.as_posix())
+                                     cwd=self.cwd_folder.as_posix(),
+                                     env=env)
         self.sac_object = self._sac
 
     def __del__(self):
@@ -1,9 +1,11 @@
 import pathlib
-import subprocess
 from typing import Union
 from pathlib import Path
 
-from SacPy.io.header import SACHeader
+from numpy import float32
+
+from SacPy.io.core import read
+from SacPy.object import dict_
 
 
 class SACLst:
@@ -16,42 +18,42 @@ class SACLst:
         else:
             raise FileNotFoundError(sac_file.as_posix())
 
+        self._header = None
+
+    @staticmethod
+    def _value(value):
+        # saclst prints every value as text: numbers come back as float, -12345 as None;
+        # a float32 word goes through its shortest repr, so delta is 0.025 and not 0.02500000037
+        if isinstance(value, str):
+            return None if value == '-12345' else value
+        value = float(str(float32(value))) if isinstance(value, float) else float(value)
+        if value == -12345.0:
+            value = None
+        return value
+
+    @property
+    def header(self) -> dict:
+        if self._header is None:
+            self._header = read(self._sac_file, headonly=True).header
+        return self._header
+
     def get_header(self, *args: str):
         _header_dict = {}
-        keys = args
-        _args = " {}"*len(args)
-        _args = _args.format(*args)
-        cmd = "saclst{0} f {1}".format(_args, self._sac_file).split()
-        values = subprocess.check_output(cmd).decode().split()[1:]
-        for key in keys:
-            _index = keys.index(key)
-            value = values[_index]
-            try:
-                value = float(value)
-            except ValueError:
-                value = value
-            if value == -12345.0:
-                value = None
-            _header_dict[key] = value
+        for key in args:
+            value = self.header[key.lower()] if key.lower() in self.header else None
+            _header_dict[key] = None if value is None else self._value(value)
         values_list = [v for v in _header_dict.values()]
         if len(_header_dict.keys()) <= 1:
             return values_list[0]
         else:
             return values_list
 
-    def get_headers(self) -> SACHeader:
-        _header_dict = {}
-        cmd = "saclst all f {0}".format(self._sac_file).split()
-        values = subprocess.check_output(cmd).decode().strip().split('\n')[1:]
-        for item in values:
-            _item = item.strip().split('  ')
-            key = _item[1]
-            value = _item[-1].strip()
-            try:
-                value = float(value)
-            except ValueError:
-                value = value
-            if value != -12345.0:
+    def get_headers(self) -> dict_:
+        # plain values, as saclst prints them; a SACHeader would put them back into float32 and int32 words
+        _header_dict = dict_()
+        for key, value in self.header.items():
+            value = self._value(value)
+            if value is not None:
                 _header_dict[key] = value
 
-        return SACHeader(_header_dict)
+        return _header_dict
@@ -1,3 +1,7 @@
 from .header import SACHeader
-from .core import read
+from .core import read, read_many, iter_traces, write, write_header, headers
 from .trace import SACTrace
+from .axis import TimeAxis
+from .catalog import SACCatalog
+from .stream import SACStream
+from .dataset import SACDataset
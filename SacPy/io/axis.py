@@ -0,0 +1,73 @@
+from math import floor, isfinite
+
+from numpy import ndarray, arange, asarray, float64, issubdtype, inexact, result_type, subtract
+
+
+class TimeAxis:
+    # linspace(b, e, npts) without storing it: only the samples asked for are computed,
+    # with the same arithmetic so every value matches linspace exactly
+    def __init__(self, b, e, npts: int):
+        self.npts = int(npts)
+        dtype = result_type(b, e)
+        self.dtype = dtype if issubdtype(dtype, inexact) else float64
+        self._start = asarray(b, dtype=self.dtype)
+        self._stop = asarray(e, dtype=self.dtype)
+        self._delta = subtract(self._stop, self._start, dtype=self.dtype)
+        self._div = self.npts - 1
+
+    def __len__(self):
+        return self.npts
+
+    def _times(self, index: ndarray) -> ndarray:
+        y = index.astype(self.dtype)
+        if self._div > 0:
+            step = self._delta / self._div
+            if step == 0:
+                y = y / self._div * self._delta
+            else:
+                y = y * step
+        y += self._start
+        if self._div > 0:
+            y[index == self._div] = self._stop
+        return y
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self._times(arange(self.npts)[item])
+        index = asarray(item)
+        index = index + self.npts * (index < 0)
+        if ((index < 0) | (index >= self.npts)).any():
+            raise IndexError("index {0} out of range for {1} samples".format(item, self.npts))
+        times = self._times(index.reshape(-1))
+        return times[0] if index.ndim == 0 else times.reshape(index.shape)
+
+    def __array__(self, dtype=None, copy=None):
+        times = self._times(arange(self.npts))
+        return times if dtype is None else times.astype(dtype)
+
+    def _search(self, t, right: bool) -> int:
+        # first sample later than t (right) or not earlier than t, compared the way
+        # numpy.searchsorted compares them
+        if self.npts == 0:
+            return 0
+        t = asarray(t)
+        dtype = result_type(self.dtype, t.dtype)
+        t = t.astype(dtype)
+        step = float(self._delta) / self._div if self._div > 0 else 0.
+        guess = (float(t) - float(self._start)) / step if step != 0 else 0.
+        i = min(max(floor(guess) if isfinite(guess) else 0, 0), self.npts)
+
+        def before(k):
+            time = self[k].astype(dtype)
+            return time <= t if right else time < t
+
+        while i > 0 and not before(i - 1):
+            i -= 1
+        while i < self.npts and before(i):
+            i += 1
+        return i
+
+    def index(self, t0, t1) -> slice:
+        # the samples with t0 <= time <= t1, as a slice for basic (zero-copy) indexing
+        start = self._search(t0, right=False)
+        return slice(start, max(start, self._search(t1, right=True)))
@@ -0,0 +1,187 @@
+import hashlib
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Optional, Union
+
+from numpy import array, arange, argsort, empty, int64, isnan, load, ndarray, ones, savez, sort
+
+from SacPy.util.atomic import atomic_write
+from .core import get_header_column, get_sac_header_records
+from .layout import HEADER_DTYPE, is_public
+
+_ALIAS = {"network": "knetwk", "station": "kstnm", "location": "khole", "channel": "kcmpnm"}
+
+
+def get_query_mask(columns, size: int, **kwargs) -> ndarray:
+    # columns(key) -> header column; strings match fnmatch patterns, (low, high) is an inclusive range
+    mask = ones(size, dtype=bool)
+    for key, value in kwargs.items():
+        if value is None:
+            continue
+        column = columns(key)
+        if column.dtype == object:
+            mask &= array([v is not None and fnmatch(v, value) for v in column], dtype=bool)
+        elif isinstance(value, (tuple, list)):
+            low, high = value
+            mask &= (column >= low) & (column <= high)
+        else:
+            mask &= column == value
+    return mask
+
+
+class SACCatalog:
+    def __init__(self, sac_folder: Union[str, Path], pattern: str = "*.SAC", *,
+                 index_file: Optional[Union[str, Path]] = None, update: bool = True):
+        sac_folder = Path(sac_folder)
+        if not sac_folder.is_dir():
+            raise NotADirectoryError(sac_folder.as_posix())
+
+        self._sac_folder = sac_folder
+        self._pattern = pattern
+        if index_file is None:
+            # one index per pattern, a catalog of some of the files never replaces the one of all of them
+            suffix = "" if pattern == "*.SAC" else "-" + hashlib.sha1(pattern.encode('utf-8')).hexdigest()[:12]
+            index_file = sac_folder.joinpath(".sacpy-catalog{0}.npz".format(suffix))
+        self._index_file = Path(index_file)
+
+        self._names = array([], dtype=str)
+        self._size = empty(0, int64)
+        self._mtime = empty(0, int64)
+        self._records = empty(0, HEADER_DTYPE['<'])
+        self._columns = {}
+        self._sorted = {}
+
+        if self._index_file.exists():
+            self._load()
+        if update:
+            self.update()
+
+    def _load(self):
+        with load(self._index_file) as index:
+            if "pattern" in index.files and str(index["pattern"]) != self._pattern:
+                return
+            self._names = index["names"]
+            self._size = index["size"]
+            self._mtime = index["mtime"]
+            self._records = index["records"]
+
+    def save(self):
+        with atomic_write(self._index_file) as f:
+            savez(f, pattern=array(self._pattern), names=self._names, size=self._size, mtime=self._mtime,
+                  records=self._records)
+
+    def update(self) -> int:
+        names, size, mtime = [], [], []
+        with os.scandir(self._sac_folder) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith('.') and fnmatch(entry.name, self._pattern):
+                    stat = entry.stat()
+                    names.append(entry.name)
+                    size.append(stat.st_size)
+                    mtime.append(stat.st_mtime_ns)
+        order = sorted(range(len(names)), key=names.__getitem__)
+        names = array([names[i] for i in order], dtype=str)
+        size = array([size[i] for i in order], dtype=int64)
+        mtime = array([mtime[i] for i in order], dtype=int64)
+
+        known = {name: i for i, name in enumerate(self._names)}
+        records = empty(names.size, HEADER_DTYPE['<'])
+        stale = []
+        for i, name in enumerate(names):
+            j = known.get(name)
+            if j is not None and self._size[j] == size[i] and self._mtime[j] == mtime[i]:
+                records[i] = self._records[j]
+            else:
+                stale.append(i)
+
+        if stale:
+            records[stale] = get_sac_header_records([self._sac_folder.joinpath(names[i]) for i in stale])
+
+        changed = len(stale) > 0 or names.size != self._names.size
+        self._names, self._size, self._mtime, self._records = names, size, mtime, records
+        self._columns = {}
+        self._sorted = {}
+        if changed or not self._index_file.exists():
+            self.save()
+        return len(stale)
+
+    def __len__(self):
+        return self._names.size
+
+    @property
+    def names(self) -> ndarray:
+        return self._names
+
+    @property
+    def files(self) -> list:
+        return [self._sac_folder.joinpath(name) for name in self._names]
+
+    @property
+    def stat(self) -> tuple:
+        # size and mtime_ns of every file when its header was last read
+        return self._size, self._mtime
+
+    @property
+    def keys(self) -> list:
+        return [key for key in self._records.dtype.names if is_public(key)]
+
+    def __getitem__(self, key: str) -> ndarray:
+        key = _ALIAS.get(key, key).lower()
+        if key not in self._columns:
+            self._columns[key] = get_header_column(self._records, key)
+        return self._columns[key]
+
+    def table(self, keys: Optional[list] = None, index: Optional[ndarray] = None) -> dict:
+        if keys is None:
+            keys = self.keys
+        if index is None:
+            index = arange(len(self))
+        table = {"file": array([f.as_posix() for f in self.files], dtype=object)[index]}
+        for key in keys:
+            table[key] = self[key][index]
+        return table
+
+    def get(self, name: str, *keys: str):
+        i = self._names.searchsorted(name)
+        if i == self._names.size or self._names[i] != name:
+            raise KeyError(name)
+        values = []
+        for key in keys:
+            value = self[key][i]
+            if value is not None and not isinstance(value, str):
+                value = None if isnan(value) else float(value)
+            values.append(value)
+        if len(keys) == 1:
+            return values[0]
+        else:
+            return values
+
+    def _between(self, key: str, low, high) -> ndarray:
+        # rows with low <= key <= high in the order of the column sorted once (unset values last)
+        key = _ALIAS.get(key, key).lower()
+        if key not in self._sorted:
+            column = self[key]
+            order = argsort(column, kind='stable')
+            self._sorted[key] = column[order], order
+        values, order = self._sorted[key]
+        return order[values.searchsorted(low, 'left'):values.searchsorted(high, 'right')]
+
+    def between(self, key: str, low, high) -> ndarray:
+        return sort(self._between(key, low, high))
+
+    def query(self, name: Optional[str] = None, **kwargs) -> ndarray:
+        # the narrowest numeric range is found by binary search, the other conditions only look at its rows
+        ranges = [key for key, value in kwargs.items()
+                  if isinstance(value, (tuple, list)) and self[key].dtype != object]
+        if ranges:
+            index = sort(min((self._between(key, *kwargs[key]) for key in ranges), key=len))
+        else:
+            index = arange(len(self))
+        index = index[get_query_mask(lambda key: self[key][index], index.size, **kwargs)]
+        if name is not None:
+            index = index[array([fnmatch(n, name) for n in self._names[index]], dtype=bool)]
+        return index
+
+    def select(self, name: Optional[str] = None, **kwargs) -> list:
+        return [self._sac_folder.joinpath(n) for n in self._names[self.query(name, **kwargs)]]
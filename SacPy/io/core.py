@@ -1,101 +1,73 @@
+import os
+import glob
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import compress
 from pathlib import Path
-from typing import Optional
-from numpy import fromfile
+from typing import Iterable, Iterator, Optional, Union
+from numpy import array, ascontiguousarray, empty, float32, float64, frombuffer, fromfile, int32, int64, \
+    nan, ndarray, where
 
+from SacPy.util.atomic import atomic_write
+from .header import SACHeader
 from .trace import SACTrace
+from .layout import HEADER_SIZE, HEADER_DTYPE, HEADER_TEMPLATE, UNDEFINED, FLOAT_HEADERS, INT_HEADERS, \
+    STRING_HEADERS, is_public
 
 
 class SacFileError(Exception):
     pass
 
 
-def get_sac_header(f, int_type, float_type):
+_FLOAT_INDEX = array([i for i, key in enumerate(FLOAT_HEADERS) if is_public(key)])
+_FLOAT_KEYS = [FLOAT_HEADERS[i] for i in _FLOAT_INDEX]
+_INT_INDEX = array([i for i, key in enumerate(INT_HEADERS) if is_public(key)])
+_INT_KEYS = [INT_HEADERS[i] for i in _INT_INDEX]
+_STRING_KEYS = [key for key, _ in STRING_HEADERS]
+
+
+def decode_sac_header(buffer: bytes, byteorder: str) -> dict:
     header_dict = {}
-    f.seek(0, 0)
-    header_list = ['delta', 'depmin', 'depmax', 'scale', 'odelta', 'b', 'e', 'o', 'a',
-                   'fmt', 't', 'f', 'resp', 'stla', 'stlo', 'stel', 'stdp', 'evla',
-                   'evlo', 'evel', 'evdp', 'mag', 'user', 'dist', 'az', 'baz', 'gcarc',
-                   'internal2', 'internal3', 'depmen', 'cmpaz', 'cmpinc', 'xminimum',
-                   'xmaximum', 'yminimum', 'ymaximum', ]
-    for header in header_list:
-        if header in ['t', 'resp', 'user']:
-            value = fromfile(f, float_type, 10)
-            for i in range(0, 10):
-                h = "{0}{1}".format(header, i)
-                v = value[i]
-                if v != -12345.0:
-                    header_dict[h] = v
-        else:
-            value = fromfile(f, float_type, 1)[0]
-            if value != -12345.0 and not header.startswith('internal'):
-                header_dict[header] = value
-
-    f.seek(28, 1)
-    header_list = ['nzyear', 'nzjday', 'nzhour', 'nzmin', 'nzsec',
-                   'nzmsec', 'nvhdr', 'norid', 'nevid', 'npts', 'internal4',
-                   'nwfid', 'nxsize', 'nysize']
-    for header in header_list:
-        value = fromfile(f, int_type, 1)[0]
-        if value != -12345.0 and not header.startswith('internal'):
-            header_dict[header] = value
-
-    f.seek(4, 1)
-    header_list = ['iftype', 'idep', 'iztype']
-    for header in header_list:
-        value = fromfile(f, int_type, 1)[0]
-        if value != -12345.0:
-            header_dict[header] = value
-
-    f.seek(4, 1)
-    header_list = ['iinst', 'istreg', 'ievreg', 'ievtyp', 'iqual',
-                   'isynth', 'imagtyp', 'imagsrc']
-    for header in header_list:
-        value = fromfile(f, int_type, 1)[0]
-        if value != -12345.0:
-            header_dict[header] = value
-
-    f.seek(32, 1)
-    header_list = ['leven', 'lpspol', 'lovrok', 'lcalda']
-    for header in header_list:
-        value = fromfile(f, int_type, 1)[0]
-        if value != -12345.0:
-            header_dict[header] = value
-
-    f.seek(4, 1)
-    header_list = ['kstnm', 'kevnm', 'khole', 'ko', 'ka', 'kt',
-                   'kf', 'kuser', 'kcmpnm', 'knetwk', 'kdatrd', 'kinst']
-    for header in header_list:
-        if header == 'kevnm':
-            value = unpack(fromfile(f, 'c', 16), False)
-            if value != '-12345':
-                header_dict[header] = value
-        elif header == 'kt':
-            for i in range(0, 10):
-                header = "kt{0}".format(i)
-                value = unpack(fromfile(f, 'c', 8))
-                if value != '-12345':
-                    header_dict[header] = value
-        elif header == 'kuser':
-            for i in range(0, 3):
-                header = "kuser{0}".format(i)
-                value = unpack(fromfile(f, 'c', 8))
-                if value != '-12345':
-                    header_dict[header] = value
-        else:
-            value = unpack(fromfile(f, 'c', 8))
-            if value != '-12345':
-                header_dict[header] = value
+    floats = frombuffer(buffer, byteorder + 'f4', len(FLOAT_HEADERS))[_FLOAT_INDEX]
+    valid = floats != UNDEFINED
+    header_dict.update(zip(compress(_FLOAT_KEYS, valid), floats[valid]))
+
+    ints = frombuffer(buffer, byteorder + 'i4', len(INT_HEADERS), 4 * len(FLOAT_HEADERS))[_INT_INDEX]
+    valid = ints != UNDEFINED
+    header_dict.update(zip(compress(_INT_KEYS, valid), ints[valid]))
+
+    record = frombuffer(buffer, HEADER_DTYPE[byteorder], 1)[0]
+    for key in _STRING_KEYS:
+        value = record[key].decode('utf-8').strip()
+        if value != '-12345':
+            header_dict[key] = value
 
     return header_dict
 
 
-def unpack(chararray, strip=True):
-    _str = ''
-    for c in chararray:
-        _str += c.decode('utf-8')
-    if strip:
-        _str = _str.strip()
-    return _str.strip()
+def _encode_value(record, key: str, value) -> None:
+    if record.dtype[key].kind == 'S':
+        size = record.dtype[key].itemsize
+        record[key] = str(value).encode('utf-8')[:size].ljust(size)
+    else:
+        record[key] = value
+
+
+def encode_sac_header(header: dict, byteorder: str) -> bytes:
+    if isinstance(header, SACHeader):
+        # already the binary header, at most it changes byte order
+        return header.tobytes(byteorder)
+    record = HEADER_TEMPLATE[byteorder].copy()
+    for key, value in header.items():
+        if key not in record.dtype.names or value is None:
+            continue
+        _encode_value(record, key, value)
+    return record.tobytes()
+
+
+def get_sac_header(f, int_type, float_type):
+    f.seek(0, 0)
+    return decode_sac_header(f.read(HEADER_SIZE), float_type[0])
 
 
 def get_sac_waveform(f, float_type):
@@ -104,26 +76,184 @@ def get_sac_waveform(f, float_type):
     return data
 
 
-def read(file: Optional[Path]) -> SACTrace:
-    f = open(file, 'rb')
-
-    f.seek(316, 0)
-    npts = fromfile(f, '<i4', 1)[0]
-    f.seek(0, 2)
-    f_size = f.tell()
-    if f_size == 632 + 4 * npts:
-        float_type = '<f4'
-        int_type = '<i4'
-    elif f_size == 632 + 4 * npts.byteswap():
-        float_type = '>f4'
-        int_type = '>i4'
+def get_byteorder(buffer: bytes, f_size: int) -> str:
+    npts = frombuffer(buffer, '<i4', 1, 316)[0]
+    if f_size == HEADER_SIZE + 4 * int(npts):
+        return '<'
+    elif f_size == HEADER_SIZE + 4 * int(npts.byteswap()):
+        return '>'
     else:
         raise SacFileError("Number of points in header and length of trace inconsistent !")
 
-    header = get_sac_header(f, int_type, float_type)
-    data = get_sac_waveform(f, float_type)
-    trace = SACTrace(header, data)
+
+def get_sac_files(paths: Union[str, Path, Iterable]) -> list:
+    # a folder, a glob, a list of paths, or anything with .files such as a SACCatalog
+    paths = getattr(paths, 'files', paths)
+    if isinstance(paths, (str, Path)):
+        if os.path.isdir(paths):
+            paths = "{0}/*.SAC".format(paths)
+        return [Path(p) for p in sorted(glob.glob(str(paths)))]
+    return [Path(p) for p in paths]
+
+
+def get_sac_header_records(files: list) -> ndarray:
+    buffer = bytearray(HEADER_SIZE * len(files))
+    view = memoryview(buffer)
+    f_size = empty(len(files), int64)
+    for i, file in enumerate(files):
+        with open(file, 'rb') as f:
+            if f.readinto(view[i * HEADER_SIZE:(i + 1) * HEADER_SIZE]) != HEADER_SIZE:
+                raise SacFileError("{0}: file shorter than a SAC header".format(file))
+            f_size[i] = os.fstat(f.fileno()).st_size
+
+    records = frombuffer(buffer, HEADER_DTYPE['<'])
+    npts = frombuffer(buffer, '<i4').reshape(-1, HEADER_SIZE // 4)[:, 79]
+    little = f_size == HEADER_SIZE + 4 * npts.astype(int64)
+    # a size both byte orders explain (npts 0, or the same both ways) is read little-endian, as in read()
+    big = ~little & (f_size == HEADER_SIZE + 4 * npts.byteswap().astype(int64))
+    if not (little | big).all():
+        file = files[(~(little | big)).argmax()]
+        raise SacFileError("{0}: Number of points in header and length of trace inconsistent !".format(file))
+    if big.any():
+        records[big] = frombuffer(buffer, HEADER_DTYPE['>'])[big]
+    return records
+
+
+def get_header_column(records: ndarray, key: str) -> ndarray:
+    values = records[key]
+    if values.dtype.kind == 'S':
+        values = [v.decode('utf-8').strip() for v in values]
+        return array([None if v == '-12345' else v for v in values], dtype=object)
+    undefined = values == UNDEFINED
+    # float32 goes through its shortest repr so that e.g. delta compares equal to 0.025, as with saclst
+    values = values.astype(str).astype(float64) if values.dtype.kind == 'f' else values.astype(float64)
+    return where(undefined, nan, values)
+
+
+def headers(paths: Union[str, Path, Iterable], keys: Optional[Iterable] = None) -> dict:
+    files = get_sac_files(paths)
+    records = get_sac_header_records(files)
+    if keys is None:
+        keys = [key for key in records.dtype.names if is_public(key)]
+    table = {"file": array([f.as_posix() for f in files], dtype=object)}
+    for key in keys:
+        table[key] = get_header_column(records, key.lower())
+    return table
+
+
+def read(file: Optional[Path], *, headonly: bool = False, mmap: bool = False) -> SACTrace:
+    f = open(file, 'rb')
+
+    buffer = bytearray(HEADER_SIZE)
+    f.readinto(buffer)
+    byteorder = get_byteorder(buffer, os.fstat(f.fileno()).st_size)
+    float_type = byteorder + 'f4'
+
+    header = SACHeader.from_buffer(buffer, byteorder)
+    if headonly:
+        data = array([], dtype=float_type)
+    elif mmap:
+        data = None
+    else:
+        data = get_sac_waveform(f, float_type)
+    trace = SACTrace(None, data, file=file, byteorder=byteorder, headonly=headonly)
+    trace.header = header
 
     f.close()
 
     return trace
+
+
+def iter_traces(paths: Union[str, Path, Iterable], *, prefetch: int = 8, max_bytes: int = 256 * 2 ** 20,
+                workers: int = 4, headonly: bool = False, mmap: bool = False) -> Iterator[SACTrace]:
+    # yields in input order while a few threads read ahead, at most prefetch files and max_bytes
+    # in flight (always at least one file, however large)
+    files = deque(get_sac_files(paths))
+    pending = deque()
+    in_flight = 0
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        while files or pending:
+            while files and len(pending) < max(1, prefetch):
+                size = HEADER_SIZE if headonly or mmap else os.path.getsize(files[0])
+                if pending and in_flight + size > max_bytes:
+                    break
+                file = files.popleft()
+                pending.append((executor.submit(read, file, headonly=headonly, mmap=mmap), size))
+                in_flight += size
+            future, size = pending.popleft()
+            in_flight -= size
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def read_many(paths: Union[str, Path, Iterable], **kwargs) -> list:
+    return list(iter_traces(paths, **kwargs))
+
+
+def write(trace: SACTrace, file: Union[str, Path], byteorder: Optional[str] = None) -> None:
+    if byteorder is None:
+        byteorder = trace._byteorder or '<'
+    if byteorder not in ('<', '>'):
+        raise ValueError("byteorder must be '<' or '>', got {0!r}".format(byteorder))
+    if trace._headonly:
+        # writing the empty stand-in would replace the waveform on disk with npts = 0
+        raise ValueError("{0}: read with headonly=True, use write_header() or set data first".format(trace.id))
+
+    data = ascontiguousarray(trace.data, dtype=byteorder + 'f4')
+
+    # keep npts, e and the dependent-variable statistics in step with the data, as sac `w` does
+    header = trace.header
+    header['npts'] = int32(data.size)
+    if 'delta' in header and 'b' in header and data.size > 0:
+        # in single precision, as sac computes it
+        header['e'] = float32(header['b']) + (data.size - 1) * float32(header['delta'])
+    if data.size > 0:
+        header['depmin'] = float32(data.min())
+        header['depmax'] = float32(data.max())
+        header['depmen'] = float32(data.mean())
+
+    # swapped in whole, a memory-mapped source of the same path stays valid
+    with atomic_write(file) as f:
+        f.write(encode_sac_header(header, byteorder))
+        f.write(data.data)
+    header.clean()
+
+
+def write_header(trace: SACTrace, file: Optional[Union[str, Path]] = None) -> int:
+    # patch only the header words changed since the header was read, the data section is never touched
+    file = trace._file if file is None else file
+    header = trace.header
+    keys = [key for key in header.dirty if key in HEADER_TEMPLATE['<'].dtype.names]
+    if 'npts' in keys:
+        raise ValueError("npts changes the data section, use write() instead")
+    if len(keys) == 0:
+        return 0
+
+    fd = os.open(file, os.O_RDWR)
+    try:
+        byteorder = trace._byteorder
+        if byteorder is None:
+            byteorder = get_byteorder(os.pread(fd, HEADER_SIZE, 0), os.fstat(fd).st_size)
+        record = HEADER_TEMPLATE[byteorder].copy()
+        fields = record.dtype.fields
+        for key in keys:
+            if key in header and header[key] is not None:
+                _encode_value(record, key, header[key])
+        buffer = record.tobytes()
+
+        # adjacent words are written together, one pwrite per contiguous run
+        spans = sorted((fields[key][1], fields[key][1] + fields[key][0].itemsize) for key in keys)
+        runs = [list(spans[0])]
+        for start, end in spans[1:]:
+            if start == runs[-1][1]:
+                runs[-1][1] = end
+            else:
+                runs.append([start, end])
+        for start, end in runs:
+            os.pwrite(fd, buffer[start:end], start)
+    finally:
+        os.close(fd)
+    header.clean()
+    return len(runs)
@@ -0,0 +1,229 @@
+import json
+import lzma
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from numpy import ndarray, arange, array, ascontiguousarray, concatenate, cumsum, dtype, float32, frombuffer, \
+    int64, memmap, uint8, zeros
+
+from SacPy.util.atomic import atomic_write
+from .catalog import get_query_mask
+from .core import SacFileError, get_header_column, get_sac_files, get_sac_header_records, iter_traces
+from .header import SACHeader
+from .layout import HEADER_DTYPE, HEADER_SIZE, is_public
+from .stream import SACStream
+from .trace import SACTrace, get_id
+
+# file layout: the preamble (magic, offset and length of the table of contents), the waveform block,
+# then the header records, names, byte orders and offsets, each aligned so it can be mapped in place,
+# and the table of contents as json at the end
+MAGIC = b"SACPYDS\x00"
+VERSION = 1
+_PREAMBLE = len(MAGIC) + 16
+_ALIGN = 64
+
+_CODECS = {"zlib": (zlib.compress, zlib.decompress), "lzma": (lzma.compress, lzma.decompress)}
+
+
+def _compress(compression: str, buffer: bytes, level: Optional[int]) -> bytes:
+    compress, _ = _CODECS[compression]
+    if level is None:
+        return compress(buffer)
+    if compression == 'lzma':
+        return compress(buffer, preset=level)
+    return compress(buffer, level)
+
+
+def _write_array(f, toc: dict, name: str, values: ndarray) -> None:
+    f.write(bytes(-f.tell() % _ALIGN))
+    toc[name] = [f.tell(), values.dtype.str, values.shape[0]]
+    f.write(ascontiguousarray(values).data)
+
+
+class SACDataset:
+    def __init__(self, file: Union[str, Path]):
+        # the whole file is mapped, headers and uncompressed waveforms are views of it
+        self._file = Path(file)
+        self._buffer = memmap(self._file, dtype=uint8, mode='r')
+        if self._buffer.size < _PREAMBLE or self._buffer[:len(MAGIC)].tobytes() != MAGIC:
+            raise SacFileError("{0}: not a SacPy dataset".format(self._file))
+        offset, size = frombuffer(self._buffer[len(MAGIC):_PREAMBLE].tobytes(), '<i8')
+        toc = json.loads(self._buffer[offset:offset + size].tobytes().decode('utf-8'))
+        if toc["version"] > VERSION:
+            raise SacFileError("{0}: dataset version {1} is newer than {2}".format(self._file, toc["version"],
+                                                                                    VERSION))
+
+        self._toc = toc
+        self._compression = toc["compression"]
+        self._records = self._array("records").view(HEADER_DTYPE['<'])
+        self._names = self._array("names")
+        self._byteorder = self._array("byteorder")
+        self._offsets = self._array("offsets")
+        if self._compression is None:
+            self._data = self._array("data")
+        else:
+            self._chunks = self._array("chunks")
+            self._chunk_traces = self._array("chunk_traces")
+        self._chunk = None
+        self._lookup = None
+        self._ids = None
+
+    def _array(self, name: str) -> ndarray:
+        offset, dtype_, size = self._toc["arrays"][name]
+        dtype_ = dtype(dtype_)
+        return self._buffer[offset:offset + size * dtype_.itemsize].view(dtype_)
+
+    @classmethod
+    def pack(cls, paths: Union[str, Path, Iterable], file: Union[str, Path], *,
+             compression: Optional[str] = None, level: Optional[int] = None, chunk_size: int = 4 * 2 ** 20):
+        # SAC files into one dataset; compressed, the waveforms go in chunks of whole traces
+        # of about chunk_size bytes each, so one trace never costs more than its chunk to read
+        if compression is not None and compression not in _CODECS:
+            raise ValueError("compression must be one of {0}, got {1!r}".format(list(_CODECS), compression))
+        files = get_sac_files(paths)
+        records = get_sac_header_records(files)
+        offsets = concatenate(([0], cumsum(records['npts'], dtype=int64)))
+        byteorder = zeros(len(files), dtype='S1')
+
+        file = Path(file)
+        with atomic_write(file) as f:
+            f.write(bytes(_PREAMBLE))
+            f.write(bytes(-f.tell() % _ALIGN))
+            arrays = {}
+            start = f.tell()
+            chunks, chunk_traces, pending, pending_size = [start], [0], [], 0
+            for i, tr in enumerate(iter_traces(files, mmap=True)):
+                byteorder[i] = tr._byteorder.encode()
+                values = ascontiguousarray(tr.data, dtype='<f4').tobytes()
+                if compression is None:
+                    f.write(values)
+                    continue
+                pending.append(values)
+                pending_size += len(values)
+                if pending_size >= chunk_size or i == len(files) - 1:
+                    f.write(_compress(compression, b''.join(pending), level))
+                    chunks.append(f.tell())
+                    chunk_traces.append(i + 1)
+                    pending, pending_size = [], 0
+            if compression is None:
+                arrays["data"] = [start, '<f4', int(offsets[-1])]
+            else:
+                _write_array(f, arrays, "chunks", array(chunks, dtype='<i8'))
+                _write_array(f, arrays, "chunk_traces", array(chunk_traces, dtype='<i8'))
+
+            _write_array(f, arrays, "records", records.view('V{0}'.format(HEADER_SIZE)))
+            _write_array(f, arrays, "names", array([p.name for p in files], dtype=str))
+            _write_array(f, arrays, "byteorder", byteorder)
+            _write_array(f, arrays, "offsets", offsets.astype('<i8'))
+
+            toc = json.dumps({"version": VERSION, "count": len(files), "compression": compression,
+                              "arrays": arrays}).encode('utf-8')
+            offset = f.tell()
+            f.write(toc)
+            f.seek(0)
+            f.write(MAGIC + array([offset, len(toc)], dtype='<i8').tobytes())
+        return cls(file)
+
+    def __len__(self):
+        return self._names.size
+
+    @property
+    def file(self) -> Path:
+        return self._file
+
+    @property
+    def compression(self) -> Optional[str]:
+        return self._compression
+
+    @property
+    def names(self) -> ndarray:
+        return self._names
+
+    @property
+    def records(self) -> ndarray:
+        return self._records
+
+    @property
+    def npts(self) -> ndarray:
+        return self._records['npts'].astype(int64)
+
+    @property
+    def keys(self) -> list:
+        return [key for key in self._records.dtype.names if is_public(key)]
+
+    def __getitem__(self, key: str) -> ndarray:
+        return get_header_column(self._records, key.lower())
+
+    @property
+    def ids(self) -> list:
+        return [get_id(*values) for values in zip(self['knetwk'], self['kstnm'], self['khole'], self['kcmpnm'])]
+
+    def index(self, key: Union[int, str]) -> int:
+        # a row, a file name or a trace id (the first trace with it)
+        if not isinstance(key, str):
+            return int(arange(len(self))[key])
+        if self._lookup is None:
+            self._lookup = {name: i for i, name in enumerate(self._names.tolist())}
+        if key not in self._lookup and self._ids is None:
+            # trace ids need the string headers decoded, only done once a key is not a file name
+            self._ids = {}
+            for i, id_ in enumerate(self.ids):
+                self._ids.setdefault(id_, i)
+        i = self._lookup.get(key, None if self._ids is None else self._ids.get(key))
+        if i is None:
+            raise KeyError(key)
+        return i
+
+    def _get_chunk(self, c: int) -> ndarray:
+        # the last chunk stays decompressed, neighbouring traces usually share it
+        if self._chunk is None or self._chunk[0] != c:
+            _, decompress = _CODECS[self._compression]
+            buffer = decompress(self._buffer[self._chunks[c]:self._chunks[c + 1]].tobytes())
+            self._chunk = c, frombuffer(buffer, '<f4')
+        return self._chunk[1]
+
+    def get_data(self, i: int) -> ndarray:
+        start, stop = self._offsets[i], self._offsets[i + 1]
+        if self._compression is None:
+            return self._data[start:stop]
+        c = int(self._chunk_traces.searchsorted(i, 'right')) - 1
+        first = self._offsets[self._chunk_traces[c]]
+        return self._get_chunk(c)[start - first:stop - first]
+
+    def trace(self, key: Union[int, str]) -> SACTrace:
+        i = self.index(key)
+        return SACTrace(SACHeader(self._records[i]), self.get_data(i), byteorder=self._byteorder[i].decode())
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.trace(i)
+
+    def query(self, **kwargs) -> ndarray:
+        return get_query_mask(self.__getitem__, len(self), **kwargs).nonzero()[0]
+
+    def stream(self, index: Optional[ndarray] = None) -> SACStream:
+        # every trace, or the rows in index, as one SACStream; the rows are filled in file order,
+        # so the block is read front to back and each compressed chunk is inflated once
+        index = arange(len(self)) if index is None else arange(len(self))[index]
+        records = self._records[index].copy()
+        data = zeros((index.size, records['npts'].max(initial=0)), dtype=float32)
+        for row in index.argsort(kind='stable'):
+            data[row, :records['npts'][row]] = self.get_data(index[row])
+        return SACStream(data, records)
+
+    def select(self, **kwargs) -> SACStream:
+        return self.stream(self.query(**kwargs))
+
+    def unpack(self, sac_folder: Union[str, Path], index: Optional[ndarray] = None) -> list:
+        # the SAC files back, byte for byte: each in its own byte order under its own name
+        sac_folder = Path(sac_folder)
+        files = []
+        for i in (arange(len(self)) if index is None else arange(len(self))[index]):
+            byteorder = self._byteorder[i].decode()
+            file = sac_folder.joinpath(self._names[i])
+            with open(file, 'wb') as f:
+                f.write(self._records[i:i + 1].astype(HEADER_DTYPE[byteorder]).tobytes())
+                f.write(ascontiguousarray(self.get_data(i), dtype=byteorder + 'f4').data)
+            files.append(file)
+        return files
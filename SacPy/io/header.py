@@ -1,10 +1,189 @@
+import sys
+from collections.abc import MutableMapping
 from datetime import datetime, timedelta
+
+from numpy import frombuffer, void
+
 from SacPy.object import dict_
+from .layout import FLOAT_HEADERS, HEADER_DTYPE, HEADER_TEMPLATE, INT_HEADERS, UNDEFINED, is_public
+
+_NATIVE = '<' if sys.byteorder == 'little' else '>'
+_WORDS = len(FLOAT_HEADERS) + len(INT_HEADERS)
+_UNDEFINED = float(UNDEFINED)
+_FIELDS = frozenset(HEADER_DTYPE['<'].names)
+_KEYS = tuple(key for key in HEADER_DTYPE['<'].names if is_public(key))
+
+
+def _float_field(index: int) -> property:
+    def getter(self):
+        value = self._floats[index]
+        return None if value == _UNDEFINED else value
+
+    def setter(self, value):
+        self._floats[index] = UNDEFINED if value is None else float(value)
+
+    return property(getter, setter)
+
+
+def _int_field(index: int) -> property:
+    def getter(self):
+        value = self._ints[index]
+        return None if value == UNDEFINED else value
+
+    def setter(self, value):
+        self._ints[index] = UNDEFINED if value is None else int(value)
+
+    return property(getter, setter)
+
+
+def _swap(buffer: bytearray) -> bytearray:
+    # the float and int words from one byte order to the other, in place; the strings have none
+    frombuffer(buffer, 'u4', _WORDS).byteswap(inplace=True)
+    return buffer
+
+
+def _string_field(offset: int, size: int) -> property:
+    def getter(self):
+        value = self._buffer[offset:offset + size].rstrip(b'\x00').decode('utf-8').strip()
+        return None if value == '-12345' else value
+
+    def setter(self, value):
+        value = b'-12345' if value is None else str(value).encode('utf-8')
+        self._buffer[offset:offset + size] = value[:size].ljust(size)
+
+    return property(getter, setter)
+
+
+class SACHeader(MutableMapping):
+    # the 632-byte binary header itself, every sac field is a property reading it in place
+    # through the word views; keys outside the sac layout go to _extra. the words are kept in native
+    # byte order whatever the file's (_byteorder), so the views are memoryviews giving python floats and ints
+    __slots__ = ('_buffer', '_byteorder', '_floats', '_ints', '_extra', '_dirty')
+
+    def __init__(self, header_dict=None, *, byteorder: str = '<'):
+        if isinstance(header_dict, SACHeader):
+            buffer, byteorder = bytearray(header_dict._buffer), header_dict._byteorder
+        elif isinstance(header_dict, void):
+            byteorder = '>' if header_dict.dtype['delta'].byteorder == '>' else '<'
+            buffer = bytearray(header_dict.tobytes())
+            if byteorder != _NATIVE:
+                _swap(buffer)
+        else:
+            buffer = bytearray(HEADER_TEMPLATE[_NATIVE].tobytes())
+        self._attach(buffer, byteorder)
+
+        if isinstance(header_dict, SACHeader):
+            self._extra.update(header_dict._extra)
+        elif header_dict is not None and not isinstance(header_dict, void):
+            for key, value in header_dict.items():
+                self._set(key, value)
+
+    def _attach(self, buffer: bytearray, byteorder: str) -> None:
+        set_slot = object.__setattr__
+        set_slot(self, '_buffer', buffer)
+        set_slot(self, '_byteorder', byteorder)
+        set_slot(self, '_floats', memoryview(buffer).cast('f'))
+        set_slot(self, '_ints', memoryview(buffer).cast('i'))
+        set_slot(self, '_extra', {})
+        # keys changed since the header was read or last written, see SACTrace.write_header
+        set_slot(self, '_dirty', set())
+
+    @classmethod
+    def from_buffer(cls, buffer: bytearray, byteorder: str):
+        # no copy: the header is a view of the buffer it was read into, swapped to native byte order
+        header = cls.__new__(cls)
+        header._attach(buffer if byteorder == _NATIVE else _swap(buffer), byteorder)
+        return header
+
+    @property
+    def record(self) -> void:
+        # a view of the header, in native byte order
+        return frombuffer(self._buffer, HEADER_DTYPE[_NATIVE], 1)[0]
 
+    @property
+    def byteorder(self) -> str:
+        return self._byteorder
+
+    def tobytes(self, byteorder: str) -> bytes:
+        buffer = bytearray(self._buffer)
+        return bytes(buffer if byteorder == _NATIVE else _swap(buffer))
+
+    def _get(self, key):
+        getter = _GETTERS.get(key)
+        return self._extra.get(key) if getter is None else getter(self)
+
+    def _set(self, key, value) -> None:
+        if key in _FIELDS:
+            object.__setattr__(self, key, value)
+        else:
+            self._extra[key] = value
+
+    def __getattr__(self, item):
+        # only reached for names that are neither sac fields nor methods
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return self._extra.get(item)
+
+    def __setattr__(self, key, value):
+        self.__setitem__(key, value)
+
+    def __getitem__(self, key):
+        value = self._get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._set(key, value)
+        self._dirty.add(key)
+
+    def __delitem__(self, key):
+        if self._get(key) is None:
+            raise KeyError(key)
+        if key in self._extra:
+            del self._extra[key]
+        else:
+            self._set(key, None)
+        self._dirty.add(key)
+
+    def __contains__(self, key):
+        return self._get(key) is not None
+
+    def __iter__(self):
+        for key in _KEYS:
+            if getattr(self, key) is not None:
+                yield key
+        yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        # the record itself in its byte order, with the extra keys and what is still to be written
+        return _unpickle, (self.tobytes(self._byteorder), self._byteorder, self._extra, self._dirty)
 
-class SACHeader(dict_):
-    def __init__(self, header_dict=None):
-        super().__init__(header_dict)
+    def __repr__(self):
+        return repr(dict(self))
+
+    def copy(self):
+        return SACHeader(self)
+
+    @property
+    def dict(self) -> dict:
+        return dict(self)
+
+    def get(self, *args):
+        if len(args) == 1:
+            return self.__getitem__(args[0])
+        else:
+            return list(map(self.__getitem__, args))
+
+    @property
+    def dirty(self) -> set:
+        return set(self._dirty)
+
+    def clean(self) -> None:
+        self._dirty.clear()
 
     @property
     def time(self):
@@ -25,3 +204,21 @@ class SACHeader(dict_):
                 ktn = self.get(kt)
                 values_dict[ktn] = tn
         return values_dict
+
+
+def _unpickle(buffer: bytes, byteorder: str, extra: dict, dirty: set) -> SACHeader:
+    header = SACHeader.from_buffer(bytearray(buffer), byteorder)
+    header._extra.update(extra)
+    header._dirty.update(dirty)
+    return header
+
+
+for _key, (_dtype, _offset) in HEADER_DTYPE['<'].fields.items():
+    if _dtype.kind == 'f':
+        setattr(SACHeader, _key, _float_field(_offset // 4))
+    elif _dtype.kind == 'i':
+        setattr(SACHeader, _key, _int_field(_offset // 4))
+    else:
+        setattr(SACHeader, _key, _string_field(_offset, _dtype.itemsize))
+
+_GETTERS = {key: getattr(SACHeader, key).fget for key in _FIELDS}
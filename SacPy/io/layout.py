@@ -0,0 +1,55 @@
+from numpy import dtype, zeros
+
+HEADER_SIZE = 632
+UNDEFINED = -12345
+
+
+def _expand(name: str, n: int, start: int = 0) -> tuple:
+    return tuple("{0}{1}".format(name, i) for i in range(start, start + n))
+
+
+FLOAT_HEADERS = ('delta', 'depmin', 'depmax', 'scale', 'odelta', 'b', 'e', 'o', 'a', 'fmt') + \
+                _expand('t', 10) + ('f',) + _expand('resp', 10) + \
+                ('stla', 'stlo', 'stel', 'stdp', 'evla', 'evlo', 'evel', 'evdp', 'mag') + \
+                _expand('user', 10) + \
+                ('dist', 'az', 'baz', 'gcarc', 'internal2', 'internal3', 'depmen', 'cmpaz', 'cmpinc',
+                 'xminimum', 'xmaximum', 'yminimum', 'ymaximum') + \
+                _expand('unused', 7)
+
+INT_HEADERS = ('nzyear', 'nzjday', 'nzhour', 'nzmin', 'nzsec', 'nzmsec', 'nvhdr', 'norid', 'nevid',
+               'npts', 'internal4', 'nwfid', 'nxsize', 'nysize', 'unused7',
+               'iftype', 'idep', 'iztype', 'unused8',
+               'iinst', 'istreg', 'ievreg', 'ievtyp', 'iqual', 'isynth', 'imagtyp', 'imagsrc') + \
+              _expand('unused', 8, 9) + \
+              ('leven', 'lpspol', 'lovrok', 'lcalda', 'unused17')
+
+STRING_HEADERS = (('kstnm', 8), ('kevnm', 16), ('khole', 8), ('ko', 8), ('ka', 8)) + \
+                 tuple((k, 8) for k in _expand('kt', 10)) + (('kf', 8),) + \
+                 tuple((k, 8) for k in _expand('kuser', 3)) + \
+                 (('kcmpnm', 8), ('knetwk', 8), ('kdatrd', 8), ('kinst', 8))
+
+
+def is_public(key: str) -> bool:
+    return not (key.startswith('internal') or key.startswith('unused'))
+
+
+def header_dtype(byteorder: str) -> dtype:
+    fields = [(key, byteorder + 'f4') for key in FLOAT_HEADERS]
+    fields += [(key, byteorder + 'i4') for key in INT_HEADERS]
+    fields += [(key, 'S{0}'.format(size)) for key, size in STRING_HEADERS]
+    return dtype(fields)
+
+
+HEADER_DTYPE = {'<': header_dtype('<'), '>': header_dtype('>')}
+
+
+def header_template(byteorder: str):
+    record = zeros(1, HEADER_DTYPE[byteorder])[0]
+    for key in FLOAT_HEADERS + INT_HEADERS:
+        record[key] = UNDEFINED
+    for key, size in STRING_HEADERS:
+        record[key] = b'-12345'.ljust(size)
+    return record
+
+
+HEADER_TEMPLATE = {'<': header_template('<'), '>': header_template('>')}
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from numpy import float32, int32
+
+from SacPy.util.geodetics import distaz
+
+from .header import SACHeader
+
+TIME_HEADERS = ('b', 'e', 'o', 'a') + tuple("t{0}".format(i) for i in range(10)) + ('f',)
+
+
+def get_reference_time(header: SACHeader) -> datetime:
+    return datetime(int(header.nzyear), 1, 1) + timedelta(
+        days=int(header.nzjday) - 1, hours=int(header.nzhour), minutes=int(header.nzmin),
+        seconds=int(header.nzsec), milliseconds=int(header.nzmsec))
+
+
+def set_reference_time(header: SACHeader, time: datetime) -> None:
+    # the reference time only holds milliseconds
+    time = time + timedelta(microseconds=500)
+    time = time.replace(microsecond=time.microsecond // 1000 * 1000)
+    header['nzyear'] = int32(time.year)
+    header['nzjday'] = int32(time.timetuple().tm_yday)
+    header['nzhour'] = int32(time.hour)
+    header['nzmin'] = int32(time.minute)
+    header['nzsec'] = int32(time.second)
+    header['nzmsec'] = int32(time.microsecond // 1000)
+
+
+def change_allt(header: SACHeader, seconds: float) -> None:
+    # sac `ch allt v`: every defined time moves by v and the reference time by -v,
+    # so absolute times are unchanged
+    for key in TIME_HEADERS:
+        if key in header and header[key] is not None:
+            header[key] = float32(float(header[key]) + seconds)
+    set_reference_time(header, get_reference_time(header) - timedelta(seconds=seconds))
+
+
+def synchronize(headers: list, reference: datetime = None) -> None:
+    # sac `synchronize`: every header gets the latest reference time unless one is given
+    if reference is None:
+        reference = max(get_reference_time(header) for header in headers)
+    for header in headers:
+        change_allt(header, (get_reference_time(header) - reference).total_seconds())
+
+
+def set_event(header: SACHeader, time: datetime, latitude: float, longitude: float, depth: float) -> None:
+    # ch o gmt ...; ch allt (0 - &1,o&) iztype IO; ch evlo .. evla .. evdp ..
+    o = (time - get_reference_time(header)) / timedelta(seconds=1)
+    header['o'] = float32(o)
+    change_allt(header, -o)
+    header['o'] = float32(0)
+    header['iztype'] = int32(11)
+
+    header['evlo'] = float32(longitude)
+    header['evla'] = float32(latitude)
+    header['evdp'] = float32(depth)
+    if header.lcalda != 0 and header.stla is not None and header.stlo is not None:
+        dist, az, baz, gcarc = distaz(float(header.stla), float(header.stlo), latitude, longitude)
+        header['dist'], header['az'] = float32(dist), float32(az)
+        header['baz'], header['gcarc'] = float32(baz), float32(gcarc)
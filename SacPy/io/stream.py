@@ -0,0 +1,151 @@
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from numpy import ndarray, arange, array, asarray, clip, float32, float64, frombuffer, int32, int64, isnan, \
+    maximum, take_along_axis, unique, where, zeros
+
+from .catalog import get_query_mask
+from .core import encode_sac_header, get_header_column, get_sac_files, \
+    get_sac_header_records, iter_traces
+from .header import SACHeader
+from .layout import HEADER_DTYPE, UNDEFINED, is_public
+from .trace import SACTrace, get_id
+from ..signal.process import get_taper
+
+
+class SACStream:
+    def __init__(self, data: ndarray, records: ndarray):
+        # data: (traces, width) float32, each row zero-padded after its npts samples;
+        # records: little-endian header records, one per row, read column by column
+        self._data = data
+        self._records = records
+
+    @classmethod
+    def from_traces(cls, traces: Iterable[SACTrace]):
+        traces = list(traces)
+        records = frombuffer(b''.join(encode_sac_header(tr.header, '<') for tr in traces), HEADER_DTYPE['<']).copy()
+        npts = array([tr.data.size for tr in traces], dtype=int32)
+        records['npts'] = npts
+        data = zeros((len(traces), npts.max(initial=0)), dtype=float32)
+        for row, tr in zip(data, traces):
+            row[:tr.data.size] = tr.data
+        return cls(data, records)
+
+    @classmethod
+    def read(cls, paths: Union[str, Path, Iterable], **kwargs):
+        # headers first to size the buffer, then every waveform straight into its row
+        files = get_sac_files(paths)
+        records = get_sac_header_records(files).copy()
+        data = zeros((len(files), records['npts'].max(initial=0)), dtype=float32)
+        for row, tr in zip(data, iter_traces(files, mmap=True, **kwargs)):
+            row[:tr.data.size] = tr.data
+        return cls(data, records)
+
+    def __len__(self):
+        return self._data.shape[0]
+
+    @property
+    def data(self) -> ndarray:
+        return self._data
+
+    @property
+    def records(self) -> ndarray:
+        return self._records
+
+    @property
+    def npts(self) -> ndarray:
+        return self._records['npts'].astype(int64)
+
+    @property
+    def keys(self) -> list:
+        return [key for key in self._records.dtype.names if is_public(key)]
+
+    def __getitem__(self, key: str) -> ndarray:
+        return get_header_column(self._records, key.lower())
+
+    def __setitem__(self, key: str, values) -> None:
+        key = key.lower()
+        if self._records.dtype[key].kind == 'S':
+            size = self._records.dtype[key].itemsize
+            self._records[key] = [(b'-12345' if v is None else str(v).encode('utf-8'))[:size].ljust(size)
+                                  for v in values]
+        else:
+            values = asarray(values, dtype=float64)
+            self._records[key] = where(isnan(values), UNDEFINED, values)
+
+    @property
+    def ids(self) -> list:
+        return [get_id(*values) for values in zip(self['knetwk'], self['kstnm'], self['khole'], self['kcmpnm'])]
+
+    def trace(self, i: int) -> SACTrace:
+        return SACTrace(SACHeader(self._records[i]), self._data[i, :self._records['npts'][i]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.trace(i)
+
+    def traces(self) -> list:
+        return list(self)
+
+    def _mask(self) -> ndarray:
+        return arange(self._data.shape[1]) < self.npts[:, None]
+
+    def _set_data(self, data: ndarray) -> None:
+        # padding stays zero whatever the operation did to it
+        self._data[:] = where(self._mask(), data, 0.)
+
+    def demean(self):
+        npts = maximum(self.npts, 1)
+        self._set_data(self._data - self._data.sum(axis=1, dtype=float64)[:, None] / npts[:, None])
+        return self
+
+    def detrend(self):
+        # least-squares line over each row's own npts samples, in closed form
+        n = self.npts.astype(float64)
+        sx = n * (n - 1) / 2
+        sxx = (n - 1) * n * (2 * n - 1) / 6
+        sy = self._data.sum(axis=1, dtype=float64)
+        sxy = self._data.astype(float64) @ arange(self._data.shape[1], dtype=float64)
+        denominator = n * sxx - sx * sx
+        slope = where(denominator > 0, (n * sxy - sx * sy) / where(denominator > 0, denominator, 1.), 0.)
+        intercept = where(n > 0, (sy - slope * sx) / maximum(n, 1.), 0.)
+        self._set_data(self._data - (intercept[:, None] + slope[:, None] * arange(self._data.shape[1])))
+        return self
+
+    def taper(self, width: float = 0.05, type_: str = 'hanning'):
+        npts = self.npts
+        for n in unique(npts):
+            rows = (npts == n).nonzero()[0]
+            self._data[rows, :n] *= get_taper(int(n), width, type_).astype(float32)
+        return self
+
+    def normalize(self):
+        peak = abs(self._data).max(axis=1, initial=0.)
+        self._data /= where(peak > 0, peak, 1.)[:, None]
+        return self
+
+    def slice(self, begin: float, end: float, reference: Optional[str] = None):
+        # window [begin, end] in seconds after each row's reference marker (b's zero by default);
+        # rows are clipped to their data, the result is a new stream
+        delta = self['delta']
+        b = self['b'] - (0. if reference is None else self[reference])
+        npts = self.npts
+        start = clip(((begin - b) / delta + 0.5).astype(int64), 0, npts)
+        stop = clip(((end - b) / delta + 0.5).astype(int64) + 1, 0, npts)
+        size = maximum(stop - start, 0)
+
+        width = int(size.max(initial=0))
+        index = clip(start[:, None] + arange(width), 0, max(self._data.shape[1] - 1, 0))
+        data = zeros((len(self), width), dtype=float32)
+        if self._data.shape[1] > 0:
+            data[:] = where(arange(width) < size[:, None], take_along_axis(self._data, index, axis=1), 0.)
+
+        stream = SACStream(data, self._records.copy())
+        stream['b'] = self['b'] + start * delta
+        stream['e'] = stream['b'] + (size - 1) * delta
+        stream._records['npts'] = size
+        return stream
+
+    def select(self, **kwargs):
+        index = get_query_mask(self.__getitem__, len(self), **kwargs).nonzero()[0]
+        return SACStream(self._data[index], self._records[index])
@@ -1,27 +1,73 @@
-from numpy import ndarray, array, ceil
+from numpy import ndarray, array, ceil, float32, memmap
+from pathlib import Path
 from typing import Optional
 from datetime import timedelta
 
+from .axis import TimeAxis
 from .header import SACHeader
+from .reference import TIME_HEADERS
+
+
+def get_id(network: Optional[str], station: Optional[str], location: Optional[str], channel: Optional[str]) -> str:
+    # NET.STA.LOC.CHN; an unset header is left empty, as an unset location is in a SEED id
+    return "{0}.{1}.{2}.{3}".format(*(v or '' for v in (network, station, location, channel)))
 
 
 class SACTrace:
-    def __init__(self, header: Optional[dict], data: Optional[ndarray] = array([])):
+    def __init__(self, header: Optional[dict], data: Optional[ndarray] = array([]), *,
+                 file: Optional[Path] = None, byteorder: Optional[str] = None, headonly: bool = False):
         self.header = SACHeader(header)
         self._data = data
-        self.stats = Stats(self.header)
+        self._file = file
+        self._byteorder = byteorder
+        # read with headonly=True: data is an empty stand-in for a waveform that was never read
+        self._headonly = headonly
 
     @property
     def data(self):
+        # mmap=True: map the waveform in the file's own byte order on first access,
+        # numpy converts to native endian only when the values are used
+        if self._data is None:
+            npts = int(self.header.npts)
+            if npts == 0:
+                self._data = array([], dtype=self._byteorder + 'f4')
+            else:
+                self._data = memmap(self._file, dtype=self._byteorder + 'f4', mode='r',
+                                    offset=632, shape=(npts,))
         return self._data
 
+    @data.setter
+    def data(self, value: ndarray):
+        self._data = value
+        self._headonly = False
+
+    @property
+    def time(self) -> TimeAxis:
+        # b and e as the float32 words they are, the axis is linspace(b, e) in single precision as sac's
+        return TimeAxis(float32(self.header.b), float32(self.header.e), self.data.size)
+
+    def window(self, t0: float, t1: float, reference: str = 'b') -> ndarray:
+        # samples from reference + t0 to reference + t1, both included, as a view of data
+        if reference not in TIME_HEADERS:
+            raise ValueError("reference must be one of {0}, got {1}".format(TIME_HEADERS, reference))
+        time = self.header[reference]
+        return self.data[self.time.index(time + t0, time + t1)]
+
+    def write(self, file: Optional[Path] = None, byteorder: Optional[str] = None) -> None:
+        from .core import write
+        write(self, self._file if file is None else file, byteorder)
+
+    def write_header(self, file: Optional[Path] = None) -> int:
+        from .core import write_header
+        return write_header(self, file)
+
+    @property
+    def stats(self):
+        return Stats(self.header)
+
     @property
     def id(self):
-        return "{0}.{1}.{2}.{3}".format(
-            self.header.knetwk,
-            self.header.kstnm,
-            self.header.khole,
-            self.header.kcmpnm)
+        return get_id(self.header.knetwk, self.header.kstnm, self.header.khole, self.header.kcmpnm)
 
     def __str__(self):
         return "{0} | {1} - {2} | {3} Hz, {4} samples".format(
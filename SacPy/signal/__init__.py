@@ -0,0 +1,7 @@
+from .filter import iirfilter, bandpass, lowpass, highpass, filter_traces
+from .resample import resample, resample_traces
+from .process import demean, detrend, taper, argpeak, peak, peak_to_peak
+from .response import read_pz, remove_response, find_pz
+from .rotate import rotate_ne_rt, rotate_to_gcp, rotate_zne_lqt, rotate_stations
+from .merge import merge_traces
+from .correlate import cut_windows, correlate_windows
@@ -0,0 +1,58 @@
+from functools import lru_cache
+from typing import Optional
+
+from numpy import ndarray, arange, asarray, ceil, concatenate, conj, int64, float64, nan_to_num, sqrt, where, zeros
+from scipy.fft import next_fast_len, rfft, irfft
+
+
+@lru_cache(maxsize=64)
+def get_fft_length(npts: int) -> int:
+    return next_fast_len(npts, real=True)
+
+
+def cut_windows(data: list, b, delta: float, begin, npts: int) -> ndarray:
+    # one row of npts samples per trace, starting at the first sample at or after begin
+    # (same time axis as b); samples outside a trace stay zero
+    offset = (asarray(begin, dtype=float64) - asarray(b, dtype=float64)) / delta
+    start = ceil(nan_to_num(offset, nan=-npts) - 1e-6).astype(int64)
+    windows = zeros((len(data), npts), dtype=float64)
+    for row, values, s in zip(windows, data, start.reshape(-1)):
+        lo, hi = max(s, 0), min(s + npts, values.size)
+        if hi > lo:
+            row[lo - s:hi - s] = values[lo:hi]
+    return windows
+
+
+def correlate_windows(reference: ndarray, windows: ndarray, *, max_lag: Optional[int] = None,
+                      subsample: bool = True) -> tuple:
+    # lag (samples) at which each window best matches the reference, positive when the window
+    # is late, and the correlation there normalized by both window energies
+    reference = asarray(reference, dtype=float64)
+    windows = asarray(windows, dtype=float64).reshape(-1, windows.shape[-1])
+    m, n = reference.size, windows.shape[1]
+    length = get_fft_length(m + n - 1)
+
+    # the reference spectrum is shared by every row, one batched transform for the windows
+    corr = irfft(rfft(windows, length, axis=1) * conj(rfft(reference, length)), length, axis=1)
+    corr = concatenate((corr[:, length - m + 1:], corr[:, :n]), axis=1)
+    lags = arange(-m + 1, n)
+    if max_lag is not None:
+        keep = abs(lags) <= max_lag
+        corr, lags = corr[:, keep], lags[keep]
+
+    rows = arange(corr.shape[0])
+    k = corr.argmax(axis=1)
+    peak = corr[rows, k]
+    shift = lags[k].astype(float64)
+    if subsample and corr.shape[1] > 2:
+        # parabola through the peak and its two neighbours
+        inner = (k > 0) & (k < corr.shape[1] - 1)
+        left = corr[rows, where(inner, k - 1, k)]
+        right = corr[rows, where(inner, k + 1, k)]
+        curvature = left - 2 * peak + right
+        offset = where(inner & (curvature < 0), 0.5 * (left - right) / where(curvature < 0, curvature, -1.), 0.)
+        shift += offset
+        peak = peak - 0.25 * (left - right) * offset
+
+    norm = sqrt((reference ** 2).sum() * (windows ** 2).sum(axis=1))
+    return shift, where(norm > 0, peak / where(norm > 0, norm, 1.), 0.)
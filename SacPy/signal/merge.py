@@ -0,0 +1,60 @@
+from numpy import zeros, interp, float32, int32
+from numpy.ma import masked_array
+
+from SacPy.io.reference import get_reference_time
+from SacPy.io.trace import SACTrace
+
+GAP_POLICIES = ('zero', 'interpolate', 'mask')
+OVERLAP_POLICIES = ('first', 'last')
+
+
+def _merge(segments: list, gap: str, overlap: str) -> SACTrace:
+    delta = float(segments[0].header.delta)
+    for tr in segments:
+        if float(tr.header.delta) != delta:
+            raise ValueError("{0}: delta not equal!".format(tr.id))
+
+    # start of every segment in seconds after the first segment's reference time
+    reference = get_reference_time(segments[0].header)
+    starts = [(get_reference_time(tr.header) - reference).total_seconds() + float(tr.header.b)
+              for tr in segments]
+    order = sorted(range(len(segments)), key=starts.__getitem__)
+    first = order[0]
+    offsets = [int(round((starts[i] - starts[first]) / delta)) for i in range(len(segments))]
+    size = max(offsets[i] + segments[i].data.size for i in order)
+
+    # one buffer for the whole channel; overlaps keep the earliest segment unless overlap='last'
+    data = zeros(size, dtype=float32)
+    covered = zeros(size, dtype=bool)
+    for i in order:
+        offset, seg = offsets[i], segments[i].data
+        if overlap == 'first':
+            free = ~covered[offset:offset + seg.size]
+            data[offset:offset + seg.size][free] = seg[free]
+        else:
+            data[offset:offset + seg.size] = seg
+        covered[offset:offset + seg.size] = True
+
+    gaps = ~covered
+    if gaps.any():
+        if gap == 'interpolate':
+            data[gaps] = interp(gaps.nonzero()[0], covered.nonzero()[0], data[covered])
+        elif gap == 'mask':
+            data = masked_array(data, mask=gaps)
+
+    header = dict(segments[first].header)
+    header['npts'] = int32(size)
+    header['e'] = float32(float(header['b']) + (size - 1) * delta)
+    return SACTrace(header, data)
+
+
+def merge_traces(traces: list, gap: str = 'zero', overlap: str = 'first') -> list:
+    if gap not in GAP_POLICIES:
+        raise ValueError("gap must be one of {0}, got {1}".format(GAP_POLICIES, gap))
+    if overlap not in OVERLAP_POLICIES:
+        raise ValueError("overlap must be one of {0}, got {1}".format(OVERLAP_POLICIES, overlap))
+
+    groups = {}
+    for tr in traces:
+        groups.setdefault(tr.id, []).append(tr)
+    return [_merge(groups[key], gap, overlap) for key in sorted(groups)]
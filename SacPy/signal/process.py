@@ -0,0 +1,60 @@
+from functools import lru_cache
+
+from numpy import ndarray, asarray, arange, cos, ones, pi, float64, take_along_axis, where
+from scipy.signal import detrend as _detrend
+
+
+def demean(data: ndarray) -> ndarray:
+    data = asarray(data, dtype=float64)
+    return data - data.mean(axis=-1, keepdims=True)
+
+
+def detrend(data: ndarray) -> ndarray:
+    return _detrend(asarray(data, dtype=float64), axis=-1, type='linear')
+
+
+@lru_cache(maxsize=64)
+def get_taper(npts: int, width: float = 0.05, type_: str = 'hanning') -> ndarray:
+    # sac `taper`: the window rises over width*npts samples at each end
+    n = int(width * npts + 0.5)
+    window = ones(npts)
+    if n < 2:
+        return window
+    x = arange(n) * pi / n
+    if type_ == 'hanning':
+        ramp = 0.5 - 0.5 * cos(x)
+    elif type_ == 'hamming':
+        ramp = 0.54 - 0.46 * cos(x)
+    elif type_ == 'cosine':
+        ramp = cos(x / 2 - pi / 2)
+    else:
+        raise ValueError("unknown taper type: {0}".format(type_))
+    window[:n] = ramp
+    window[npts - n:] = ramp[::-1]
+    window.flags.writeable = False
+    return window
+
+
+def taper(data: ndarray, width: float = 0.05, type_: str = 'hanning') -> ndarray:
+    data = asarray(data, dtype=float64)
+    return data * get_taper(data.shape[-1], width, type_)
+
+
+def argpeak(data: ndarray) -> ndarray:
+    # index of the largest absolute value along the last axis; the first minimum when |max| == |min|
+    data = asarray(data)
+    index_max = data.argmax(axis=-1)
+    index_min = data.argmin(axis=-1)
+    value_max = take_along_axis(data, index_max[..., None], axis=-1)[..., 0]
+    value_min = take_along_axis(data, index_min[..., None], axis=-1)[..., 0]
+    return where(abs(value_max) > abs(value_min), index_max, index_min)
+
+
+def peak(data: ndarray) -> ndarray:
+    data = asarray(data)
+    return take_along_axis(data, asarray(argpeak(data))[..., None], axis=-1)[..., 0]
+
+
+def peak_to_peak(data: ndarray) -> ndarray:
+    data = asarray(data)
+    return data.max(axis=-1) - data.min(axis=-1)
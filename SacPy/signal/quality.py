@@ -0,0 +1,198 @@
+import hashlib
+import json
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from numpy import ndarray, arange, array, asarray, ceil, empty, errstate, float64, floor, full, inf, int64, isfinite, \
+    isnan, load, maximum, nan, savez, sqrt, where
+
+from SacPy.io.catalog import SACCatalog, get_query_mask
+from SacPy.io.reference import TIME_HEADERS
+from SacPy.io.stream import SACStream
+from SacPy.util.atomic import atomic_write
+
+# the windows of filter_data_extremum: noise from b to P, signal the 10 s after sP;
+# each bound is (marker, seconds after it), a marker is a time header or a kt label
+WINDOWS = {"noise": (("b", 0.), ("P", 0.)), "signal": (("sP", 0.), ("sP", 10.))}
+
+
+def get_marker(columns, size: int, name: str) -> ndarray:
+    # time of a header marker, or of the t-n whose kt-n label is name; nan where unset
+    if name in TIME_HEADERS:
+        return asarray(columns(name), dtype=float64)
+    time = full(size, nan)
+    for i in range(10):
+        label = array([v == name for v in columns("kt{0}".format(i))], dtype=bool)
+        time = where(label & isnan(time), columns("t{0}".format(i)), time)
+    return time
+
+
+def _longest_run(mask: ndarray) -> ndarray:
+    # longest run of True in every row
+    count = mask.cumsum(axis=1)
+    reset = maximum.accumulate(where(mask, 0, count), axis=1)
+    return (count - reset).max(axis=1, initial=0)
+
+
+def get_quality(stream: SACStream, windows: Optional[dict] = None, *,
+                signal: str = 'signal', noise: str = 'noise', clip_run: int = 5) -> dict:
+    windows = WINDOWS if windows is None else windows
+    data = stream.data
+    size = len(stream)
+    b, delta = stream['b'], stream['delta']
+    column = arange(data.shape[1])
+    valid = column < stream.npts[:, None]
+    amplitude = abs(data)
+
+    table = {"max": amplitude.max(axis=1, initial=0.).astype(float64)}
+    # dead: a flat line or samples that are not numbers; clipped: the peak held clip_run samples in a row
+    high = where(valid, data, -inf).max(axis=1, initial=-inf)
+    low = where(valid, data, inf).min(axis=1, initial=inf)
+    table["dead"] = ~(high > low) | ~isfinite(where(valid, data, 0.)).all(axis=1)
+    at_peak = valid & (amplitude == table["max"][:, None]) & (table["max"][:, None] > 0)
+    table["clipped"] = _longest_run(at_peak) >= clip_run
+
+    for name, ((marker0, offset0), (marker1, offset1)) in windows.items():
+        t0 = get_marker(stream.__getitem__, size, marker0) + offset0
+        t1 = get_marker(stream.__getitem__, size, marker1) + offset1
+        start = ceil((t0 - b) / delta - 1e-6)
+        stop = floor((t1 - b) / delta + 1e-6) + 1
+        mask = valid & (column >= start[:, None]) & (column < stop[:, None])
+        count = mask.sum(axis=1)
+        empty_ = count == 0
+
+        table[name + "_npts"] = count
+        table[name + "_max"] = where(empty_, nan, where(mask, amplitude, 0.).max(axis=1, initial=0.))
+        table[name + "_ptp"] = where(empty_, nan, where(mask, data, -inf).max(axis=1, initial=-inf) -
+                                     where(mask, data, inf).min(axis=1, initial=inf))
+        energy = (where(mask, data, 0.).astype(float64) ** 2).sum(axis=1)
+        table[name + "_rms"] = where(empty_, nan, sqrt(energy / maximum(count, 1)))
+
+    if signal in windows and noise in windows:
+        # a silent noise window gives inf, as the division in filter_data_extremum does
+        with errstate(divide='ignore', invalid='ignore'):
+            table["ptp_ratio"] = table[signal + "_ptp"] / table[noise + "_ptp"]
+            table["snr"] = table[signal + "_rms"] / table[noise + "_rms"]
+    return table
+
+
+class SACQuality:
+    def __init__(self, sac_folder: Union[str, Path], pattern: str = "*.SAC", *,
+                 windows: Optional[dict] = None, signal: str = 'signal', noise: str = 'noise',
+                 clip_run: int = 5, batch: int = 256, catalog: Optional[SACCatalog] = None,
+                 index_file: Optional[Union[str, Path]] = None, update: bool = True):
+        # the folder's catalog of all SAC files, shared with the other stages, narrowed to pattern here
+        self._catalog = SACCatalog(sac_folder, update=False) if catalog is None else catalog
+        self._sac_folder = Path(sac_folder)
+        self._pattern = pattern
+
+        self._windows = WINDOWS if windows is None else windows
+        self._options = {"signal": signal, "noise": noise, "clip_run": clip_run}
+        self._batch = batch
+        # one table per pattern and window set, drawing another phase never recomputes this one
+        self._params = json.dumps({"pattern": pattern, "windows": self._windows, **self._options}, sort_keys=True)
+        if index_file is None:
+            key = hashlib.sha1(self._params.encode('utf-8')).hexdigest()[:12]
+            index_file = self._sac_folder.joinpath(".sacpy-quality-{0}.npz".format(key))
+        self._index_file = Path(index_file)
+
+        self._names = array([], dtype=str)
+        self._size = empty(0, int64)
+        self._mtime = empty(0, int64)
+        self._columns = {}
+
+        if self._index_file.exists():
+            self._load()
+        if update:
+            self.update()
+
+    def _load(self):
+        with load(self._index_file, allow_pickle=False) as index:
+            if str(index["params"]) != self._params:
+                return
+            self._names = index["names"]
+            self._size = index["size"]
+            self._mtime = index["mtime"]
+            self._columns = {key[2:]: index[key] for key in index.files if key.startswith("q_")}
+
+    def save(self):
+        with atomic_write(self._index_file) as f:
+            savez(f, params=array(self._params), names=self._names, size=self._size, mtime=self._mtime,
+                  **{"q_" + key: value for key, value in self._columns.items()})
+
+    def update(self, names: Optional[Iterable] = None) -> int:
+        # rows for every file of the pattern, or only for names (the stations of a record section);
+        # rows already in the table stay while their file is unchanged, only new or changed files are read
+        catalog = self._catalog
+        catalog.update()
+        match = array([fnmatch(name, self._pattern) for name in catalog.names], dtype=bool)
+        current = dict(zip(catalog.names[match].tolist(),
+                           zip(catalog.stat[0][match].tolist(), catalog.stat[1][match].tolist())))
+        known = {name: i for i, name in enumerate(self._names.tolist())}
+        fresh = {name for name, i in known.items() if current.get(name) == (self._size[i], self._mtime[i])}
+        wanted = current if names is None else [name for name in names if name in current]
+        stale = set(wanted) - fresh
+
+        names = array(sorted(fresh | stale), dtype=str)
+        row = {name: i for i, name in enumerate(names.tolist())}
+        reused = sorted(fresh, key=row.__getitem__)
+        columns = {key: empty(names.size, dtype=value.dtype) for key, value in self._columns.items()}
+        for key, value in columns.items():
+            value[[row[name] for name in reused]] = self._columns[key][[known[name] for name in reused]]
+
+        stale = sorted(row[name] for name in stale)
+        for n in range(0, len(stale), self._batch):
+            rows = stale[n:n + self._batch]
+            files = [self._sac_folder.joinpath(names[i]) for i in rows]
+            table = get_quality(SACStream.read(files), self._windows, **self._options)
+            for key, value in table.items():
+                if key not in columns:
+                    columns[key] = empty(names.size, dtype=value.dtype)
+                columns[key][rows] = value
+
+        changed = len(stale) > 0 or names.size != self._names.size
+        self._names, self._columns = names, columns
+        self._size = array([current[name][0] for name in names.tolist()], dtype=int64)
+        self._mtime = array([current[name][1] for name in names.tolist()], dtype=int64)
+        if changed or not self._index_file.exists():
+            self.save()
+        return len(stale)
+
+    def __len__(self):
+        return self._names.size
+
+    @property
+    def catalog(self) -> SACCatalog:
+        return self._catalog
+
+    @property
+    def names(self) -> ndarray:
+        return self._names
+
+    @property
+    def files(self) -> list:
+        return [self._sac_folder.joinpath(name) for name in self._names]
+
+    @property
+    def keys(self) -> list:
+        return list(self._columns)
+
+    def __getitem__(self, key: str) -> ndarray:
+        return self._columns[key]
+
+    def table(self, keys: Optional[list] = None, index: Optional[ndarray] = None) -> dict:
+        if keys is None:
+            keys = self.keys
+        if index is None:
+            index = arange(len(self))
+        table = {"file": array([f.as_posix() for f in self.files], dtype=object)[index]}
+        for key in keys:
+            table[key] = self[key][index]
+        return table
+
+    def query(self, **kwargs) -> ndarray:
+        return get_query_mask(self.__getitem__, len(self), **kwargs).nonzero()[0]
+
+    def select(self, **kwargs) -> list:
+        return [self._sac_folder.joinpath(n) for n in self._names[self.query(**kwargs)]]
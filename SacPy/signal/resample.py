@@ -0,0 +1,61 @@
+from fractions import Fraction
+from typing import Optional
+
+from numpy import ndarray, arange, asarray, stack, float32, float64, int32
+from scipy.interpolate import Akima1DInterpolator
+from scipy.signal import resample_poly
+
+from .filter import lowpass, group_traces
+
+
+def get_ratio(delta: float, new_delta: float, max_denominator: int = 100) -> Optional[tuple]:
+    ratio = Fraction(new_delta / delta).limit_denominator(max_denominator)
+    if abs(float(ratio) - new_delta / delta) > 1e-6 * (new_delta / delta):
+        return None
+    return ratio.denominator, ratio.numerator
+
+
+def get_npts(npts: int, delta: float, new_delta: float) -> int:
+    # relative slack: a float32 delta such as 0.01 is a hair short and would lose the last sample
+    return int((npts - 1) * delta / new_delta * (1 + 1e-6)) + 1
+
+
+def resample(data: ndarray, delta: float, new_delta: float) -> ndarray:
+    data = asarray(data, dtype=float64)
+    npts = data.shape[-1]
+    new_npts = get_npts(npts, delta, new_delta)
+
+    ratio = get_ratio(delta, new_delta)
+    if ratio is not None:
+        # rational delta ratio, e.g. 0.025 -> 0.05: polyphase FIR with its own anti-alias filter
+        up, down = ratio
+        data = resample_poly(data, up, down, axis=-1)[..., :new_npts]
+    else:
+        # same recipe as `lp c 0.5/new_delta` + `interpolate delta new_delta`
+        if new_delta > delta:
+            data = lowpass(data, delta, 0.5 / new_delta)
+        time = arange(npts) * delta
+        new_time = arange(new_npts) * new_delta
+        data = Akima1DInterpolator(time, data, axis=-1)(new_time)
+    return data.astype(float32)
+
+
+def resample_traces(traces: list, new_delta: float) -> list:
+    # traces sharing npts and source delta are resampled together as one 2-D array
+    for (npts, delta), index in group_traces(traces).items():
+        if abs(delta - new_delta) <= 1e-6 * new_delta:
+            continue
+        data = resample(stack([traces[i].data for i in index]), delta, new_delta)
+        for i, row in zip(index, data):
+            tr = traces[i]
+            tr.data = row
+            header = tr.header
+            header['delta'] = float32(new_delta)
+            header['npts'] = int32(row.size)
+            header['e'] = float32(header['b']) + (row.size - 1) * float32(new_delta)
+            if row.size > 0:
+                header['depmin'] = float32(row.min())
+                header['depmax'] = float32(row.max())
+                header['depmen'] = float32(row.mean())
+    return traces
+
@@ -0,0 +1,111 @@
+from typing import Optional
+
+from numpy import ndarray, array, asarray, cos, sin, radians, stack, float32, float64, int32
+
+from SacPy.io.trace import SACTrace
+
+
+def rotate_ne_rt(n: ndarray, e: ndarray, baz) -> tuple:
+    baz = radians(asarray(baz, dtype=float64))[..., None]
+    r = - e * sin(baz) - n * cos(baz)
+    t = - e * cos(baz) + n * sin(baz)
+    return r, t
+
+
+def rotate_to_gcp(c1: ndarray, c2: ndarray, cmpaz1, cmpaz2, baz) -> tuple:
+    # project two orthogonal horizontals of any azimuth onto radial (baz + 180) and transverse (radial + 90)
+    a1 = radians(asarray(cmpaz1, dtype=float64))[..., None]
+    a2 = radians(asarray(cmpaz2, dtype=float64))[..., None]
+    raz = radians(asarray(baz, dtype=float64) + 180.)[..., None]
+    taz = raz + radians(90.)
+    r = c1 * cos(raz - a1) + c2 * cos(raz - a2)
+    t = c1 * cos(taz - a1) + c2 * cos(taz - a2)
+    return r, t
+
+
+def rotate_zne_lqt(z: ndarray, n: ndarray, e: ndarray, baz, inc) -> tuple:
+    baz = radians(asarray(baz, dtype=float64))[..., None]
+    inc = radians(asarray(inc, dtype=float64))[..., None]
+    l_ = z * cos(inc) - n * sin(inc) * cos(baz) - e * sin(inc) * sin(baz)
+    q = z * sin(inc) + n * cos(inc) * cos(baz) + e * cos(inc) * sin(baz)
+    t = n * sin(baz) - e * cos(baz)
+    return l_, q, t
+
+
+def check_triplet(z: SACTrace, n: SACTrace, e: SACTrace) -> None:
+    cmpaz_delta = abs(e.header.cmpaz - n.header.cmpaz)
+    if not (abs(cmpaz_delta - 90) <= 0.01 or abs(cmpaz_delta - 270) <= 0.01):
+        raise ValueError("cmpaz1={0}, cmpaz2={1} are not orthogonal!".format(e.header.cmpaz, n.header.cmpaz))
+    if not (float(z.header.delta) == float(e.header.delta) and float(z.header.delta) == float(n.header.delta)):
+        raise ValueError("delta not equal!")
+    if n.header.baz is None:
+        raise ValueError("baz not set")
+
+
+def get_window(traces: tuple, begin: Optional[float] = None, end: Optional[float] = None) -> tuple:
+    # common window by index arithmetic, clipped to the data like sac's default cuterr usebe
+    delta = float(traces[0].header.delta)
+    b = array([float(tr.header.b) for tr in traces])
+    npts = array([tr.data.size for tr in traces])
+    e = b + (npts - 1) * delta
+    begin = b.max() if begin is None else max(begin, b.max())
+    end = e.min() if end is None else min(end, e.min())
+    start = ((begin - b) / delta + 0.5).astype(int)
+    # start and size are rounded apart, together they may run one sample past a trace
+    size = min(int((end - begin) / delta + 0.5) + 1, int((npts - start).min()))
+    if size <= 0:
+        raise ValueError("no common time window")
+    return start, size
+
+
+def _cut_header(tr: SACTrace, start: int, size: int, data: ndarray, **kwargs) -> SACTrace:
+    header = dict(tr.header)
+    header['b'] = float32(tr.header.b) + start * float32(tr.header.delta)
+    header['npts'] = int32(size)
+    header['e'] = header['b'] + (size - 1) * float32(tr.header.delta)
+    header.update(kwargs)
+    return SACTrace(header, data.astype(float32))
+
+
+def rotate_stations(triplets: list, begin: Optional[float] = None, end: Optional[float] = None,
+                    inc: Optional[list] = None) -> list:
+    # cut every (z, n, e) station to its common window, then rotate all stations that share
+    # a window length in one vectorized operation: ZRT, or LQT when incidence angles are given
+    windows = [get_window(triplet, begin, end) for triplet in triplets]
+    groups = {}
+    for i, (_, size) in enumerate(windows):
+        groups.setdefault(size, []).append(i)
+
+    results = [None] * len(triplets)
+    for size, index in groups.items():
+        data = [stack([triplets[i][c].data[windows[i][0][c]:windows[i][0][c] + size] for i in index])
+                .astype(float64) for c in range(3)]
+        baz = array([float(triplets[i][1].header.baz) for i in index])
+        if inc is None:
+            cmpaz = [array([float(triplets[i][c].header.cmpaz) for i in index]) for c in (1, 2)]
+            r, t = rotate_to_gcp(data[1], data[2], cmpaz[0], cmpaz[1], baz)
+            z = data[0]
+            names = ('BHZ', 'BHR', 'BHT')
+        else:
+            z, r, t = rotate_zne_lqt(data[0], data[1], data[2], baz, array(inc, dtype=float64)[index])
+            names = ('BHL', 'BHQ', 'BHT')
+
+        for k, i in enumerate(index):
+            start = windows[i][0]
+            raz = (baz[k] + 180.) % 360.
+            if inc is None:
+                z_header = {}
+                r_header = {'cmpaz': float32(raz), 'cmpinc': float32(90)}
+            else:
+                # L points along the ray, away from the source and up by inc from the vertical;
+                # Q is square to it in the same plane, towards the source
+                i_ = float(inc[i])
+                z_header = {'kcmpnm': names[0], 'cmpaz': float32(raz), 'cmpinc': float32(i_)}
+                r_header = {'cmpaz': float32(baz[k] % 360.), 'cmpinc': float32(90. - i_)}
+            results[i] = (
+                _cut_header(triplets[i][0], start[0], size, z[k], **z_header),
+                _cut_header(triplets[i][1], start[1], size, r[k], kcmpnm=names[1], **r_header),
+                _cut_header(triplets[i][2], start[2], size, t[k], kcmpnm=names[2],
+                            cmpaz=float32((raz + 90.) % 360.), cmpinc=float32(90)),
+            )
+    return results
@@ -0,0 +1,34 @@
+import os
+import secrets
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Union
+
+
+def _create(file: Path) -> tuple:
+    # a new file next to file, 0o666 as open() would make it, so the kernel applies the umask;
+    # reading the umask would mean setting it, which races with other threads
+    while True:
+        tmp_file = file.parent.joinpath(".{0}.{1}".format(file.name, secrets.token_hex(4)))
+        try:
+            return os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), tmp_file
+        except FileExistsError:
+            continue
+
+
+@contextmanager
+def atomic_write(file: Union[str, Path], mode: str = 'wb', encoding: Optional[str] = None):
+    # write next to the target and swap it in, so an interrupted write never leaves a truncated
+    # file and a memory-mapped file of the same path stays valid; a symlink is followed, the file
+    # it points to is replaced and the link stays, and an existing target keeps its permissions
+    file = Path(file).resolve()
+    fd, tmp_file = _create(file)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            if file.exists():
+                os.fchmod(f.fileno(), file.stat().st_mode & 0o7777)
+            yield f
+        os.replace(tmp_file, file)
+    except BaseException:
+        os.unlink(tmp_file)
+        raise
@@ -0,0 +1,21 @@
+from numpy import arctan, arccos, arctan2, cos, sin, tan, radians, degrees, clip
+
+# wgs84 flattening and mean radius, latitudes are made geocentric before the spherical formulas
+FLATTENING = 1 / 298.257223563
+RADIUS = 6371.0
+
+
+def geocentric_latitude(lat):
+    return degrees(arctan((1 - FLATTENING) ** 2 * tan(radians(lat))))
+
+
+def distaz(stla, stlo, evla, evlo) -> tuple:
+    # returns dist (km), az and baz (degrees clockwise from north), gcarc (degrees), as sac's lcalda does
+    theta1 = radians(geocentric_latitude(evla))
+    theta2 = radians(geocentric_latitude(stla))
+    dlon = radians(stlo - evlo)
+
+    gcarc = arccos(clip(sin(theta1) * sin(theta2) + cos(theta1) * cos(theta2) * cos(dlon), -1., 1.))
+    az = arctan2(sin(dlon) * cos(theta2), cos(theta1) * sin(theta2) - sin(theta1) * cos(theta2) * cos(dlon))
+    baz = arctan2(-sin(dlon) * cos(theta1), cos(theta2) * sin(theta1) - sin(theta2) * cos(theta1) * cos(dlon))
+    return RADIUS * gcarc, degrees(az) % 360., degrees(baz) % 360., degrees(gcarc)
@@ -0,0 +1,115 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+from .atomic import atomic_write
+
+MANIFEST = ".sacpy-manifest.jsonl"
+
+
+def fingerprint(file: Union[str, Path]) -> list:
+    stat = os.stat(file)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def params_key(params) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def record(folder: Union[str, Path], file: Union[str, Path], stage: str, params, *,
+           before: Optional[list] = None, group: Optional[str] = None, inputs: Optional[Iterable] = None) -> None:
+    # one appended line per processed file, written by the worker right after the file, so an
+    # interrupted stage leaves every finished file on record; before=None marks a newly created file
+    line = {"file": Path(file).name, "stage": stage, "params": params_key(params),
+            "fingerprint": fingerprint(file), "before": before}
+    if group is not None:
+        line["group"] = group
+    if inputs is not None:
+        line["inputs"] = {Path(f).name: fingerprint(f) for f in inputs}
+    with open(Path(folder).joinpath(MANIFEST), 'a', encoding="utf-8") as f:
+        f.write(json.dumps(line) + "\n")
+
+
+class Manifest:
+    def __init__(self, folder: Union[str, Path]):
+        self._folder = Path(folder)
+        self._file = self._folder.joinpath(MANIFEST)
+        self._entries = {}
+        if self._file.exists():
+            with open(self._file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._replay(json.loads(line))
+                    except ValueError:
+                        # a line cut short by a crash, the file behind it is simply done again
+                        continue
+
+    def _replay(self, line: dict) -> None:
+        name = line["file"]
+        if "stages" in line:
+            self._entries[name] = line
+            return
+        entry = self._entries.get(name)
+        if line["before"] is None or entry is None or entry["fingerprint"] != line["before"]:
+            entry = {"stages": {}, "group": line.get("group"), "inputs": line.get("inputs")}
+            self._entries[name] = entry
+        entry["stages"][line["stage"]] = line["params"]
+        entry["fingerprint"] = line["fingerprint"]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def done(self, file: Union[str, Path], stage: str, params) -> bool:
+        # done only if the file is unchanged since the stage, with these parameters, last touched it
+        file = self._folder.joinpath(file)
+        entry = self._entries.get(file.name)
+        if entry is None or not file.exists() or fingerprint(file) != entry["fingerprint"]:
+            return False
+        return entry["stages"].get(stage) == params_key(params)
+
+    def group_done(self, group: str, stage: str, params, inputs: Iterable) -> bool:
+        inputs = {Path(f).name: fingerprint(f) for f in inputs}
+        outputs = [name for name, entry in self._entries.items() if entry.get("group") == group]
+        return len(outputs) > 0 and all(
+            self.done(name, stage, params) and self._entries[name]["inputs"] == inputs for name in outputs)
+
+    def pending(self, files: Iterable, stage: str, params) -> list:
+        return [file for file in files if not self.done(file, stage, params)]
+
+    def compact(self) -> None:
+        # one line per file instead of one per operation, swapped in atomically
+        with atomic_write(self._file, 'w', encoding="utf-8") as f:
+            for name in sorted(self._entries):
+                f.write(json.dumps(dict(self._entries[name], file=name)) + "\n")
+
+
+class Recorded:
+    # runs a per-item stage function and records every file of the item it rewrote, also when it
+    # fails half way, so a rewritten file is on record even if the rest of its batch is not
+    def __init__(self, func: Callable, folder: Union[str, Path], stage: str, params):
+        self.func = func
+        self.folder = Path(folder)
+        self.stage = stage
+        self.params = params
+
+    def __call__(self, item):
+        files = [self.folder.joinpath(f) for f in (item if isinstance(item, (list, tuple)) else [item])]
+        before = [fingerprint(f) for f in files]
+        try:
+            return self.func(item)
+        finally:
+            for file, fp in zip(files, before):
+                if file.exists() and fingerprint(file) != fp:
+                    record(self.folder, file, self.stage, self.params, before=fp)
+
+
+def pending(folder: Union[str, Path], files: Iterable, stage: str, params) -> list:
+    manifest = Manifest(folder)
+    if len(manifest) > 0:
+        manifest.compact()
+    return manifest.pending(files, stage, params)
+
+
+def recorded(func: Callable, folder: Union[str, Path], stage: str, params, resume: bool) -> Callable:
+    return Recorded(func, folder, stage, params) if resume else func
@@ -0,0 +1,83 @@
+import time
+import traceback
+from logging import INFO, ERROR
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Optional
+
+from .logging import get_logger
+
+
+class ParallelReport:
+    def __init__(self, name: str, items: list, results: list, errors: dict, elapsed: float, workers: int):
+        self.name = name
+        self.items = items
+        self.results = results
+        self.errors = errors
+        self.elapsed = elapsed
+        self.workers = workers
+
+    @property
+    def ok(self) -> bool:
+        return len(self.errors) == 0
+
+    @property
+    def throughput(self) -> float:
+        if self.elapsed == 0:
+            return 0.
+        return len(self.items) / self.elapsed
+
+    def __str__(self):
+        return "{0}: {1} items, {2} failed, {3:.2f} s with {4} worker(s), {5:.1f} items/s".format(
+            self.name, len(self.items), len(self.errors), self.elapsed, self.workers, self.throughput)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _call(func: Callable, item):
+    try:
+        return True, func(item)
+    except Exception as e:
+        return False, "{0}: {1}\n{2}".format(type(e).__name__, e, traceback.format_exc())
+
+
+def run_parallel(func: Callable, items: Iterable, workers: int = 1, *,
+                 name: Optional[str] = None, log_file: Optional[str] = None,
+                 threads: bool = False) -> ParallelReport:
+    items = list(items)
+    name = name or getattr(func, '__name__', 'parallel')
+    results = [None] * len(items)
+    errors = {}
+    start = time.perf_counter()
+
+    # results are stored by input position, so the output never depends on completion order
+    if workers is None or workers <= 1 or len(items) <= 1:
+        workers = 1
+        for i, item in enumerate(items):
+            ok, value = _call(func, item)
+            if ok:
+                results[i] = value
+            else:
+                errors[i] = value
+    else:
+        pool_class = ThreadPoolExecutor if threads else ProcessPoolExecutor
+        with pool_class(max_workers=workers) as executor:
+            futures = {executor.submit(_call, func, item): i for i, item in enumerate(items)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    ok, value = future.result()
+                except Exception as e:
+                    ok, value = False, "{0}: {1}".format(type(e).__name__, e)
+                if ok:
+                    results[i] = value
+                else:
+                    errors[i] = value
+
+    report = ParallelReport(name, items, results, errors, time.perf_counter() - start, workers)
+
+    _logging = get_logger(name=name, log_file=log_file)
+    for i in sorted(errors):
+        _logging.log(level=ERROR, msg="{0}: {1}".format(items[i], errors[i].splitlines()[0]))
+    _logging.log(level=INFO, msg=str(report))
+    return report
@@ -0,0 +1,169 @@
+import os
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from numpy import unique
+
+from SacPy.io.catalog import SACCatalog
+from SacPy.io.core import read_many
+from SacPy.io.reference import set_event
+from SacPy.signal import merge_traces, demean, detrend, taper, remove_response, find_pz, \
+    filter_traces, resample_traces
+from SacPy.signal.rotate import check_triplet, rotate_stations
+from .manifest import Manifest, record
+from .parallel import run_parallel, ParallelReport
+
+
+def _merge(traces: list, gap: str = 'zero', overlap: str = 'first') -> list:
+    return merge_traces(traces, gap=gap, overlap=overlap)
+
+
+def _eventinfo(traces: list, time, latitude: float, longitude: float, depth: float) -> list:
+    for tr in traces:
+        set_event(tr.header, time, latitude, longitude, depth)
+    return traces
+
+
+def _transfer(traces: list, sac_pzs_folder: Union[str, Path], f: list, remove_trend: bool = True) -> list:
+    for tr in traces:
+        header = tr.header
+        pz_file = find_pz(sac_pzs_folder, header.knetwk, header.kstnm, header.khole or '', header.kcmpnm)
+        data = tr.data
+        if remove_trend is True:
+            data = taper(detrend(demean(data)))
+        tr.data = remove_response(data, header.delta, pz_file, tuple(f)) * 1.0e9
+    return traces
+
+
+def _rotate(traces: list, begin: Optional[float] = None, end: Optional[float] = None) -> list:
+    channels = {tr.header.kcmpnm: tr for tr in traces}
+    if 'BHZ' not in channels:
+        raise ValueError("Vertical component missing")
+    if 'BHN' not in channels or 'BHE' not in channels:
+        raise ValueError("Horizontal component missing")
+    triplet = (channels['BHZ'], channels['BHN'], channels['BHE'])
+    check_triplet(*triplet)
+    return list(rotate_stations([triplet], begin, end)[0])
+
+
+def _filter(traces: list, frequency: list, poles: int = 2, passes: int = 2) -> list:
+    return filter_traces(traces, tuple(frequency), 'bandpass', poles=poles, passes=passes)
+
+
+def _resample(traces: list, delta: Optional[float] = None) -> list:
+    # delta None is resolved by Pipeline.run before any station starts, see Pipeline.default_delta
+    if delta is None:
+        raise ValueError("resample needs a delta, run the pipeline through Pipeline.run or give one")
+    return resample_traces(traces, delta)
+
+
+STAGES = {
+    "merge": _merge,
+    "eventinfo": _eventinfo,
+    "transfer": _transfer,
+    "rotate": _rotate,
+    "filter": _filter,
+    "resample": _resample,
+}
+
+
+def _file_name(tr) -> str:
+    return tr.id + ".M.SAC"
+
+
+def _write(traces: list, folder: Path) -> list:
+    files = []
+    for tr in traces:
+        file = folder.joinpath(_file_name(tr))
+        tr.write(file)
+        files.append(file)
+    return files
+
+
+class _Station:
+    def __init__(self, key: str, sac_files: list):
+        self.key = key
+        self.sac_files = sac_files
+
+    def __str__(self):
+        return self.key
+
+
+class Pipeline:
+    def __init__(self, stages: Iterable, *, save: Iterable = ()):
+        # stages: (name, params) pairs run in order on the traces of one station
+        self.stages = [(name, dict(params)) for name, params in stages]
+        for name, _ in self.stages:
+            if name not in STAGES:
+                raise ValueError("unknown stage {0}, expected one of {1}".format(name, list(STAGES)))
+        self.save = set(save)
+
+    @classmethod
+    def from_config(cls, config: dict):
+        stages = [(stage["name"], {k: v for k, v in stage.items() if k != "name"}) for stage in config["stages"]]
+        return cls(stages, save=config.get("save", ()))
+
+    def __call__(self, traces: list, output_folder: Optional[Path] = None) -> list:
+        for name, params in self.stages:
+            traces = STAGES[name](traces, **params)
+            if name in self.save and output_folder is not None:
+                folder = output_folder.joinpath(name)
+                os.makedirs(folder, exist_ok=True)
+                _write(traces, folder)
+        return traces
+
+    def run_station(self, station: _Station, output_folder: Path, resume: bool = False) -> list:
+        # one read and one write per trace, every stage in between works in memory
+        traces = read_many(station.sac_files)
+        files = _write(self(traces, output_folder), output_folder)
+        if resume:
+            for file in files:
+                record(output_folder, file, "pipeline", self.stages, group=station.key, inputs=station.sac_files)
+        return files
+
+    def default_delta(self, catalog: SACCatalog) -> float:
+        # the most common delta of the traces that reach the resample stage, as base/resample.py
+        # takes it from the rotated folder: no stage changes delta, merge makes one trace of the
+        # segments of a channel and rotate hands on only BHZ, BHN and BHE of complete stations
+        names = [name for name, _ in self.stages]
+        channels = {}
+        for delta, net, sta, loc, chn in zip(catalog['delta'], catalog['knetwk'], catalog['kstnm'],
+                                             catalog['khole'], catalog['kcmpnm']):
+            channels.setdefault("{0}.{1}.{2}".format(net, sta, loc or ''), {})[chn] = delta
+        if "rotate" in names[:names.index("resample")]:
+            channels = {key: {chn: value[chn] for chn in ('BHZ', 'BHN', 'BHE')} for key, value in channels.items()
+                        if {'BHZ', 'BHN', 'BHE'} <= set(value)}
+        deltas = [delta for value in channels.values() for delta in value.values()]
+        if len(deltas) == 0:
+            raise ValueError("no trace reaches the resample stage to take its delta from")
+        values, counts = unique(deltas, return_counts=True)
+        return float(values[counts.argmax()])
+
+    def run(self, sac_folder: Union[str, Path], output_folder: Union[str, Path], *, workers: int = 1,
+            pattern: str = "*.SAC", log_file: Optional[str] = None, resume: bool = False) -> ParallelReport:
+        sac_folder, output_folder = Path(sac_folder), Path(output_folder)
+        os.makedirs(output_folder, exist_ok=True)
+
+        catalog = SACCatalog(sac_folder, pattern)
+        stations = {}
+        for file, net, sta, loc in zip(catalog.files, catalog['knetwk'], catalog['kstnm'], catalog['khole']):
+            stations.setdefault("{0}.{1}.{2}".format(net, sta, loc or ''), []).append(file)
+        stations = [_Station(key, stations[key]) for key in sorted(stations)]
+
+        pipeline = self
+        if any(name == "resample" and params.get("delta") is None for name, params in self.stages):
+            # resolved over the whole folder before resume picks stations, the manifest key holds the value
+            delta = self.default_delta(catalog)
+            pipeline = Pipeline([(name, dict(params, delta=delta) if name == "resample" and params.get("delta") is None
+                                  else params) for name, params in self.stages], save=self.save)
+
+        # resume: only stations with new or changed input files, or new stage parameters, run again
+        if resume:
+            manifest = Manifest(output_folder)
+            if len(manifest) > 0:
+                manifest.compact()
+            stations = [station for station in stations
+                        if not manifest.group_done(station.key, "pipeline", pipeline.stages, station.sac_files)]
+        return run_parallel(partial(pipeline.run_station, output_folder=output_folder, resume=resume),
+                            stations, workers, name="pipeline", log_file=log_file)
@@ -3,11 +3,19 @@ import json
 import pathlib
 from pathlib import Path
 from datetime import datetime
+from functools import partial
+from typing import Optional
 
-from SacPy import SACShell
+from SacPy import SACShell, read
+from SacPy.io.reference import set_event
+from SacPy.util.manifest import pending, recorded
+from SacPy.util.parallel import run_parallel, ParallelReport
 
+root_folder = pathlib.Path(__file__).resolve().parent
+log_file = root_folder.joinpath("project.log").as_posix()
 
-def add_event_info(sac_folder: Path, info: dict) -> None:
+
+def _add_event_info(sac_file: list, sac_folder: Path, info: dict) -> None:
     time: datetime = info["time"]
     jday = time.strftime("%j")
     msec = int(time.microsecond / 1000)
@@ -16,17 +24,46 @@ def add_event_info(sac_folder: Path, info: dict) -> None:
     evlo = info["longitude"]
     evdp = info["depth"]
 
+    _sac = SACShell(sac_folder, show_log=True)
+    _sac.r(*sac_file)
+    _sac.cmd("synchronize")
+    _sac.cmd("ch o gmt {0} {1} {2} {3} {4} {5}".format(
+        time.year, jday, time.hour, time.minute, time.second, msec))
+    _sac.cmd("ch allt (0 - &1,o&) iztype IO")
+    _sac.cmd("ch evlo {0} evla {1} evdp {2}".format(evlo, evla, evdp))
+    _sac.wh()
+    _sac.close()
+
+
+def _add_event_info_native(sac_file: list, sac_folder: Path, info: dict) -> None:
+    time: datetime = info["time"]
+    time = time.replace(microsecond=int(time.microsecond / 1000) * 1000)
+
+    for name in sac_file:
+        tr = read(sac_folder.joinpath(name), headonly=True)
+        set_event(tr.header, time, info["latitude"], info["longitude"], info["depth"])
+        tr.write_header()
+
+
+def add_event_info(sac_folder: Path, info: dict, *, workers: int = 1, native: bool = False,
+                   resume: bool = False) -> ParallelReport:
+    sac_file = None
+    if resume:
+        sac_file = [pathlib.Path(f).name for f in pending(sac_folder, sorted(glob.glob("{0}/*.SAC".format(sac_folder))),
+                                                          "eventinfo", info)]
+
+    if native:
+        # only the changed header words are patched in place, the waveforms are never read
+        return run_parallel(recorded(partial(_add_event_info_native, sac_folder=sac_folder, info=info),
+                                     sac_folder, "eventinfo", info, resume),
+                            split(sac_folder, 50, sac_file), workers,
+                            name="eventinfo", log_file=log_file)
+
     # limit: a group of 50 *.SAC
-    for sac_file in split(sac_folder, 50):
-        _sac = SACShell(sac_folder, show_log=True)
-        _sac.r(*sac_file)
-        _sac.cmd("synchronize")
-        _sac.cmd("ch o gmt {0} {1} {2} {3} {4} {5}".format(
-            time.year, jday, time.hour, time.minute, time.second, msec))
-        _sac.cmd("ch allt (0 - &1,o&) iztype IO")
-        _sac.cmd("ch evlo {0} evla {1} evdp {2}".format(evlo, evla, evdp))
-        _sac.wh()
-        _sac.close()
+    return run_parallel(recorded(partial(_add_event_info, sac_folder=sac_folder, info=info),
+                                 sac_folder, "eventinfo", info, resume),
+                        split(sac_folder, 50, sac_file), workers,
+                        name="eventinfo", log_file=log_file)
 
 
 def read_info(info_file: Path) -> dict:
@@ -42,8 +79,9 @@ def read_info(info_file: Path) -> dict:
     return info
 
 
-def split(sac_folder: Path, n: int) -> list[list]:
-    sac_file = [pathlib.Path(sac_file).name for sac_file in sorted(glob.glob("{0}/*.SAC".format(sac_folder)))]
+def split(sac_folder: Path, n: int, sac_file: Optional[list] = None) -> list[list]:
+    if sac_file is None:
+        sac_file = [pathlib.Path(sac_file).name for sac_file in sorted(glob.glob("{0}/*.SAC".format(sac_folder)))]
     sac_file_split = list()
     for i in range(0, len(sac_file), n):
         if i + n in range(0, len(sac_file)):
@@ -54,14 +92,14 @@ def split(sac_folder: Path, n: int) -> list[list]:
 
 
 def main():
-    root_folder = pathlib.Path(__file__).resolve().parent
     data_folder = root_folder.parent.joinpath('data')
 
     sac_folder = data_folder.joinpath('SAC')
     info_file = data_folder.joinpath('CMTSOLUTION.json')
 
     info = read_info(info_file=info_file)
-    add_event_info(sac_folder=sac_folder, info=info)
+    resume = False
+    add_event_info(sac_folder=sac_folder, info=info, resume=resume)
 
 
 if __name__ == "__main__":
@@ -1,28 +1,73 @@
+import os
 import glob
 import pathlib
+from functools import partial
 from pathlib import Path
+from typing import Optional
 
-from SacPy import SACShell
+from SacPy import SACShell, SACShellPool, read_many
+from SacPy.signal import filter_traces
+from SacPy.util.manifest import pending, recorded
+from SacPy.util.parallel import run_parallel, ParallelReport
 
+root_folder = pathlib.Path(__file__).resolve().parent
+log_file = root_folder.joinpath("project.log").as_posix()
 
-def filter_(sac_folder: Path, frequency: tuple):
-    for sac_file in sorted(glob.glob("{0}/*.SAC".format(sac_folder))):
-        sac_file = pathlib.Path(sac_file)
-        _sac = SACShell(sac_folder, show_log=True)
-        _sac.r(sac_file.name)
-        _sac.cmd("bp c {0} {1} n 2 p 2".format(*frequency))
-        _sac.w_over()
-        _sac.close()
+
+def _commands(sac_file: Path, frequency: tuple, cwd_folder: Path) -> list:
+    return ["r {0}".format(os.path.relpath(sac_file, cwd_folder)),
+            "bp c {0} {1} n 2 p 2".format(*frequency),
+            "w over"]
+
+
+def _filter(sac_file: Path, frequency: tuple) -> None:
+    _sac = SACShell(sac_file.parent, show_log=True)
+    for cmd in _commands(sac_file, frequency, sac_file.parent):
+        _sac.cmd(cmd)
+    _sac.close()
+
+
+def _filter_native(sac_files: list, frequency: tuple) -> None:
+    traces = read_many(sac_files)
+    filter_traces(traces, frequency, 'bandpass', poles=2, passes=2)
+    for tr in traces:
+        tr.write()
+
+
+def filter_(sac_folder: Path, frequency: tuple, *,
+            pool: Optional[SACShellPool] = None, workers: int = 1,
+            native: bool = False, batch: int = 256, resume: bool = False) -> ParallelReport:
+    sac_files = [pathlib.Path(sac_file) for sac_file in sorted(glob.glob("{0}/*.SAC".format(sac_folder)))]
+
+    # resume: files already filtered with these corners are never filtered twice; after a change of
+    # corners every file is filtered again on top of the old result, so start again from unfiltered data
+    params = {"frequency": list(frequency)}
+    if resume:
+        sac_files = pending(sac_folder, sac_files, "filter", params)
+
+    if native:
+        # in-process `bp c f1 f2 n 2 p 2`, a batch of files at a time
+        batches = [sac_files[i:i + batch] for i in range(0, len(sac_files), batch)]
+        return run_parallel(recorded(partial(_filter_native, frequency=frequency), sac_folder, "filter", params, resume),
+                            batches, workers, name="filter", log_file=log_file)
+
+    if pool is not None:
+        return run_parallel(recorded(lambda sac_file: pool.run(_commands(sac_file, frequency, pool.cwd_folder),
+                                                               check=True), sac_folder, "filter", params, resume),
+                            sac_files, pool.size, name="filter", log_file=log_file, threads=True)
+
+    return run_parallel(recorded(partial(_filter, frequency=frequency), sac_folder, "filter", params, resume),
+                        sac_files, workers, name="filter", log_file=log_file)
 
 
 def main():
-    root_folder = pathlib.Path(__file__).resolve().parent
     data_folder = root_folder.parent.joinpath('data')
 
     sac_folder = data_folder.joinpath('SAC-N')
     f = (0.02, 0.2)
+    resume = False
 
-    filter_(sac_folder=sac_folder, frequency=f)
+    filter_(sac_folder=sac_folder, frequency=f, resume=resume)
 
 
 if __name__ == "__main__":
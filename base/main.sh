@@ -3,20 +3,9 @@
 # SEED格式转SAC
 python rdseed.py
 
-# 合并数据（重命名）
-python merge.py
+# 合并数据、添加事件、去除仪器响应、分量旋转、滤波、重采样
+# 每个台站只读写一次，参数见 config.json（save 可保存指定步骤的中间结果）
+python pipeline.py
 
-# 添加事件
-python eventinfo.py
-
-# 去除仪器响应（去均值、去线性趋势和波形尖灭）
-python transfer.py
-
-# 分量旋转（数据裁窗）
-python rotate.py
-
-# 滤波
-python filter.py
-
-# 数据重采样
-python resample.py
+# 数据质量表（振幅比、信噪比、削波与死道标记），保存在数据目录中供画图和叠加筛选台站
+python quality.py
@@ -1,18 +1,60 @@
 import glob
 import os
 import pathlib
+from functools import partial
 from pathlib import Path
+from typing import Optional
 
-from SacPy import SACShell
+from SacPy import SACShell, read_many
+from SacPy.signal import merge_traces
+from SacPy.util.manifest import Manifest, record
+from SacPy.util.parallel import run_parallel, ParallelReport
 
+root_folder = pathlib.Path(__file__).resolve().parent
+log_file = root_folder.joinpath("project.log").as_posix()
 
-def merge(key_merge: list, sac_folder: Path) -> None:
-    for key in key_merge:
-        _sac = SACShell(sac_folder, show_log=True)
-        _sac.r("*.{0}".format(key))
-        _sac.cmd("merge")
-        _sac.w(key)
-        _sac.close()
+
+def _segments(key: str, sac_folder: Path) -> list:
+    return sorted(sac_folder.glob("*.{0}".format(key)))
+
+
+def _merge(key: str, sac_folder: Path, params: dict, resume: bool = False) -> None:
+    _sac = SACShell(sac_folder, show_log=True)
+    _sac.r("*.{0}".format(key))
+    _sac.cmd("merge")
+    _sac.w(key)
+    _sac.close()
+    if resume:
+        record(sac_folder, sac_folder.joinpath(key), "merge", params, group=key, inputs=_segments(key, sac_folder))
+
+
+def _merge_native(key: str, sac_folder: Path, gap: str, resume: bool = False) -> None:
+    traces = read_many(_segments(key, sac_folder))
+    merged = merge_traces(traces, gap=gap)
+    if len(merged) != 1:
+        raise ValueError("{0}: segments belong to {1} traces".format(key, len(merged)))
+    merged[0].write(sac_folder.joinpath(key))
+    if resume:
+        record(sac_folder, sac_folder.joinpath(key), "merge", {"gap": gap, "native": True},
+               group=key, inputs=_segments(key, sac_folder))
+
+
+def merge(key_merge: list, sac_folder: Path, *, native: bool = False,
+          gap: str = 'zero', workers: int = 1, resume: bool = False) -> ParallelReport:
+    # resume: keys merged before from the same segments are skipped
+    params = {"gap": gap, "native": native}
+    if resume:
+        manifest = Manifest(sac_folder)
+        key_merge = [key for key in key_merge
+                     if not manifest.group_done(key, "merge", params, _segments(key, sac_folder))]
+
+    if native:
+        # segments grouped by header trace id and sorted by start time, gaps filled by the gap policy
+        return run_parallel(partial(_merge_native, sac_folder=sac_folder, gap=gap, resume=resume),
+                            key_merge, workers, name="merge", log_file=log_file)
+
+    return run_parallel(partial(_merge, sac_folder=sac_folder, params=params, resume=resume),
+                        key_merge, workers, name="merge", log_file=log_file)
 
 
 def read_file(sac_folder: Path) -> list:
@@ -26,26 +68,32 @@ def read_file(sac_folder: Path) -> list:
     return sorted(key_merge)
 
 
-def rename(sac_folder: Path) -> None:
+def rename(sac_folder: Path, key_merge: Optional[list] = None) -> None:
+    # segments of a merged key move to segments/, so they neither overwrite the merged file
+    # nor get processed again by the later stages
+    key_merge = set(key_merge or [])
     for sac_file in sorted(glob.glob("{0}/*.SAC".format(sac_folder))):
         sac_file = pathlib.Path(sac_file)
         new_sac_file = '.'.join(sac_file.name.split('.')[6:])
-        if new_sac_file != '':
+        if new_sac_file in key_merge:
+            os.makedirs(sac_folder.joinpath("segments"), exist_ok=True)
+            os.rename(sac_file, sac_folder.joinpath("segments", sac_file.name))
+        elif new_sac_file != '':
             new_sac_file = sac_folder.joinpath(new_sac_file)
             os.rename(sac_file, new_sac_file)
 
 
 def main():
-    root_folder = pathlib.Path(__file__).resolve().parent
     data_folder = root_folder.parent.joinpath('data')
 
     sac_folder = data_folder.joinpath('SAC')
+    resume = False
 
     key_merge = read_file(sac_folder=sac_folder)
     if key_merge != list():
-        merge(key_merge=key_merge, sac_folder=sac_folder)
+        merge(key_merge=key_merge, sac_folder=sac_folder, resume=resume)
 
-    rename(sac_folder=sac_folder)
+    rename(sac_folder=sac_folder, key_merge=key_merge)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+import json
+import pathlib
+from pathlib import Path
+
+from SacPy.util.pipeline import Pipeline
+from SacPy.util.parallel import ParallelReport
+
+from eventinfo import read_info
+
+root_folder = pathlib.Path(__file__).resolve().parent
+log_file = root_folder.joinpath("project.log").as_posix()
+
+
+def read_config(config_file: Path, data_folder: Path) -> dict:
+    # folders and files in the config are relative to the data folder
+    config = json.load(open(config_file, encoding="utf-8"))
+    for stage in config["stages"]:
+        if stage["name"] == "eventinfo":
+            info = read_info(data_folder.joinpath(stage.pop("info_file")))
+            stage.update(time=info["time"], latitude=info["latitude"],
+                         longitude=info["longitude"], depth=info["depth"])
+        elif stage["name"] == "transfer":
+            stage["sac_pzs_folder"] = data_folder.joinpath(stage["sac_pzs_folder"])
+    config["sac_folder"] = data_folder.joinpath(config["sac_folder"])
+    config["output_folder"] = data_folder.joinpath(config["output_folder"])
+    return config
+
+
+def pipeline(config: dict) -> ParallelReport:
+    # a resample "delta": null is the most common delta of the traces reaching the stage (Pipeline.default_delta)
+    return Pipeline.from_config(config).run(config["sac_folder"], config["output_folder"],
+                                            workers=config.get("workers", 1), log_file=log_file,
+                                            resume=config.get("resume", True))
+
+
+def main():
+    data_folder = root_folder.parent.joinpath('data')
+
+    config = read_config(config_file=root_folder.joinpath('config.json'), data_folder=data_folder)
+    pipeline(config=config)
+
+
+if __name__ == "__main__":
+    main()
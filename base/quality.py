@@ -0,0 +1,26 @@
+import pathlib
+from pathlib import Path
+from typing import Optional
+
+from SacPy.signal.quality import SACQuality
+
+root_folder = pathlib.Path(__file__).resolve().parent
+
+
+def quality(sac_folder: Path, pattern: str = "*.SAC", *,
+            windows: Optional[dict] = None, batch: int = 256) -> SACQuality:
+    # the table is saved next to the header catalog, one per pattern and windows; files already in it are not read again
+    return SACQuality(sac_folder, pattern, windows=windows, batch=batch)
+
+
+def main():
+    data_folder = root_folder.parent.joinpath('data')
+
+    sac_folder = data_folder.joinpath('SAC-N')
+
+    table = quality(sac_folder=sac_folder)
+    print("{0} traces, {1} dead, {2} clipped".format(len(table), table['dead'].sum(), table['clipped'].sum()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,93 @@
-import glob
+import os
 import pathlib
+from functools import partial
 from pathlib import Path
+from typing import Optional
 
-from SacPy import SACShell, SACLst
+from numpy import unique
 
+from SacPy import SACShell, SACShellPool, SACCatalog, SACLst, read_many
+from SacPy.signal import resample_traces
+from SacPy.util.manifest import recorded
+from SacPy.util.parallel import run_parallel, ParallelReport
 
-def period_default(sac_folder: Path) -> float:
-    _period = {}
-    for sac_file in sorted(glob.glob("{0}/*.SAC".format(sac_folder))):
-        sac_file = pathlib.Path(sac_file)
-        lst = SACLst(sac_file=sac_file)
-        delta = lst.get_header('delta')
-        if delta not in _period:
-            _period[delta] = 1
-        else:
-            _period[delta] += 1
-    delta = float(max(_period, key=_period.get))
+root_folder = pathlib.Path(__file__).resolve().parent
+log_file = root_folder.joinpath("project.log").as_posix()
+
+
+def _period_mode(deltas) -> float:
+    _period, count = unique(deltas, return_counts=True)
+    delta = float(_period[count.argmax()])
     return delta
 
 
-def resample(sac_folder: Path, period_resample):
+def period_default(sac_folder: Path) -> float:
+    return _period_mode(SACCatalog(sac_folder)['delta'])
+
+
+def _commands(sac_file: Path, period_resample: float, cwd_folder: Path) -> list:
+    delta = SACLst(sac_file=sac_file).get_header('delta')
+    cmds = ["r {0}".format(os.path.relpath(sac_file, cwd_folder))]
+    if delta < period_resample:
+        cmds.append("lp c {0}".format(0.5 / period_resample))
+    cmds.append("interpolate delta {0}".format(period_resample))
+    cmds.append("w over")
+    return cmds
+
+
+def _resample(sac_file: Path, period_resample: float) -> None:
+    _sac = SACShell(sac_file.parent, show_log=True)
+    for cmd in _commands(sac_file, period_resample, sac_file.parent):
+        _sac.cmd(cmd)
+    _sac.close()
+
+
+def _resample_native(sac_files: list, period_resample: float) -> None:
+    traces = read_many(sac_files)
+    resample_traces(traces, period_resample)
+    for tr in traces:
+        tr.write()
+
+
+def resample(sac_folder: Path, period_resample, *,
+             pool: Optional[SACShellPool] = None, workers: int = 1,
+             native: bool = False, batch: int = 256, resume: bool = False) -> ParallelReport:
+    table = SACCatalog(sac_folder).table(['delta'])
     if period_resample is None:
-        period_resample = period_default(sac_folder)
-    for sac_file in sorted(glob.glob("{0}/*.SAC".format(sac_folder))):
-        sac_file = pathlib.Path(sac_file)
-        lst = SACLst(sac_file=sac_file)
-        delta = lst.get_header('delta')
-        if delta != period_resample:
-            _sac = SACShell(sac_folder, show_log=True)
-            _sac.r(sac_file.name)
-            if delta < period_resample:
-                _sac.cmd("lp c {0}".format(0.5 / period_resample))
-            _sac.cmd("interpolate delta {0}".format(period_resample))
-            _sac.w_over()
-            _sac.close()
+        period_resample = _period_mode(table['delta'])
+    # files already at the target delta are skipped anyway, resume only keeps the manifest up to date
+    sac_files = [pathlib.Path(sac_file) for sac_file, delta in zip(table['file'], table['delta'])
+                 if delta != period_resample]
+    params = {"delta": period_resample}
+
+    if native:
+        # order by source delta so that each batch holds traces that resample together
+        deltas = dict(zip(table['file'], table['delta']))
+        sac_files = sorted(sac_files, key=lambda sac_file: deltas[sac_file.as_posix()])
+        batches = [sac_files[i:i + batch] for i in range(0, len(sac_files), batch)]
+        return run_parallel(recorded(partial(_resample_native, period_resample=period_resample),
+                                     sac_folder, "resample", params, resume),
+                            batches, workers, name="resample", log_file=log_file)
+
+    if pool is not None:
+        return run_parallel(
+            recorded(lambda sac_file: pool.run(_commands(sac_file, period_resample, pool.cwd_folder), check=True),
+                     sac_folder, "resample", params, resume),
+            sac_files, pool.size, name="resample", log_file=log_file, threads=True)
+
+    return run_parallel(recorded(partial(_resample, period_resample=period_resample),
+                                 sac_folder, "resample", params, resume),
+                        sac_files, workers, name="resample", log_file=log_file)
 
 
 def main():
-    root_folder = pathlib.Path(__file__).resolve().parent
     data_folder = root_folder.parent.joinpath('data')
 
     sac_folder = data_folder.joinpath('SAC-N')
     period_resample = None
+    resume = False
 
-    resample(sac_folder=sac_folder, period_resample=period_resample)
+    resample(sac_folder=sac_folder, period_resample=period_resample, resume=resume)
 
 
 if __name__ == "__main__":
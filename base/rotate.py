@@ -2,21 +2,110 @@ import os
 import glob
 import shutil
 import pathlib
+from functools import partial
 from pathlib import Path
-from logging import ERROR
+from logging import ERROR, INFO
 
-from SacPy import SACShell, SACLst
+from SacPy import SACShell, SACCatalog, read
+from SacPy.signal.rotate import check_triplet, rotate_stations
 from SacPy.util.logging import get_logger
+from SacPy.util.manifest import Manifest, record
+from SacPy.util.parallel import run_parallel, ParallelReport
 
 root_folder = pathlib.Path(__file__).resolve().parent
-_logging = get_logger(name="rotate", log_file=root_folder.joinpath("project.log").as_posix())
+log_file = root_folder.joinpath("project.log").as_posix()
+_logging = get_logger(name="rotate", log_file=log_file)
+
+
+def _rotate(job: tuple, sac_folder: Path) -> None:
+    key, begin, end = job
+    bhz, bhn, bhe = [key + ".{0}.M.SAC".format(c) for c in ('BHZ', 'BHN', 'BHE')]
+
+    _sac = SACShell(sac_folder, show_log=True)
+    _sac.cmd("cut {0} {1}".format(begin, end))
+    _sac.r(bhn, bhe)
+    _sac.cmd("rotate to gcp")
+    _sac.cmd("ch file 1 KCMPNM BHR")
+    _sac.cmd("ch file 2 KCMPNM BHT")
+
+    r, t = bhn.replace('BHN', 'BHR') + '.dis', bhe.replace('BHE', 'BHT') + '.dis'
+    _sac.w(r, t)
+
+    _sac.r(bhz)
+    z = bhz + '.dis'
+    _sac.w(z)
+
+    _sac.close()
+
+
+def _inputs(key: str, sac_folder: Path) -> list:
+    return [sac_folder.joinpath("{0}.{1}.M.SAC".format(key, c)) for c in ('BHZ', 'BHN', 'BHE')]
+
+
+def _error(e: Exception) -> str:
+    return "{0}: {1}".format(type(e).__name__, e)
+
+
+def _rotate_native(keys: list, sac_folder: Path, new_sac_folder: Path, begin_of_record, end_of_record,
+                   resume: bool = False) -> dict:
+    # the errors by station: one station that cannot be read, checked, cut or written never stops the others
+    errors, triplets, names = {}, [], []
+    for key in keys:
+        try:
+            triplet = tuple(read(sac_folder.joinpath("{0}.{1}.M.SAC".format(key, c))) for c in ('BHZ', 'BHN', 'BHE'))
+            check_triplet(*triplet)
+        except Exception as e:
+            errors[key] = _error(e)
+            continue
+        triplets.append(triplet)
+        names.append(key)
+
+    try:
+        results = rotate_stations(triplets, begin_of_record, end_of_record)
+    except Exception:
+        # the batch is rotated in one go, find the station that spoils it one at a time
+        results = []
+        for key, triplet in zip(names, triplets):
+            try:
+                results.extend(rotate_stations([triplet], begin_of_record, end_of_record))
+            except Exception as e:
+                errors[key] = _error(e)
+                results.append(None)
+
+    for key, traces in zip(names, results):
+        if traces is None:
+            continue
+        try:
+            for tr in traces:
+                new_sac_file = new_sac_folder.joinpath("{0}.{1}.M.SAC".format(key, tr.header.kcmpnm))
+                tr.write(new_sac_file)
+                if resume:
+                    record(new_sac_folder, new_sac_file, "rotate", {"begin": begin_of_record, "end": end_of_record},
+                           group=key, inputs=_inputs(key, sac_folder))
+        except Exception as e:
+            errors[key] = _error(e)
+    return errors
+
+
+def _get_report(keys: list, errors: dict, report: ParallelReport) -> ParallelReport:
+    # one item per station, whether the stations ran one by one or in batches
+    errors = {i: errors[key] for i, key in enumerate(keys) if key in errors}
+    results = [None if i in errors else key for i, key in enumerate(keys)]
+    report = ParallelReport("rotate", keys, results, errors, report.elapsed, report.workers)
+    for i in sorted(errors):
+        _logging.log(level=ERROR, msg="{0}: {1}".format(keys[i], errors[i].splitlines()[0]))
+    _logging.log(level=INFO, msg=str(report))
+    return report
 
 
 def rotate(sac_folder: Path, new_sac_folder: Path,
-           keys: list, begin_of_record, end_of_record) -> None:
+           keys: list, begin_of_record, end_of_record, *, workers: int = 1,
+           native: bool = False, batch: int = 200, resume: bool = False) -> ParallelReport:
     if not os.path.exists(new_sac_folder):
         os.makedirs(new_sac_folder)
 
+    catalog = SACCatalog(sac_folder)
+    jobs, rejected = [], {}
     for key in keys:
         bhz = key + ".BHZ.M.SAC"
         bhz = sac_folder.joinpath(bhz)
@@ -28,36 +117,24 @@ def rotate(sac_folder: Path, new_sac_folder: Path,
         bhe = sac_folder.joinpath(bhe)
 
         if not os.path.exists(bhz):
-            _logging.log(level=ERROR, msg="{0}: Vertical component missing".format(key))
+            rejected[key] = "Vertical component missing"
             continue
 
         if not os.path.exists(bhe) or not os.path.exists(bhn):
-            _logging.log(level=ERROR, msg="{0}: Horizontal component missing".format(key))
+            rejected[key] = "Horizontal component missing"
             continue
 
-        lst = SACLst(sac_file=bhe)
-        e_cmpaz = lst.get_header('cmpaz')
-
-        lst = SACLst(sac_file=bhn)
-        n_cmpaz = lst.get_header('cmpaz')
+        z_begin, z_end, z_delta = catalog.get(bhz.name, 'b', 'e', 'delta')
+        e_cmpaz, e_begin, e_end, e_delta = catalog.get(bhe.name, 'cmpaz', 'b', 'e', 'delta')
+        n_cmpaz, n_begin, n_end, n_delta = catalog.get(bhn.name, 'cmpaz', 'b', 'e', 'delta')
 
         cmpaz_delta = abs(e_cmpaz - n_cmpaz)
         if not (abs(cmpaz_delta - 90) <= 0.01 or abs(cmpaz_delta - 270) <= 0.01):
-            _logging.log(level=ERROR,
-                         msg="{0}: cmpaz1={1}, cmpaz2={2} are not orthogonal!".format(key, e_cmpaz, n_cmpaz))
+            rejected[key] = "cmpaz1={0}, cmpaz2={1} are not orthogonal!".format(e_cmpaz, n_cmpaz)
             continue
 
-        lst = SACLst(sac_file=bhz)
-        z_begin, z_end, z_delta = lst.get_header('b', 'e', 'delta')
-
-        lst = SACLst(sac_file=bhe)
-        e_begin, e_end, e_delta = lst.get_header('b', 'e', 'delta')
-
-        lst = SACLst(sac_file=bhn)
-        n_begin, n_end, n_delta = lst.get_header('b', 'e', 'delta')
-
         if not (float(z_delta) == float(e_delta) and float(z_delta) == float(n_delta)):
-            print("{0}: delta not equal!".format(key))
+            rejected[key] = "delta not equal!"
             continue
 
         if begin_of_record is None:
@@ -70,26 +147,47 @@ def rotate(sac_folder: Path, new_sac_folder: Path,
         else:
             end = end_of_record
 
-        _sac = SACShell(sac_folder, show_log=True)
-        _sac.cmd("cut {0} {1}".format(begin, end))
-        _sac.r(bhn.name, bhe.name)
-        _sac.cmd("rotate to gcp")
-        _sac.cmd("ch file 1 KCMPNM BHR")
-        _sac.cmd("ch file 2 KCMPNM BHT")
-
-        r, t = bhn.name.replace('BHN', 'BHR') + '.dis', bhe.name.replace('BHE', 'BHT') + '.dis'
-        _sac.w(r, t)
-
-        _sac.r(bhz.name)
-        z = bhz.name + '.dis'
-        _sac.w(z)
-
-        _sac.close()
+        jobs.append((key, begin, end))
+
+    # resume: stations whose outputs were made from the current input files are skipped
+    params = {"begin": begin_of_record, "end": end_of_record}
+    if resume:
+        manifest = Manifest(new_sac_folder)
+        jobs = [job for job in jobs if not manifest.group_done(job[0], "rotate", params, _inputs(job[0], sac_folder))]
+    # the report has every station asked for and not yet done, the rejected ones as failed
+    pending = {job[0] for job in jobs}
+    stations = [key for key in keys if key in rejected or key in pending]
+
+    if native:
+        # cut, rotate to gcp and write straight into new_sac_folder, a batch of stations at a time
+        keys = [job[0] for job in jobs]
+        batches = [keys[i:i + batch] for i in range(0, len(keys), batch)]
+        report = run_parallel(partial(_rotate_native, sac_folder=sac_folder, new_sac_folder=new_sac_folder,
+                                      begin_of_record=begin_of_record, end_of_record=end_of_record, resume=resume),
+                              batches, workers, name="rotate.batch", log_file=log_file)
+        errors = dict(rejected)
+        for i, batch_keys in enumerate(batches):
+            if i in report.errors:
+                errors.update((key, report.errors[i]) for key in batch_keys)
+            else:
+                errors.update(report.results[i])
+        return _get_report(stations, errors, report)
+
+    # the .dis files are only moved once every station is done
+    report = run_parallel(partial(_rotate, sac_folder=sac_folder), jobs, workers,
+                          name="rotate.station", log_file=log_file)
 
     for sac_file in sorted(glob.glob("{0}/*.dis".format(sac_folder))):
         sac_file = pathlib.Path(sac_file)
         new_sac_file = new_sac_folder.joinpath(sac_file.name.replace('.dis', ''))
         shutil.move(sac_file, new_sac_file)
+        if resume:
+            key = new_sac_file.name.rsplit('.', 3)[0]
+            record(new_sac_folder, new_sac_file, "rotate", params, group=key, inputs=_inputs(key, sac_folder))
+
+    errors = dict(rejected)
+    errors.update((jobs[i][0], error) for i, error in report.errors.items())
+    return _get_report(stations, errors, report)
 
 
 def read_file(sac_folder: Path) -> list:
@@ -109,13 +207,15 @@ def main():
 
     begin_of_record = None
     end_of_record = None
+    resume = False
 
     keys = read_file(sac_folder=sac_folder)
     rotate(sac_folder=sac_folder,
            new_sac_folder=new_sac_folder,
            keys=keys,
            begin_of_record=begin_of_record,
-           end_of_record=end_of_record)
+           end_of_record=end_of_record,
+           resume=resume)
 
 
 if __name__ == "__main__":
@@ -1,34 +1,84 @@
+import os
 import glob
 import pathlib
-from logging import ERROR
+from functools import partial
 from pathlib import Path
+from typing import Optional
 
-from SacPy import SACShell
-from SacPy.util.logging import get_logger
+from SacPy import SACShell, SACShellPool, read
+from SacPy.signal import demean, detrend, taper, remove_response, find_pz
+from SacPy.util.manifest import pending, recorded
+from SacPy.util.parallel import run_parallel, ParallelReport
 
 root_folder = pathlib.Path(__file__).resolve().parent
-_logging = get_logger(name="transfer", log_file=root_folder.joinpath("project.log").as_posix())
+log_file = root_folder.joinpath("project.log").as_posix()
+
+
+def _pz_file(sac_file: Path, sac_pzs_folder: Path) -> Path:
+    net, sta, loc, chn = sac_file.name.split('.')[0:4]
+    try:
+        return find_pz(sac_pzs_folder, net, sta, loc, chn)
+    except FileNotFoundError:
+        raise FileNotFoundError("PZ file error for {0}".format(sac_file.name))
+
+
+def _commands(sac_file: Path, sac_pzs_folder: Path,
+              f: list, remove_trend: bool, cwd_folder: Path) -> list:
+    pz_file = _pz_file(sac_file, sac_pzs_folder)
+    cmds = ["r {0}".format(os.path.relpath(sac_file, cwd_folder))]
+    if remove_trend is True:
+        cmds.append("rmean; rtr; taper")
+    cmds.append("trans from pol s {0} to none freq {1} {2} {3} {4}".format(pz_file, *f))
+    cmds.append("mul 1.0e9")
+    cmds.append("w over")
+    return cmds
+
+
+def _transfer(sac_file: Path, sac_pzs_folder: Path, f: list, remove_trend: bool) -> None:
+    cmds = _commands(sac_file, sac_pzs_folder, f, remove_trend, sac_file.parent)
+    _sac = SACShell(sac_file.parent, show_log=True)
+    for cmd in cmds:
+        _sac.cmd(cmd)
+    _sac.close()
+
+
+def _transfer_native(sac_file: Path, sac_pzs_folder: Path, f: list, remove_trend: bool) -> None:
+    pz_file = _pz_file(sac_file, sac_pzs_folder)
+    tr = read(sac_file)
+    data = tr.data
+    if remove_trend is True:
+        data = taper(detrend(demean(data)))
+    tr.data = remove_response(data, tr.header.delta, pz_file, tuple(f)) * 1.0e9
+    tr.write()
 
 
 def transfer(sac_folder: Path, sac_pzs_folder: Path,
-             f: list, remove_trend: bool) -> None:
-    for sac_file in sorted(glob.glob("{0}/*.SAC".format(sac_folder))):
-        sac_file = pathlib.Path(sac_file)
-        net, sta, loc, chn = sac_file.name.split('.')[0:4]
-        pzs_file = [pathlib.Path(pz_file).name for pz_file in sorted(glob.glob(
-            "{0}/SAC_PZs_{1}_{2}_{3}_{4}_*_*".format(sac_pzs_folder, net, sta, chn, loc)))]
-        if len(pzs_file) > 1:
-            _logging.log(level=ERROR, msg="PZ file error for {0}".format(sac_file.name))
-        else:
-            pz_file = sac_pzs_folder.joinpath(pzs_file[0])
-            _sac = SACShell(sac_folder, show_log=True)
-            _sac.r(sac_file.name)
-            if remove_trend is True:
-                _sac.cmd("rmean; rtr; taper")
-            _sac.cmd("trans from pol s {0} to none freq {1} {2} {3} {4}".format(pz_file, *f))
-            _sac.cmd("mul 1.0e9")
-            _sac.w_over()
-            _sac.close()
+             f: list, remove_trend: bool, *,
+             pool: Optional[SACShellPool] = None, workers: int = 1,
+             native: bool = False, resume: bool = False) -> ParallelReport:
+    sac_files = [pathlib.Path(sac_file) for sac_file in sorted(glob.glob("{0}/*.SAC".format(sac_folder)))]
+
+    # resume: a file is never deconvolved and multiplied by 1.0e9 twice with the same f, a new f
+    # deconvolves the already corrected files once more
+    params = {"f": list(f), "remove_trend": remove_trend}
+    if resume:
+        sac_files = pending(sac_folder, sac_files, "transfer", params)
+
+    if native:
+        # rmean; rtr; taper; trans from pol s PZ to none freq f1 f2 f3 f4; mul 1.0e9
+        func = partial(_transfer_native, sac_pzs_folder=sac_pzs_folder, f=f, remove_trend=remove_trend)
+        return run_parallel(recorded(func, sac_folder, "transfer", params, resume),
+                            sac_files, workers, name="transfer", log_file=log_file)
+
+    if pool is not None:
+        return run_parallel(
+            recorded(lambda sac_file: pool.run(_commands(sac_file, sac_pzs_folder, f, remove_trend, pool.cwd_folder),
+                                               check=True), sac_folder, "transfer", params, resume),
+            sac_files, pool.size, name="transfer", log_file=log_file, threads=True)
+
+    func = partial(_transfer, sac_pzs_folder=sac_pzs_folder, f=f, remove_trend=remove_trend)
+    return run_parallel(recorded(func, sac_folder, "transfer", params, resume),
+                        sac_files, workers, name="transfer", log_file=log_file)
 
 
 def main():
@@ -41,11 +91,13 @@ def main():
     period_shortest = 0.5
 
     f = [0.8/period_longest, 1/period_longest, 1/period_shortest, 1.2/period_shortest]
+    resume = False
 
     transfer(sac_folder=sac_folder,
              sac_pzs_folder=sac_pzs_folder,
              f=f,
-             remove_trend=True)
+             remove_trend=True,
+             resume=resume)
 
 
 if __name__ == "__main__":
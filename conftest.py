@@ -0,0 +1 @@
+# pytest puts the folder of this file, the repository root, on sys.path so the tests import SacPy
@@ -1,23 +1,27 @@
-from numpy import linspace
-from pandas import Series
+from numpy import append, arange, array, concatenate, diff, flatnonzero, float64, floor, maximum, minimum, nan, \
+    repeat, unique, where
 from scipy.signal import correlate
 
+from SacPy.io.axis import TimeAxis
 from SacPy.object import dict_
+from SacPy.signal import cut_windows, correlate_windows, argpeak, peak_to_peak
+
+
+def _window(data: dict_, t0, t1):
+    # the samples between t0 and t1 on the linspace(b, e) axis of the record, as a view,
+    # with the axis and the index of the first sample
+    time = TimeAxis(data.b, data.e, data.data.size)
+    index = time.index(t0, t1)
+    return data.data[index], time, index.start
 
 
 def get_t_real_extremum(data: dict_, p: str):
     t_p = data.phases.get(p)
-    b = t_p
-    e = t_p + 10
-    data = Series(index=linspace(data.b, data.e, data.data.size), data=data.data)[b:e]
-    data_max = data.max()
-    data_min = data.min()
-    if abs(data_max) > abs(data_min):
-        data_target = data_max
-    else:
-        data_target = data_min
+    values, time, start = _window(data, t_p, t_p + 10)
+    if values.size == 0:
+        return nan
 
-    return data[data.values == data_target].index.min()
+    return time[start + argpeak(values)]
 
 
 def get_t_real_corr(
@@ -27,21 +31,42 @@ def get_t_real_corr(
     e_r = data_refer.phases.get(p) + e
     b_t = data_target.phases.get(p) - b
     e_t = data_target.phases.get(p) + e
-    time_r = linspace(data_refer.b, data_refer.e, data_refer.data.size)
-    time_t = linspace(data_target.b, data_target.e, data_target.data.size)
 
-    data_refer = Series(index=time_r, data=data_refer.data)[b_r:e_r]
-    data_target = Series(index=time_t, data=data_target.data)[b_t:e_t]
+    data_refer = _window(data_refer, b_r, e_r)[0]
+    data_target = _window(data_target, b_t, e_t)[0]
 
     if data_refer.size != 0 and data_target.size != 0:
-        corr = correlate(data_refer.values, data_target.values, mode="same")
-        time = linspace(b_t, e_t, corr.size)
+        corr = correlate(data_refer, data_target, mode="same")
+        time = TimeAxis(b_t, e_t, corr.size)
 
         return time[corr.argmax()]
     else:
         return None
 
 
+def get_t_real_corr_batch(
+        data_refer: dict_, data_targets: list,
+        p: str, b=4, e=10, subsample=True):
+    # time in every target that matches the reference's phase pick, nan where a target has no data
+    # around its own pick or another delta than the reference; all windows are cut at once and
+    # correlated in one batched fft
+    delta = data_refer.delta
+    same = [abs(item.delta - delta) <= 1e-6 * delta for item in data_targets]
+    npts = int((b + e) / delta + 1e-6) + 1
+
+    t_r = data_refer.phases.get(p)
+    reference = cut_windows([data_refer.data], data_refer.b, delta, t_r - b, npts)[0]
+    if not reference.any():
+        raise ValueError("{0}: no data around {1}".format(data_refer.id, p))
+
+    t_t = array([nan if item.phases.get(p) is None else item.phases.get(p) for item in data_targets],
+                dtype=float64)
+    windows = cut_windows([item.data if ok else item.data[:0] for item, ok in zip(data_targets, same)],
+                          [item.b for item in data_targets], delta, t_t - b, npts)
+    lags, cc = correlate_windows(reference, windows, subsample=subsample)
+    return where(windows.any(axis=1), t_t + lags * delta, nan), cc
+
+
 def filter_data_extremum(data_target: dict_, p: str, sill: float):
     b_p = data_target.b
     e_p = data_target.phases.P
@@ -49,14 +74,41 @@ def filter_data_extremum(data_target: dict_, p: str, sill: float):
     b_r = data_target.phases.get(p)
     e_r = data_target.phases.get(p) + 10
 
-    time_t = linspace(data_target.b, data_target.e, data_target.data.size)
-    data_p = Series(index=time_t, data=data_target.data)[b_p:e_p]
-    data_r = Series(index=time_t, data=data_target.data)[b_r:e_r]
+    data_p = _window(data_target, b_p, e_p)[0]
+    data_r = _window(data_target, b_r, e_r)[0]
+    if data_p.size == 0 or data_r.size == 0:
+        return False
 
-    s_p = data_p.max() - data_p.min()
-    s_r = data_r.max() - data_r.min()
+    s_p = peak_to_peak(data_p)
+    s_r = peak_to_peak(data_r)
 
     if (s_r / s_p) >= sill:
         return True
     else:
         return False
+
+
+def get_envelope(data, b, e, t0, t1, bins: int):
+    # the samples of data on linspace(b, e) that show between t0 and t1, one sample beyond each
+    # edge included, reduced to the min and max of each of bins equal time columns, in time order;
+    # windows of at most 2 * bins samples come back whole
+    time = TimeAxis(b, e, data.size)
+    index = time.index(t0, t1)
+    start, stop = max(index.start - 1, 0), min(index.stop + 1, data.size)
+    size = stop - start
+    if size <= 2 * bins:
+        index = arange(start, stop)
+        return time[index], data[index]
+
+    segment = data[start:stop]
+    column = floor((time[start:stop] - t0) / (t1 - t0) * bins)
+    starts = flatnonzero(concatenate(([True], column[1:] != column[:-1])))
+    counts = diff(append(starts, size))
+    position = arange(size)
+    # first sample of every column holding its min and its max
+    first_min = minimum.reduceat(where(segment == repeat(minimum.reduceat(segment, starts), counts), position, size),
+                                 starts)
+    first_max = minimum.reduceat(where(segment == repeat(maximum.reduceat(segment, starts), counts), position, size),
+                                 starts)
+    index = start + unique(concatenate((first_min, first_max)))
+    return time[index], data[index]
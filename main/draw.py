@@ -1,79 +1,110 @@
+import time
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
 from pathlib import Path
 from typing import Optional, Union
-from glob import glob
+from fnmatch import fnmatch
+from functools import partial
 
-from SacPy import read, SACTrace
+from SacPy import read, iter_traces, SACTrace, SACCatalog
 from SacPy.object import dict_, list_
-from data import get_t_real_corr, get_t_real_extremum, filter_data_extremum
+from SacPy.signal.quality import SACQuality
+from SacPy.signal import peak_to_peak
+from SacPy.util.parallel import run_parallel, ParallelReport
+from data import get_t_real_corr_batch, get_t_real_extremum, get_envelope
 
 
 class _ASTA:
     def __init__(self,
                  tr_list: Optional[list] = None,
                  phases_travel=True,
-                 figsize: Optional[tuple] = (18, 13)):
+                 figsize: Optional[tuple] = (18, 13), *,
+                 figure: Optional[Figure] = None):
 
         self._phases_travel = phases_travel
 
-        plt.subplots_adjust(hspace=0)
-        self.fig, (self.ax0, self.ax1, self.ax2) = plt.subplots(3, 1, figsize=figsize, dpi=100)
+        if figure is None:
+            self.fig, (self.ax0, self.ax1, self.ax2) = plt.subplots(3, 1, figsize=figsize, dpi=100)
+        else:
+            # a figure outside pyplot, drawn by Agg whatever backend pyplot would pick
+            FigureCanvasAgg(figure)
+            self.fig = figure
+            self.ax0, self.ax1, self.ax2 = figure.subplots(3, 1)
         self.fig.subplots_adjust(hspace=0)
 
+        # the artists are made once, drawing another station only changes their data;
+        # the trace stays over the phase markers added later
+        props = dict(boxstyle='round', facecolor='white', alpha=0.5)
+        self._lines, self._labels, self._markers = {}, {}, []
+        for ax in (self.ax0, self.ax1, self.ax2):
+            self._lines[ax], = ax.plot([], [], color='black', zorder=2.5)
+            self._labels[ax] = ax.text(0.02, 0.9, '', transform=ax.transAxes, fontsize=14,
+                                       verticalalignment='top', bbox=props)
+        self.ax0.set_xticks([])
+        self.ax1.set_xticks([])
+
+        self._tr0 = self._tr1 = self._tr2 = None
+        if tr_list is not None:
+            self.set_traces(tr_list)
+
+    def set_traces(self, tr_list: list):
         self._tr0, self._tr1, self._tr2 = tr_list
 
     def get_ax(self):
+        for artist in self._markers:
+            artist.remove()
+        self._markers = []
+
         self.ax0 = self._get_ax(ax=self.ax0, tr=self._tr0)
         title = '\n'.join((
             '{0} - {1}'.format(self._tr0.stats.starttime, self._tr0.stats.endtime),
         ))
         self.ax0.set_title(title, fontsize=18)
-        self.ax0.set_xticks([])
 
         self.ax1 = self._get_ax(ax=self.ax1, tr=self._tr1)
-        self.ax1.set_xticks([])
-
         self.ax2 = self._get_ax(ax=self.ax2, tr=self._tr2)
         return self.ax0, self.ax1, self.ax2
 
     def _get_ax(self, ax: Axes, tr: SACTrace):
         b, e = tr.header.get('b', 'e')
         ax.set_xlim(b, 750)
-
-        props = dict(boxstyle='round', facecolor='white', alpha=0.5)
-        ax.text(0.02, 0.9, tr.id, transform=ax.transAxes, fontsize=14,
-                verticalalignment='top', bbox=props)
+        self._labels[ax].set_text(tr.id)
 
         if self._phases_travel:
             ax = self._get_phases_travel(ax=ax, tr=tr)
 
-        ax.plot(np.linspace(b, e, tr.data.size), tr.data, color='black')
+        # the samples up to 750 s as min/max pairs per pixel column, the y limits from the whole trace
+        bins = max(int(ax.get_window_extent().width), 1)
+        self._lines[ax].set_data(*get_envelope(tr.data, b, e, b, 750, bins))
+        ax.relim()
+        ax.update_datalim([(b, tr.data.min()), (b, tr.data.max())])
+        ax.autoscale_view()
         return ax
 
-    @staticmethod
-    def _get_phases_travel(ax: Axes, tr: SACTrace):
+    def _get_phases_travel(self, ax: Axes, tr: SACTrace):
         header = tr.header
         for kt in header.kt.keys():
             tn = header.kt.get(kt)
-            ax.axvline(tn, color='red', ymin=0.02, ymax=0.98)
-            ax.text(*(tn + 5, tr.data.min()), kt, fontsize=14, color='red')
+            self._markers.append(ax.axvline(tn, color='red', ymin=0.02, ymax=0.98))
+            self._markers.append(ax.text(*(tn + 5, tr.data.min()), kt, fontsize=14, color='red'))
 
         return ax
 
     def get_file(self, out_file: Optional[Path]):
         self.get_ax()
-        plt.savefig(fname=out_file.as_posix())
+        self.fig.savefig(fname=out_file.as_posix())
         self.close()
 
     def show(self):
         self.get_ax()
         plt.show()
 
-    @staticmethod
-    def close():
-        plt.close()
+    def close(self):
+        plt.close(self.fig)
 
 
 class _ASOfSTA:
@@ -85,7 +116,8 @@ class _ASOfSTA:
                  gcarc: Optional[tuple] = (90, 180),
                  az: Optional[tuple] = (0, 30),
                  figsize: Optional[tuple] = (10, 13),
-                 real: Optional[bool] = True):
+                 real: Optional[bool] = True,
+                 catalog: Optional[SACCatalog] = None):
 
         if sac_folder.exists():
             self._sac_folder = sac_folder
@@ -98,6 +130,8 @@ class _ASOfSTA:
         self._az_b, self._az_e = az
         self._is_real = real
         self._refer = refer
+        # pass the same catalog to draw several windows of an event from one header index
+        self._catalog = catalog
 
         self._data = list_()
 
@@ -110,32 +144,57 @@ class _ASOfSTA:
     def read_data(self, sac_file):
         if type(sac_file) is str:
             sac_file = self._sac_folder.joinpath(sac_file)
-        tr = read(sac_file)
+        header = read(sac_file, headonly=True).header
+
+        if not (self._gcarc_b <= header.gcarc <= self._gcarc_e and self._az_b <= header.az <= self._az_e):
+            if sac_file.name != self._refer:
+                return None
+
+        return self._read_data(sac_file)
+
+    @classmethod
+    def _read_data(cls, sac_file: Path):
+        return cls._get_record(read(sac_file))
+
+    @staticmethod
+    def _get_record(tr: SACTrace):
         header = tr.header
 
+        # times stay the float32 words of the header, so the windows of data.py fall on the same samples
+        # as the float32 linspace axis they were picked on
         data = dict_({"id": tr.id,
                       "data": tr.data,
                       "gcarc": header.gcarc,
                       "az": header.az,
-                      "b": header.b,
-                      "e": header.e,
-                      "phases": header.kt})
+                      "b": np.float32(header.b),
+                      "e": np.float32(header.e),
+                      "delta": np.float32(header.delta),
+                      "phases": dict_({k: np.float32(v) for k, v in header.kt.items()})})
 
-        if self._gcarc_b <= header.gcarc <= self._gcarc_e and self._az_b <= header.az <= self._az_e:
-            return data
-        else:
-            if sac_file.name == self._refer:
-                return data
-            else:
-                return None
+        return data
 
-    def _get_data(self):
-        for sac_file in sorted(glob("{0}/*.{1}.*.SAC".format(self._sac_folder, self._channel))):
-            sac_file = Path(sac_file)
+    @property
+    def catalog(self) -> SACCatalog:
+        if self._catalog is None:
+            self._catalog = SACCatalog(self._sac_folder)
+        return self._catalog
 
-            data = self.read_data(sac_file)
-            if data is not None:
-                self._data.append(data)
+    def _get_data(self):
+        # stations are picked from the header index, only their waveforms and the reference's are read
+        catalog = self.catalog
+        pattern = "*.{0}.*.SAC".format(self._channel)
+        index = catalog.query(pattern,
+                              gcarc=(self._gcarc_b, self._gcarc_e),
+                              az=(self._az_b, self._az_e))
+        names = set(catalog.names[index])
+        if fnmatch(self._refer, pattern) and self._sac_folder.joinpath(self._refer).exists():
+            names.add(self._refer)
+
+        names = sorted(names)
+        for name, tr in zip(names, iter_traces([self._sac_folder.joinpath(name) for name in names])):
+            record = self._get_record(tr)
+            record["name"] = name
+            self._data.append(record)
 
         self._data.sort(key=lambda r: r.gcarc)
 
@@ -150,15 +209,14 @@ class _ASOfSTA:
         t_refer = phases.get(self._phase)
         self.ax.axvline(t_refer, color='red', ymin=0.02, ymax=0.98)
 
+        lines = []
         for item in self._data:
-            b, e, t = item.b, item.e, item.phases.get(self._phase)
-            data = item.data / 1000 + item.gcarc * 10
-            time = np.linspace(b, e, data.size) - (t - t_refer)
-
-            if (data.max() - data.min()) < 20:
-                self.ax.plot(time, data, color='black')
+            t = item.phases.get(self._phase)
+            if peak_to_peak(item.data) / 1000 < 20:
+                lines.append(self._get_line(item, t - t_refer, t_refer))
                 self.ax_f.text(1, item.gcarc * 10, item.id, fontsize=10)
 
+        self._add_lines(lines, t_refer)
         self._get_legend(t_refer)
 
     def _get_ax_real(self):
@@ -167,25 +225,60 @@ class _ASOfSTA:
         t_refer = get_t_real_extremum(data_refer, self._phase)
         self.ax.axvline(t_refer, color='red', ymin=0.02, ymax=0.98)
 
-        for item in self._data:
-            b, e = item.b, item.e
-            t = get_t_real_corr(data_refer, item, self._phase)
-
-            if t is None:
+        # every station is shifted so that its correlated phase lands on the reference's pick
+        t_phase = data_refer.phases.get(self._phase)
+        t_real, _ = get_t_real_corr_batch(data_refer, self._data, self._phase)
+        passed = self._get_passed(5)
+        lines = []
+        for item, t in zip(self._data, t_real):
+            if np.isnan(t):
                 print("{} skip!".format(item.id))
                 continue
 
-            data = item.data / 1000 + item.gcarc * 10
-            time = np.linspace(b, e, data.size) - (t - t_refer)
-
-            if filter_data_extremum(item, self._phase, 5):
-                self.ax.plot(time, data, color='black')
+            if item.name in passed:
+                lines.append(self._get_line(item, t - t_phase, t_refer))
                 self.ax_f.text(1, item.gcarc * 10, item.id, fontsize=10)
 
+        self._add_lines(lines, t_refer)
         self._get_legend(t_refer)
 
+    @staticmethod
+    def _get_xlim(time):
+        return time - 100, time + 50
+
+    def _get_line(self, item: dict_, shift: float, time) -> tuple:
+        # only what fits the figure: the samples inside xlim, as one min/max pair per pixel column;
+        # the full trace's extremes are kept for the y limits
+        t0, t1 = self._get_xlim(time)
+        bins = max(int(self.ax.get_window_extent().width), 1)
+        x, y = get_envelope(item.data, item.b, item.e, t0 + shift, t1 + shift, bins)
+        offset = item.gcarc * 10
+        limits = (item.data.min() / 1000 + offset, item.data.max() / 1000 + offset)
+        return np.column_stack((x - shift, y / 1000 + offset)), limits
+
+    def _add_lines(self, lines: list, time):
+        # one artist for the whole section instead of one Line2D per station
+        if len(lines) == 0:
+            return
+        segments = [segment for segment, _ in lines]
+        low = min(low for _, (low, _) in lines)
+        high = max(high for _, (_, high) in lines)
+        self.ax.add_collection(LineCollection(segments, colors='black', linewidths=plt.rcParams['lines.linewidth']))
+        t0, t1 = self._get_xlim(time)
+        self.ax.update_datalim([(t0, low), (t1, high)])
+        self.ax.autoscale_view()
+
+    def _get_passed(self, sill: float) -> set:
+        # stations whose phase stands out of the noise before P by sill; quality is only computed for
+        # the stations of this window and kept, one table per phase, so other windows and redraws reuse it
+        windows = {"noise": (("b", 0.), ("P", 0.)), "signal": ((self._phase, 0.), (self._phase, 10.))}
+        quality = SACQuality(self._sac_folder, "*.{0}.*.SAC".format(self._channel), windows=windows,
+                             catalog=self.catalog, update=False)
+        quality.update([item.name for item in self._data])
+        return set(quality.names[quality.query(ptp_ratio=(sill, np.inf))])
+
     def _get_legend(self, time):
-        self.ax.set_xlim(time - 100, time + 50)
+        self.ax.set_xlim(*self._get_xlim(time))
         yticks_label = [i / 10 for i in self.ax.get_yticks()]
         self.ax.set_yticks(self.ax.get_yticks(), yticks_label)
 
@@ -242,26 +335,43 @@ draw3 = _ASTA
 draw1 = _ASOfSTA
 
 
+# one draw3 per process, reused for every station the process draws
+_DRAW3 = {}
+
+
+def _get_draw3_file(job: tuple, *, figsize: tuple, phases_travel: bool) -> float:
+    files, out_file = job
+    start = time.perf_counter()
+    d = _DRAW3.get((figsize, phases_travel))
+    if d is None:
+        d = _DRAW3[(figsize, phases_travel)] = draw3(phases_travel=phases_travel,
+                                                     figure=Figure(figsize=figsize, dpi=100))
+    d.set_traces([read(file) for file in files])
+    d.get_ax()
+    d.fig.savefig(fname=out_file.as_posix())
+    return time.perf_counter() - start
+
+
 def get_draw3_file(key_list: list,
                    sac_folder: Path,
                    out_folder: Path,
                    target: Optional[str] = None,
-                   channel: Optional[str] = 'RTZ'):
+                   channel: Optional[str] = 'RTZ', *,
+                   workers: int = 1,
+                   figsize: Optional[tuple] = (18, 13)) -> ParallelReport:
+    # stations are split across worker processes, each drawing into a figure it keeps
+    jobs = []
     for key in key_list:
-        print(key)
-        file_list = [key] * 3
-        for i in range(0, 3):
-            file_list[i] = file_list[i].replace('*', 'BH' + channel[i])
-
-        tr_list = []
-        for file in file_list:
-            tr = read(sac_folder.joinpath(file))
-            tr_list.append(tr)
-
+        files = [sac_folder.joinpath(key.replace('*', 'BH' + c)) for c in channel[:3]]
         if target is None:
             out_file = "{0}.pdf".format(key.replace('.*.M.SAC', '').replace('.', '_'))
         else:
             out_file = "{0}_{1}.pdf".format(key.replace('.*.M.SAC', '').replace('.', '_'), target)
-
-        d = draw3(tr_list=tr_list, phases_travel=True)
-        d.get_file(out_file=out_folder.joinpath(out_file))
+        jobs.append((files, out_folder.joinpath(out_file)))
+
+    report = run_parallel(partial(_get_draw3_file, figsize=figsize, phases_travel=True), jobs, workers,
+                          name="draw3")
+    for key, elapsed in zip(key_list, report.results):
+        if elapsed is not None:
+            print("{0} {1:.2f} s".format(key, elapsed))
+    return report
@@ -1,6 +1,7 @@
 import numpy as np
 from pathlib import Path
 
+from SacPy import SACCatalog
 from draw import draw1
 
 
@@ -10,13 +11,16 @@ def main():
     sac_t_folder = data_folder.joinpath('SAC-T')
     out_t_folder = root_folder.joinpath('out-T')
 
-    d = draw1(sac_t_folder,
-              phase='sP', channel='BHZ',
-              gcarc=(60, 65), az=(30, 60),
-              real=True)
-    data = d.get_data()
-    print(data.size)
-    d.get_file(out_folder=out_t_folder)
+    # one header index for every window of the event
+    catalog = SACCatalog(sac_t_folder)
+    for az in [(30, 60)]:
+        d = draw1(sac_t_folder,
+                  phase='sP', channel='BHZ',
+                  gcarc=(60, 65), az=az,
+                  real=True, catalog=catalog)
+        data = d.get_data()
+        print(data.size)
+        d.get_file(out_folder=out_t_folder)
 
 
 if __name__ == "__main__":
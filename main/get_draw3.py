@@ -1,4 +1,5 @@
 import glob
+import os
 from pathlib import Path
 
 from draw import get_draw3_file
@@ -26,7 +27,8 @@ def main():
 
     key_list = read_file(sac_t_folder)
 
-    get_draw3_file(key_list, sac_folder=sac_t_folder, out_folder=out_folder, target='T', channel='RTZ')
+    get_draw3_file(key_list, sac_folder=sac_t_folder, out_folder=out_folder, target='T', channel='RTZ',
+                   workers=os.cpu_count())
 
 
 if __name__ == "__main__":
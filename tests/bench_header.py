@@ -0,0 +1,42 @@
+# Header field access timings behind the user-018 numbers:
+#     python tests/bench_header.py [tree]
+# tree is a checkout to import SacPy from, the repository root by default (see bench_read.py)
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from bench_read import make_sac_file
+
+NUMBER = 10 ** 6
+REPEAT = 5
+
+STATEMENTS = (
+    ("header.b", "header.b"),
+    ("header.npts", "header.npts"),
+    ("header.o (unset)", "header.o"),
+    ("header['b']", "header['b']"),
+    ("header.kstnm", "header.kstnm"),
+    ("header.b = 1.5", "header.b = 1.5"),
+)
+
+
+def main():
+    tree = Path(sys.argv[1] if len(sys.argv) > 1 else Path(__file__).resolve().parents[1]).resolve()
+    sys.path.insert(0, str(tree))
+    from SacPy.io.core import read
+
+    print(tree)
+    with tempfile.TemporaryDirectory() as folder:
+        for byteorder in ('<', '>'):
+            file = Path(folder).joinpath("{0}.SAC".format('le' if byteorder == '<' else 'be'))
+            make_sac_file(file, byteorder, 100, 0)
+            header = read(file).header
+            for name, statement in STATEMENTS:
+                # nanoseconds per access, the best of REPEAT runs
+                seconds = min(timeit.repeat(statement, globals={'header': header}, number=NUMBER, repeat=REPEAT))
+                print("{0} {1:18s} {2:6.0f} ns".format(byteorder, name, seconds / NUMBER * 1e9))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Header decode and read timings behind the user-001 numbers:
+#     python tests/bench_read.py [tree]
+# tree is a checkout to import SacPy from, the repository root by default; for the numbers before
+# the change, run it on a worktree of the baseline (git worktree add /tmp/baseline 407a658)
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+FILES = 500
+NPTS = 2000
+REPEAT = 5
+
+
+def make_sac_file(file: Path, byteorder: str, npts: int, seed: int) -> None:
+    # written with numpy alone, any version of SacPy reads it
+    rng = np.random.default_rng(seed)
+    floats = np.full(70, -12345, dtype=byteorder + 'f4')
+    floats[[0, 5, 6, 53]] = 0.025, -10.5, -10.5 + (npts - 1) * 0.025, 60.5
+    ints = np.full(40, -12345, dtype=byteorder + 'i4')
+    ints[[0, 1, 2, 3, 4, 5, 6, 9, 15, 35]] = 2019, 194, 0, 0, 0, 0, 6, npts, 1, 1
+    strings = bytearray(b'-12345  ' * 24)
+    strings[0:8], strings[152:160], strings[160:168] = b'SCM'.ljust(8), b'BHZ'.ljust(8), b'AK'.ljust(8)
+    data = rng.standard_normal(npts).astype(byteorder + 'f4')
+    file.write_bytes(floats.tobytes() + ints.tobytes() + bytes(strings) + data.tobytes())
+
+
+def best(func, files: list) -> float:
+    # microseconds per file, the best of REPEAT passes
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for file in files:
+            func(file)
+        times.append(time.perf_counter() - start)
+    return min(times) / len(files) * 1e6
+
+
+def main():
+    tree = Path(sys.argv[1] if len(sys.argv) > 1 else Path(__file__).resolve().parents[1]).resolve()
+    sys.path.insert(0, str(tree))
+    from SacPy.io.core import get_sac_header, read
+
+    with tempfile.TemporaryDirectory() as folder:
+        files = []
+        for i in range(FILES):
+            byteorder = '<>'[i % 2]
+            files.append((Path(folder).joinpath("{0:04d}.SAC".format(i)), byteorder))
+            make_sac_file(files[-1][0], byteorder, NPTS, i)
+
+        def decode(item):
+            file, byteorder = item
+            with open(file, 'rb') as f:
+                get_sac_header(f, byteorder + 'i4', byteorder + 'f4')
+
+        print(tree)
+        print("header decode: {0:8.1f} us per file".format(best(decode, files)))
+        print("read:          {0:8.1f} us per file".format(best(lambda item: read(item[0]), files)))
+
+
+if __name__ == "__main__":
+    main()
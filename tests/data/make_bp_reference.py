@@ -0,0 +1,99 @@
+# Writes bp_input.SAC and bp_c_0.1_1_n2_p2.SAC, the reference of tests/test_filter.py.
+#
+# With sac at hand the reference is its own output, and should be regenerated that way:
+#     sac> r bp_input.SAC
+#     sac> bp c 0.1 1 n 2 p 2
+#     sac> w bp_c_0.1_1_n2_p2.SAC
+# The file shipped here was written without a sac binary, by the port of sac's xapiir below:
+# buroots, lptbp and bilin2 (design) and apply, the filter sections and both passes in single
+# precision as sac keeps them. It shares no code with SacPy.signal.filter, which designs with scipy.
+import cmath
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from SacPy import SACTrace, write  # noqa: E402
+
+DELTA, FREQMIN, FREQMAX, POLES, NPTS = 0.05, 0.1, 1., 2, 4000
+
+
+def buroots(iord: int) -> list:
+    # Butterworth poles of the low-pass prototype, one per conjugate pair, 'SP' for the real one
+    roots = []
+    if iord % 2 == 1:
+        roots.append(('SP', complex(-1., 0.)))
+    half = math.pi / (2 * iord)
+    for k in range(1, iord // 2 + 1):
+        angle = math.pi / 2 + half * (2 * k - 1)
+        roots.append(('CP', complex(math.cos(angle), math.sin(angle))))
+    return roots
+
+
+def warp(f: float, ts: float) -> float:
+    angle = 2 * math.pi * f * ts / 2
+    return 2 * math.tan(angle) / ts / (2 * math.pi)
+
+
+def lptbp(roots: list, fl: float, fh: float) -> list:
+    # low-pass to band-pass, second order sections in s as (numerator, denominator), low order first
+    a = 4 * math.pi * math.pi * fl * fh
+    b = 2 * math.pi * (fh - fl)
+    sections = []
+    for rtype, p in roots:
+        if rtype == 'CP':
+            ctemp = cmath.sqrt((b * p) ** 2 - 4 * a)
+            for pole in (0.5 * (b * p + ctemp), 0.5 * (b * p - ctemp)):
+                sections.append(((0., b, 0.), ((pole * pole.conjugate()).real, -2 * pole.real, 1.)))
+        else:
+            sections.append(((0., b, 0.), (a, -b * p.real, 1.)))
+    return sections
+
+
+def bilin2(sections: list) -> list:
+    # s = (1 - 1/z) / (1 + 1/z), normalised so the leading denominator coefficient is one
+    digital = []
+    for sn, sd in sections:
+        scale = sd[2] + sd[1] + sd[0]
+        den = (1., 2 * (sd[0] - sd[2]) / scale, (sd[2] - sd[1] + sd[0]) / scale)
+        num = ((sn[2] + sn[1] + sn[0]) / scale, 2 * (sn[0] - sn[2]) / scale, (sn[2] - sn[1] + sn[0]) / scale)
+        digital.append((np.float32(num), np.float32(den)))
+    return digital
+
+
+def design(iord: int, fl: float, fh: float, ts: float) -> list:
+    return bilin2(lptbp(buroots(iord), warp(fl * ts / 2, 2.), warp(fh * ts / 2, 2.)))
+
+
+def apply(data: np.ndarray, sections: list, zp: bool) -> np.ndarray:
+    data = data.astype(np.float32)
+    passes = [range(data.size)] + ([range(data.size - 1, -1, -1)] if zp else [])
+    for samples in passes:
+        for (b0, b1, b2), (_, a1, a2) in sections:
+            x1 = x2 = y1 = y2 = np.float32(0.)
+            for i in samples:
+                output = b0 * data[i] + b1 * x1 + b2 * x2 - (a1 * y1 + a2 * y2)
+                y2, y1 = y1, output
+                x2, x1 = x1, data[i]
+                data[i] = output
+    return data
+
+
+def main():
+    t = np.arange(NPTS) * DELTA
+    rng = np.random.default_rng(2019)
+    # energy below, inside and above the band, a step and noise
+    data = (np.sin(2 * np.pi * 0.02 * t) + np.sin(2 * np.pi * 0.4 * t) + 0.5 * np.sin(2 * np.pi * 4. * t) +
+            (t > 100.) * 0.8 + 0.2 * rng.standard_normal(NPTS)).astype(np.float32)
+    header = {'delta': DELTA, 'b': 0., 'knetwk': 'XX', 'kstnm': 'BPREF', 'kcmpnm': 'BHZ',
+              'nzyear': 2019, 'nzjday': 194, 'nzhour': 0, 'nzmin': 0, 'nzsec': 0, 'nzmsec': 0}
+    folder = Path(__file__).resolve().parent
+    write(SACTrace(dict(header), data), folder / "bp_input.SAC", '<')
+    output = apply(data, design(POLES, FREQMIN, FREQMAX, DELTA), zp=True)
+    write(SACTrace(dict(header), output), folder / "bp_c_0.1_1_n2_p2.SAC", '<')
+
+
+if __name__ == '__main__':
+    main()
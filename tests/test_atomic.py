@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from SacPy.util.atomic import atomic_write
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    file = tmp_path / "index.npz"
+    file.write_bytes(b"old")
+    os.chmod(file, 0o640)
+    with atomic_write(file) as f:
+        f.write(b"new")
+    assert file.read_bytes() == b"new"
+    assert file.stat().st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["index.npz"]
+
+
+def test_atomic_write_keeps_file_on_error(tmp_path):
+    file = tmp_path / "manifest.jsonl"
+    file.write_text("old\n", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        with atomic_write(file, 'w', encoding="utf-8") as f:
+            f.write("half")
+            raise RuntimeError
+    assert file.read_text(encoding="utf-8") == "old\n"
+    assert os.listdir(tmp_path) == ["manifest.jsonl"]
+
+
+def test_atomic_write_new_file_permissions(tmp_path, monkeypatch):
+    umask = os.umask(0o027)
+    try:
+        # the umask is applied by the kernel, never read (and so never set) by atomic_write
+        monkeypatch.setattr(os, "umask", None)
+        with atomic_write(tmp_path / "new.SAC") as f:
+            f.write(b"")
+    finally:
+        monkeypatch.undo()
+        os.umask(umask)
+    assert (tmp_path / "new.SAC").stat().st_mode & 0o777 == 0o640
+
+
+def test_atomic_write_follows_symlink(tmp_path):
+    (tmp_path / "data").mkdir()
+    target = tmp_path / "data" / "a.SAC"
+    target.write_bytes(b"old")
+    os.chmod(target, 0o640)
+    link = tmp_path / "a.SAC"
+    link.symlink_to(target)
+    with atomic_write(link) as f:
+        f.write(b"new")
+    assert link.is_symlink() and os.readlink(link) == str(target)
+    assert target.read_bytes() == b"new" and target.stat().st_mode & 0o777 == 0o640
+    assert sorted(os.listdir(tmp_path / "data")) == ["a.SAC"]
@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from SacPy import SACTrace
+from SacPy.io.axis import TimeAxis
+from SacPy.object import dict_
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "main"))
+from data import get_envelope, _window  # noqa: E402
+
+
+def float32_headers(count: int, seed: int = 1):
+    # b, e and a sample-aligned pick, as float32 header words
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        delta = np.float32(rng.choice([0.01, 0.025, 0.05, 0.1]))
+        npts = int(rng.integers(1000, 80000))
+        b = np.float32(rng.uniform(-100, 100))
+        e = np.float32(b + (npts - 1) * delta)
+        pick = np.linspace(b, e, npts)[int(rng.integers(0, npts - 200))]
+        yield b, e, npts, pick
+
+
+def linspace_index(b, e, npts, t0, t1) -> slice:
+    time = np.linspace(b, e, npts)
+    start = time.searchsorted(t0, 'left')
+    return slice(start, max(start, time.searchsorted(t1, 'right')))
+
+
+def test_index_matches_float32_linspace():
+    for b, e, npts, pick in float32_headers(500):
+        assert TimeAxis(b, e, npts).index(pick, pick + 10) == linspace_index(b, e, npts, pick, pick + 10)
+
+
+def test_trace_time_matches_float32_linspace():
+    # the header gives python floats, the axis must still be the float32 one
+    for b, e, npts, pick in float32_headers(200, seed=2):
+        tr = SACTrace({'b': b, 'e': e, 'delta': (e - b) / (npts - 1)}, np.zeros(npts, dtype=np.float32))
+        assert tr.time.index(pick, pick + 10) == linspace_index(b, e, npts, pick, pick + 10)
+        assert tr.time[npts // 2] == np.linspace(b, e, npts)[npts // 2]
+
+
+def test_window_matches_float32_linspace():
+    for b, e, npts, pick in float32_headers(200, seed=3):
+        data = dict_({'b': b, 'e': e, 'data': np.arange(npts, dtype=np.float32)})
+        values, _, start = _window(data, pick, pick + 10)
+        index = linspace_index(b, e, npts, pick, pick + 10)
+        assert start == index.start and values.size == index.stop - index.start
+
+
+@pytest.mark.parametrize("npts", [0, 1, 2, 1001])
+def test_axis_matches_linspace(npts):
+    b, e = np.float32(-10.5), np.float32(14.5)
+    assert np.array_equal(np.asarray(TimeAxis(b, e, npts)), np.linspace(b, e, npts))
+    if npts > 0:
+        assert TimeAxis(b, e, npts)[-1] == np.linspace(b, e, npts)[-1]
+
+
+def test_index_edges():
+    time = TimeAxis(0., 9., 10)
+    assert time.index(2., 4.) == slice(2, 5)
+    assert time.index(2.5, 4.5) == slice(3, 5)
+    assert time.index(-5., -1.) == slice(0, 0)
+    assert time.index(20., 30.) == slice(10, 10)
+    assert time.index(4., 2.) == slice(4, 4)
+    with pytest.raises(IndexError):
+        time[10]
+
+
+def test_envelope_keeps_extremes():
+    data = np.sin(np.arange(20000) / 50.).astype(np.float32)
+    data[12345] = 5.
+    time, values = get_envelope(data, np.float32(0.), np.float32(19999 * 0.01), 10., 190., 100)
+    assert values.max() == 5. and values.min() == data[1000:19001].min()
+    assert np.all(np.diff(time) > 0) and time.size <= 2 * 100 + 2
+
+
+def test_index_single_sample_and_empty():
+    assert TimeAxis(np.float32(5.), np.float32(5.), 1).index(4., 6.) == slice(0, 1)
+    assert TimeAxis(np.float32(5.), np.float32(5.), 1).index(5.5, 6.) == slice(1, 1)
+    assert TimeAxis(np.float32(0.), np.float32(1.), 0).index(0., 1.) == slice(0, 0)
+
+
+def test_trace_window():
+    tr = SACTrace({'b': np.float32(-5.), 'e': np.float32(4.5), 'delta': np.float32(0.5), 't1': np.float32(1.)},
+                  np.arange(20, dtype=np.float32))
+    assert tr.window(0., 1.).tolist() == [0, 1, 2]
+    # relative to a pick, and a view of the data rather than a copy
+    window = tr.window(-0.5, 0.5, reference='t1')
+    assert window.tolist() == [11, 12, 13] and np.shares_memory(window, tr.data)
+    assert tr.window(3., 10., reference='t1').tolist() == [18, 19]
+    assert tr.window(20., 30.).size == 0
+    with pytest.raises(ValueError):
+        tr.window(0., 1., reference='kstnm')
@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pytest
+
+from SacPy import SACCatalog, SACTrace, write
+from SacPy.io.core import SacFileError
+
+
+def write_station(folder, station: str, gcarc: float, npts: int = 10, byteorder: str = '<'):
+    header = {'delta': 0.5, 'b': 0., 'knetwk': 'XX', 'kstnm': station, 'kcmpnm': 'BHZ', 'gcarc': gcarc}
+    file = folder / "XX.{0}..BHZ.SAC".format(station)
+    write(SACTrace(header, np.zeros(npts, dtype=np.float32)), file, byteorder)
+    return file
+
+
+@pytest.fixture
+def folder(tmp_path):
+    for i, gcarc in enumerate([30., 60., 45., 90.]):
+        write_station(tmp_path, "S{0}".format(i), gcarc, byteorder='<>'[i % 2])
+    return tmp_path
+
+
+def test_catalog_reads_headers(folder):
+    catalog = SACCatalog(folder)
+    assert len(catalog) == 4 and (folder / ".sacpy-catalog.npz").exists()
+    assert list(catalog.names) == ["XX.S{0}..BHZ.SAC".format(i) for i in range(4)]
+    assert catalog["gcarc"].tolist() == [30., 60., 45., 90.]
+    assert catalog.get("XX.S1..BHZ.SAC", "station", "gcarc") == ["S1", 60.]
+    with pytest.raises(KeyError):
+        catalog.get("XX.S9..BHZ.SAC", "gcarc")
+
+
+def test_catalog_refresh(folder):
+    assert SACCatalog(folder).update() == 0
+    # a new size, a new mtime with the same size, a new file and a removed one
+    write_station(folder, "S0", 35., npts=20)
+    write_station(folder, "S1", 65.)
+    stat = os.stat(folder / "XX.S1..BHZ.SAC")
+    os.utime(folder / "XX.S1..BHZ.SAC", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    write_station(folder, "S4", 120.)
+    os.remove(folder / "XX.S3..BHZ.SAC")
+
+    catalog = SACCatalog(folder, update=False)
+    assert catalog["gcarc"].tolist() == [30., 60., 45., 90.]
+    assert catalog.update() == 3
+    assert list(catalog.names) == ["XX.S{0}..BHZ.SAC".format(i) for i in (0, 1, 2, 4)]
+    assert catalog["gcarc"].tolist() == [35., 65., 45., 120.]
+    assert SACCatalog(folder).update() == 0
+
+
+def test_catalog_pattern_has_own_index(folder):
+    catalog = SACCatalog(folder, "XX.S[01]*")
+    assert len(catalog) == 2
+    assert len(SACCatalog(folder)) == 4
+    assert len(SACCatalog(folder, "XX.S[01]*")) == 2
+
+
+def test_catalog_rejects_bad_file(folder):
+    (folder / "bad.SAC").write_bytes(b"\0" * 10)
+    with pytest.raises(SacFileError):
+        SACCatalog(folder)
+
+
+def test_between(folder):
+    write_station(folder, "S4", 60.)
+    catalog = SACCatalog(folder)
+    # inclusive on both ends, rows in file order
+    assert catalog.between("gcarc", 45., 60.).tolist() == [1, 2, 4]
+    assert catalog.between("gcarc", 61., 89.).tolist() == []
+    assert catalog.between("gcarc", 0., 180.).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_between_skips_unset(folder):
+    write(SACTrace({'delta': 0.5, 'b': 0., 'kstnm': 'S4'}, np.zeros(10, dtype=np.float32)), folder / "XX.S4.SAC")
+    catalog = SACCatalog(folder)
+    assert catalog.get("XX.S4.SAC", "gcarc") is None
+    assert catalog.between("gcarc", 0., 180.).tolist() == [0, 1, 2, 3]
+
+
+def test_query(folder):
+    catalog = SACCatalog(folder)
+    assert catalog.query(gcarc=(40., 95.)).tolist() == [1, 2, 3]
+    assert catalog.query(gcarc=(40., 95.), station="S[12]").tolist() == [1, 2]
+    assert catalog.query(gcarc=(40., 95.), npts=(0, 100)).tolist() == [1, 2, 3]
+    assert catalog.query("*S3*", gcarc=(40., 95.)).tolist() == [3]
+    assert catalog.query(channel="BHZ", gcarc=60.).tolist() == [1]
+    assert catalog.query().tolist() == [0, 1, 2, 3]
+    assert catalog.select(gcarc=(0., 40.)) == [folder / "XX.S0..BHZ.SAC"]
+
+
+def test_query_after_update(folder):
+    catalog = SACCatalog(folder)
+    assert catalog.query(gcarc=(40., 50.)).tolist() == [2]
+    write_station(folder, "S2", 75.)
+    catalog.update()
+    assert catalog.query(gcarc=(40., 50.)).tolist() == []
+    assert catalog.query(gcarc=(70., 80.)).tolist() == [2]
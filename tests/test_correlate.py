@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from SacPy.signal import cut_windows, correlate_windows
+
+
+def pulse(npts: int, center: float, width: float = 5.) -> np.ndarray:
+    return np.exp(-0.5 * ((np.arange(npts) - center) / width) ** 2)
+
+
+@pytest.mark.parametrize("lag", [-12, 0, 7])
+def test_known_lag(lag):
+    reference = pulse(100, 50.)
+    shift, cc = correlate_windows(reference, np.stack([pulse(100, 50. + lag), -pulse(100, 50. + lag)]),
+                                  subsample=False)
+    assert shift[0] == lag and cc[0] == pytest.approx(1.)
+    # a flipped window matches best where it overlaps least, never with cc near 1
+    assert cc[1] < 0.1
+
+
+def test_reference_shorter_than_windows():
+    shift, cc = correlate_windows(pulse(40, 20.), pulse(120, 65.)[None, :], subsample=False)
+    assert shift[0] == 45 and cc[0] == pytest.approx(1.)
+
+
+@pytest.mark.parametrize("lag", [2.3, -4.6])
+def test_subsample_lag(lag):
+    shift, cc = correlate_windows(pulse(100, 50.), pulse(100, 50. + lag)[None, :])
+    assert shift[0] == pytest.approx(lag, abs=0.05) and cc[0] == pytest.approx(1., abs=1e-3)
+    shift, _ = correlate_windows(pulse(100, 50.), pulse(100, 50. + lag)[None, :], subsample=False)
+    assert shift[0] == round(lag)
+
+
+def test_max_lag():
+    reference = pulse(100, 50.)
+    window = pulse(100, 80.) + 0.5 * pulse(100, 45.)
+    assert correlate_windows(reference, window[None, :], subsample=False)[0][0] == 30
+    assert correlate_windows(reference, window[None, :], max_lag=10, subsample=False)[0][0] == -5
+
+
+def test_zero_window():
+    shift, cc = correlate_windows(pulse(100, 50.), np.zeros((2, 100)))
+    assert np.all(cc == 0.) and np.all(np.isfinite(shift))
+
+
+def test_cut_windows():
+    data = [np.arange(10.), np.arange(10.), np.arange(10.)]
+    # begin on a sample, between samples (rounds up), and starting before the trace
+    windows = cut_windows(data, [0., 0., 1.], 0.5, [1., 1.2, 0.], 4)
+    assert windows.tolist() == [[2, 3, 4, 5], [3, 4, 5, 6], [0, 0, 0, 1]]
+
+
+def test_cut_windows_out_of_range():
+    windows = cut_windows([np.arange(10.), np.arange(10.)], 0., 1., [8., 20.], 4)
+    assert windows.tolist() == [[8, 9, 0, 0], [0, 0, 0, 0]]
+
+
+def test_cut_windows_unset_begin():
+    # an unset pick (nan) gives a zero window
+    windows = cut_windows([np.ones(10)], 0., 1., [np.nan], 4)
+    assert windows.tolist() == [[0, 0, 0, 0]]
@@ -0,0 +1,35 @@
+import numpy as np
+
+from SacPy import read, write, SACDataset, SACStream, SACTrace
+
+
+def make_files(folder, count: int = 3) -> list:
+    files = []
+    for i in range(count):
+        header = {'delta': 0.05, 'b': 0., 'knetwk': 'IU', 'kstnm': 'S{0:02d}'.format(i), 'kcmpnm': 'BHZ'}
+        if i == 0:
+            header['khole'] = '00'
+        files.append(folder / "{0}.SAC".format(i))
+        write(SACTrace(header, np.arange(100 + i, dtype=np.float32)), files[-1])
+    return files
+
+
+def test_ids_match_trace_ids(tmp_path):
+    files = make_files(tmp_path)
+    traces = [read(f) for f in files]
+    assert [tr.id for tr in traces] == ["IU.S00.00.BHZ", "IU.S01..BHZ", "IU.S02..BHZ"]
+    assert SACStream.read(files).ids == [tr.id for tr in traces]
+
+    ds = SACDataset.pack(files, tmp_path / "event.sacds")
+    assert ds.ids == [tr.id for tr in traces]
+    for tr in traces:
+        assert np.array_equal(ds.trace(tr.id).data, tr.data)
+
+
+def test_pack_unpack_round_trip(tmp_path):
+    files = make_files(tmp_path)
+    (tmp_path / "out").mkdir()
+    for compression in (None, 'zlib'):
+        ds = SACDataset.pack(files, tmp_path / "event.sacds", compression=compression, chunk_size=256)
+        for source, copy in zip(files, ds.unpack(tmp_path / "out")):
+            assert copy.read_bytes() == source.read_bytes()
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from SacPy import read
+from SacPy.signal import bandpass, filter_traces
+
+DATA = Path(__file__).resolve().parent / "data"
+# sac filters in single precision and SacPy in double, they part by a few float32 steps of the peak
+TOLERANCE = 5e-5
+
+
+def test_bandpass_matches_reference():
+    # bp_c_0.1_1_n2_p2.SAC is `bp c 0.1 1 n 2 p 2` of bp_input.SAC, see data/make_bp_reference.py
+    tr = read(DATA / "bp_input.SAC")
+    reference = read(DATA / "bp_c_0.1_1_n2_p2.SAC").data
+    data = bandpass(tr.data, tr.header.delta, 0.1, 1., poles=2, passes=2)
+    assert np.abs(data - reference).max() <= TOLERANCE * np.abs(reference).max()
+
+
+def test_bandpass_one_pass_is_not_the_reference():
+    tr = read(DATA / "bp_input.SAC")
+    reference = read(DATA / "bp_c_0.1_1_n2_p2.SAC").data
+    data = bandpass(tr.data, tr.header.delta, 0.1, 1., poles=2, passes=1)
+    assert np.abs(data - reference).max() > 100 * TOLERANCE * np.abs(reference).max()
+
+
+def test_filter_traces_matches_bandpass():
+    traces = [read(DATA / "bp_input.SAC"), read(DATA / "bp_input.SAC")]
+    traces[1].data = traces[1].data[::-1].copy()
+    expected = [bandpass(tr.data, tr.header.delta, 0.1, 1., passes=2) for tr in traces]
+    for tr, data in zip(filter_traces(traces, (0.1, 1.), passes=2), expected):
+        assert np.array_equal(tr.data, data)
+
+
+def test_passes_must_be_one_or_two():
+    with pytest.raises(ValueError):
+        bandpass(np.zeros(10, dtype=np.float32), 0.05, 0.1, 1., passes=3)
@@ -0,0 +1,55 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from SacPy import read, write, SACTrace
+from SacPy.io.header import SACHeader
+
+
+def make_trace(file, byteorder: str) -> None:
+    header = {'delta': 0.025, 'b': -10.5, 'kstnm': 'SCM', 'kt1': 'sP', 't1': 100., 'nzyear': 2019}
+    write(SACTrace(header, np.arange(100, dtype=np.float32)), file, byteorder)
+
+
+@pytest.mark.parametrize("byteorder", ['<', '>'])
+def test_values_are_plain_python(tmp_path, byteorder):
+    make_trace(tmp_path / "a.SAC", byteorder)
+    header = read(tmp_path / "a.SAC").header
+    assert type(header.b) is float and header.b == -10.5
+    assert type(header.nzyear) is int and header.nzyear == 2019
+    assert header.delta == np.float32(0.025)
+    assert header.o is None and 'o' not in header
+    assert header.byteorder == byteorder
+
+
+@pytest.mark.parametrize("byteorder", ['<', '>'])
+def test_pickle_keeps_record(tmp_path, byteorder):
+    make_trace(tmp_path / "a.SAC", byteorder)
+    header = read(tmp_path / "a.SAC").header
+    header.o = 0.
+    header['station_note'] = 'x'
+    copy = pickle.loads(pickle.dumps(header))
+    assert copy.byteorder == byteorder
+    assert copy.tobytes(byteorder) == header.tobytes(byteorder)
+    assert copy.dirty == {'o', 'station_note'}
+    assert copy.station_note == 'x'
+
+
+@pytest.mark.parametrize("byteorder", ['<', '>'])
+def test_pickled_trace_writes_header(tmp_path, byteorder):
+    make_trace(tmp_path / "a.SAC", byteorder)
+    tr = read(tmp_path / "a.SAC")
+    tr.header.o = 1.5
+    assert pickle.loads(pickle.dumps(tr)).write_header() == 1
+    tr = read(tmp_path / "a.SAC")
+    assert tr._byteorder == byteorder
+    assert tr.header.o == 1.5
+
+
+def test_byte_orders_agree():
+    header = SACHeader({'b': -10.5, 'npts': 100, 'kstnm': 'SCM'}, byteorder='>')
+    other = SACHeader(header.record)
+    assert dict(other) == dict(header)
+    assert header.tobytes('>') == SACHeader(dict(header), byteorder='>').tobytes('>')
+    assert header.tobytes('<') == SACHeader(dict(header)).tobytes('<')
@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+from SacPy.util.manifest import MANIFEST, Manifest, pending, record, recorded
+
+PARAMS = {"frequency": [0.02, 0.2]}
+
+
+def touch(file, content: bytes = b"data"):
+    file.write_bytes(content)
+    # a new mtime even on file systems with a coarse clock
+    stat = os.stat(file)
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    return file
+
+
+def process(folder, name: str, stage: str = "filter", params=PARAMS):
+    file = folder / name
+    before = [file.stat().st_size, file.stat().st_mtime_ns]
+    touch(file, file.read_bytes() + b"+")
+    record(folder, file, stage, params, before=before)
+
+
+def test_done_after_record(tmp_path):
+    touch(tmp_path / "a.SAC")
+    touch(tmp_path / "b.SAC")
+    process(tmp_path, "a.SAC")
+    manifest = Manifest(tmp_path)
+    assert manifest.done("a.SAC", "filter", PARAMS)
+    assert not manifest.done("b.SAC", "filter", PARAMS)
+    assert pending(tmp_path, ["a.SAC", "b.SAC"], "filter", PARAMS) == ["b.SAC"]
+
+
+def test_params_mismatch_redoes(tmp_path):
+    touch(tmp_path / "a.SAC")
+    process(tmp_path, "a.SAC")
+    assert pending(tmp_path, ["a.SAC"], "filter", {"frequency": [0.02, 0.5]}) == ["a.SAC"]
+    assert pending(tmp_path, ["a.SAC"], "transfer", PARAMS) == ["a.SAC"]
+
+
+def test_fingerprint_mismatch_redoes(tmp_path):
+    touch(tmp_path / "a.SAC")
+    process(tmp_path, "a.SAC")
+    touch(tmp_path / "a.SAC", b"changed outside the stages")
+    assert pending(tmp_path, ["a.SAC"], "filter", PARAMS) == ["a.SAC"]
+    os.remove(tmp_path / "a.SAC")
+    assert not Manifest(tmp_path).done("a.SAC", "filter", PARAMS)
+
+
+def test_stages_chain(tmp_path):
+    touch(tmp_path / "a.SAC")
+    process(tmp_path, "a.SAC", "transfer")
+    process(tmp_path, "a.SAC", "filter")
+    manifest = Manifest(tmp_path)
+    assert manifest.done("a.SAC", "transfer", PARAMS) and manifest.done("a.SAC", "filter", PARAMS)
+
+
+def test_file_rewritten_from_scratch_forgets_stages(tmp_path):
+    touch(tmp_path / "a.SAC")
+    process(tmp_path, "a.SAC", "transfer")
+    # before=None: a new file, e.g. merged again, none of the earlier stages apply to it
+    touch(tmp_path / "a.SAC", b"merged")
+    record(tmp_path, tmp_path / "a.SAC", "merge", {})
+    manifest = Manifest(tmp_path)
+    assert manifest.done("a.SAC", "merge", {}) and not manifest.done("a.SAC", "transfer", PARAMS)
+
+
+def test_group_done(tmp_path):
+    inputs = [touch(tmp_path / "1.a.SAC"), touch(tmp_path / "2.a.SAC")]
+    touch(tmp_path / "a.SAC")
+    record(tmp_path, tmp_path / "a.SAC", "merge", {}, group="a.SAC", inputs=inputs)
+    assert Manifest(tmp_path).group_done("a.SAC", "merge", {}, inputs)
+    assert not Manifest(tmp_path).group_done("b.SAC", "merge", {}, inputs)
+    assert not Manifest(tmp_path).group_done("a.SAC", "merge", {}, inputs[:1])
+    touch(inputs[1], b"new segment")
+    assert not Manifest(tmp_path).group_done("a.SAC", "merge", {}, inputs)
+
+
+def test_truncated_line_is_skipped(tmp_path):
+    touch(tmp_path / "a.SAC")
+    touch(tmp_path / "b.SAC")
+    process(tmp_path, "a.SAC")
+    process(tmp_path, "b.SAC")
+    text = (tmp_path / MANIFEST).read_text()
+    # a crash half way through the last line
+    (tmp_path / MANIFEST).write_text(text[:-20])
+    assert pending(tmp_path, ["a.SAC", "b.SAC"], "filter", PARAMS) == ["b.SAC"]
+    # compacted, the broken line is gone and a new one appends cleanly
+    process(tmp_path, "b.SAC")
+    assert pending(tmp_path, ["a.SAC", "b.SAC"], "filter", PARAMS) == []
+
+
+def test_compact_keeps_state(tmp_path):
+    touch(tmp_path / "a.SAC")
+    process(tmp_path, "a.SAC", "transfer")
+    process(tmp_path, "a.SAC", "filter")
+    assert len((tmp_path / MANIFEST).read_text().splitlines()) == 2
+    Manifest(tmp_path).compact()
+    assert len((tmp_path / MANIFEST).read_text().splitlines()) == 1
+    manifest = Manifest(tmp_path)
+    assert manifest.done("a.SAC", "transfer", PARAMS) and manifest.done("a.SAC", "filter", PARAMS)
+
+
+def test_recorded_records_rewritten_files(tmp_path):
+    files = [touch(tmp_path / "a.SAC"), touch(tmp_path / "b.SAC")]
+
+    def fail_half_way(batch):
+        touch(tmp_path / batch[0], b"filtered")
+        raise RuntimeError("b.SAC failed")
+
+    func = recorded(fail_half_way, tmp_path, "filter", PARAMS, True)
+    with pytest.raises(RuntimeError):
+        func(["a.SAC", "b.SAC"])
+    assert pending(tmp_path, files, "filter", PARAMS) == [files[1]]
+    assert recorded(fail_half_way, tmp_path, "filter", PARAMS, False) is fail_half_way
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from SacPy import read, write, SACTrace
+from SacPy.signal import merge_traces
+
+DELTA = 0.5
+
+
+def segment(start: int, values, nzsec: int = 0, **header) -> SACTrace:
+    # samples from sample `start` on, a segment of channel XX.STA..BHZ
+    values = np.asarray(values, dtype=np.float32)
+    header = dict({'delta': DELTA, 'b': start * DELTA, 'npts': values.size, 'knetwk': 'XX', 'kstnm': 'STA',
+                   'kcmpnm': 'BHZ', 'nzyear': 2019, 'nzjday': 194, 'nzhour': 0, 'nzmin': 0, 'nzsec': nzsec,
+                   'nzmsec': 0}, **header)
+    return SACTrace(header, values)
+
+
+def test_gap_zero():
+    tr, = merge_traces([segment(0, [1, 2, 3]), segment(5, [6, 7])])
+    assert list(tr.data) == [1, 2, 3, 0, 0, 6, 7]
+    assert tr.header.npts == 7 and tr.header.b == 0. and tr.header.e == pytest.approx(6 * DELTA)
+
+
+def test_gap_interpolate():
+    tr, = merge_traces([segment(0, [1, 2, 3]), segment(5, [6, 7])], gap='interpolate')
+    assert list(tr.data) == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_gap_mask():
+    tr, = merge_traces([segment(0, [1, 2, 3]), segment(5, [6, 7])], gap='mask')
+    assert list(tr.data.mask) == [False, False, False, True, True, False, False]
+    assert tr.data.sum() == 19
+
+
+def test_segments_in_any_order():
+    tr, = merge_traces([segment(3, [4, 5]), segment(0, [1, 2, 3])])
+    assert list(tr.data) == [1, 2, 3, 4, 5] and tr.header.b == 0.
+
+
+@pytest.mark.parametrize("overlap, expected", [('first', [1, 2, 3, 4, 50, 60]), ('last', [1, 2, 30, 40, 50, 60])])
+def test_overlap(overlap, expected):
+    tr, = merge_traces([segment(0, [1, 2, 3, 4]), segment(2, [30, 40, 50, 60])], overlap=overlap)
+    assert list(tr.data) == expected
+
+
+def test_reference_times_differ():
+    # the second segment has its own reference time, 2 s (4 samples) later
+    tr, = merge_traces([segment(0, [1, 2, 3, 4]), segment(0, [5, 6], nzsec=2)])
+    assert list(tr.data) == [1, 2, 3, 4, 5, 6]
+
+
+def test_channels_merged_apart():
+    traces = merge_traces([segment(0, [1, 2]), segment(0, [9, 9], kstnm='OTHER'), segment(2, [3])])
+    assert [tr.id for tr in traces] == ['XX.OTHER..BHZ', 'XX.STA..BHZ']
+    assert list(traces[1].data) == [1, 2, 3]
+
+
+def test_mixed_byte_order(tmp_path):
+    write(segment(0, [1, 2, 3]), tmp_path / "a.SAC", '>')
+    write(segment(3, [4, 5]), tmp_path / "b.SAC", '<')
+    tr, = merge_traces([read(tmp_path / "a.SAC"), read(tmp_path / "b.SAC")])
+    assert list(tr.data) == [1, 2, 3, 4, 5] and tr.data.dtype == np.float32
+    write(tr, tmp_path / "merged.SAC")
+    assert list(read(tmp_path / "merged.SAC").data) == [1, 2, 3, 4, 5]
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        merge_traces([segment(0, [1]), segment(1, [2], delta=0.25)])
+    with pytest.raises(ValueError):
+        merge_traces([segment(0, [1])], gap='drop')
+    with pytest.raises(ValueError):
+        merge_traces([segment(0, [1])], overlap='mean')
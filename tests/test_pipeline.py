@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from SacPy import SACCatalog, SACTrace, read, write
+from SacPy.util.pipeline import Pipeline
+
+
+def write_channel(folder, station: str, channel: str, delta: float, name: str = None, npts: int = 200):
+    header = {'delta': delta, 'b': 0., 'knetwk': 'XX', 'kstnm': station, 'kcmpnm': channel, 'baz': 30.,
+              'cmpaz': {'BHN': 0., 'BHE': 90.}.get(channel, 0.), 'cmpinc': 0. if channel[-1] == 'Z' else 90.}
+    data = np.sin(np.arange(npts) * delta).astype(np.float32)
+    write(SACTrace(header, data), folder / (name or "XX.{0}..{1}.SAC".format(station, channel)))
+
+
+@pytest.fixture
+def folder(tmp_path):
+    # two complete stations at 0.05, one at 0.025 and a crowd of LHZ channels at 1 s
+    for station, delta in (("A", 0.05), ("B", 0.05), ("C", 0.025)):
+        for channel in ("BHZ", "BHN", "BHE"):
+            write_channel(tmp_path, station, channel, delta)
+    for i in range(10):
+        write_channel(tmp_path, "L{0}".format(i), "LHZ", 1.)
+    # segments count once, as the one trace merge makes of them
+    for i in range(5):
+        write_channel(tmp_path, "C", "BHZ", 0.025, name="{0}.XX.C..BHZ.SAC".format(i))
+    return tmp_path
+
+
+def test_default_delta_after_rotate(folder):
+    catalog = SACCatalog(folder)
+    assert Pipeline([("rotate", {}), ("resample", {})]).default_delta(catalog) == 0.05
+    # without rotate every channel reaches the stage
+    assert Pipeline([("filter", {"frequency": [0.02, 0.2]}), ("resample", {})]).default_delta(catalog) == 1.
+
+
+def test_default_delta_after_resample_only_counts_earlier_stages(folder):
+    assert Pipeline([("resample", {}), ("rotate", {})]).default_delta(SACCatalog(folder)) == 1.
+
+
+def test_run_resolves_delta(tmp_path):
+    sac_folder, output_folder = tmp_path / "SAC", tmp_path / "SAC-N"
+    sac_folder.mkdir()
+    for station, delta in (("A", 0.05), ("B", 0.05), ("C", 0.025)):
+        for channel in ("BHZ", "BHN", "BHE"):
+            write_channel(sac_folder, station, channel, delta)
+    for i in range(10):
+        write_channel(sac_folder, "L{0}".format(i), "LHZ", 1.)
+
+    pipeline = Pipeline([("rotate", {}), ("resample", {"delta": None})])
+    report = pipeline.run(sac_folder, output_folder, resume=True)
+    assert len(report.errors) == 10
+    assert {np.float32(read(file).header.delta) for file in output_folder.glob("*.SAC")} == {np.float32(0.05)}
+    assert len(list(output_folder.glob("*.SAC"))) == 9
+    # the pipeline itself keeps delta None, a rerun finds the stations done under the resolved delta
+    assert pipeline.stages[1][1]["delta"] is None
+    assert len(pipeline.run(sac_folder, output_folder, resume=True).items) == 10
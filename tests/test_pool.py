@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from SacPy.cmd import pool as pool_module
+from SacPy.cmd.pool import SACBatchError, SACBatchResult, SACShellPool
+
+
+class FakeSession:
+    # a sac session stand-in: "crash" kills it mid-batch, fail_next makes starting a new one fail
+    fail_next = 0
+    started = 0
+
+    def __init__(self, cwd_folder=None, *, show_log=False, timeout=None):
+        if FakeSession.fail_next > 0:
+            FakeSession.fail_next -= 1
+            raise OSError("sac did not start")
+        FakeSession.started += 1
+        self.cwd_folder = cwd_folder
+        self.alive = True
+        self.batches = 0
+
+    def run(self, commands):
+        commands = list(commands)
+        if not self.alive:
+            raise AssertionError("batch sent to a dead session")
+        if "crash" in commands:
+            self.alive = False
+            raise SACBatchError("sac session exited during the batch")
+        self.batches += 1
+        return SACBatchResult(commands, "", "", 0.)
+
+    def close(self):
+        self.alive = False
+
+
+@pytest.fixture
+def fake_sessions(monkeypatch):
+    monkeypatch.setattr(pool_module, "_SACSession", FakeSession)
+    FakeSession.fail_next, FakeSession.started = 0, 0
+
+
+def test_crashed_session_is_replaced(fake_sessions):
+    pool = SACShellPool("/tmp", size=2)
+    with pytest.raises(SACBatchError):
+        pool.run(["crash"])
+    assert FakeSession.started == 3 and pool.size == 2 and len(pool._all) == 2
+    assert all(result.ok for result in pool.map([["r a.SAC"]] * 10))
+
+
+def test_failed_replacement_shrinks_pool(fake_sessions):
+    pool = SACShellPool("/tmp", size=2)
+    FakeSession.fail_next = 1
+    with pytest.raises(SACBatchError):
+        pool.run(["crash"])
+    assert pool.size == 1 and len(pool._all) == 1
+    # the dead session was never put back: every later batch runs on the live one
+    assert all(result.ok for result in pool.map([["r a.SAC"]] * 10))
+    assert pool._all[0].batches == 10
+
+
+def test_empty_pool_raises_instead_of_hanging(fake_sessions):
+    pool = SACShellPool("/tmp", size=1)
+    FakeSession.fail_next = 1
+    with pytest.raises(SACBatchError):
+        pool.run(["crash"])
+    assert pool.size == 0
+    errors = []
+
+    def batch():
+        try:
+            pool.run(["r a.SAC"])
+        except SACBatchError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=batch) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert len(errors) == 3
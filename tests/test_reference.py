@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from SacPy import SACTrace
+from SacPy.io.reference import get_reference_time, set_event, synchronize
+from SacPy.util.geodetics import distaz
+
+REFERENCE = {'nzyear': 2019, 'nzjday': 194, 'nzhour': 0, 'nzmin': 0, 'nzsec': 0, 'nzmsec': 0}
+
+
+def make_header(**header):
+    header = dict(REFERENCE, delta=0.5, b=-10., e=89.5, npts=200, t1=30., stla=35., stlo=100., **header)
+    return SACTrace(header, np.zeros(200, dtype=np.float32)).header
+
+
+def test_set_event_origin_time():
+    header = make_header()
+    set_event(header, datetime(2019, 7, 13, 0, 0, 20, 250000), 30., 90., 10.)
+    # the reference moves to the origin, absolute times stay where they were
+    assert get_reference_time(header) == datetime(2019, 7, 13, 0, 0, 20, 250000)
+    assert header.o == 0. and header.iztype == 11
+    assert header.b == pytest.approx(-30.25) and header.t1 == pytest.approx(9.75)
+    assert (header.evla, header.evlo, header.evdp) == (30., 90., 10.)
+
+
+def test_set_event_distaz():
+    header = make_header()
+    set_event(header, datetime(2019, 7, 13), 30., 90., 10.)
+    dist, az, baz, gcarc = distaz(35., 100., 30., 90.)
+    assert header.dist == pytest.approx(dist, rel=1e-6) and header.az == pytest.approx(az, rel=1e-6)
+    assert header.baz == pytest.approx(baz, rel=1e-6) and header.gcarc == pytest.approx(gcarc, rel=1e-6)
+
+
+def test_set_event_lcalda_off():
+    header = make_header(lcalda=0)
+    set_event(header, datetime(2019, 7, 13), 30., 90., 10.)
+    assert header.gcarc is None and header.baz is None
+
+
+def test_synchronize():
+    first, second = make_header(), make_header(nzsec=2)
+    synchronize([first, second])
+    assert get_reference_time(first) == get_reference_time(second)
+    assert first.b == pytest.approx(-12.) and second.b == -10.
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from SacPy import SACTrace
+from SacPy.signal import resample, resample_traces
+from SacPy.signal.resample import get_npts, get_ratio
+
+
+def sine(freq: float, delta: float, npts: int) -> np.ndarray:
+    return np.sin(2 * np.pi * freq * np.arange(npts) * delta).astype(np.float32)
+
+
+def test_get_ratio():
+    assert get_ratio(0.025, 0.05) == (1, 2)
+    assert get_ratio(0.01, 0.025) == (2, 5)
+    assert get_ratio(0.05, 0.02) == (5, 2)
+    assert get_ratio(float(np.float32(0.025)), 0.05) == (1, 2)
+    assert get_ratio(0.01, 0.01 * 2 ** 0.5) is None
+
+
+def test_get_npts():
+    assert get_npts(1001, 0.01, 0.05) == 201
+    assert get_npts(1000, 0.01, 0.05) == 200
+    assert get_npts(201, 0.05, 0.01) == 1001
+    assert get_npts(2001, float(np.float32(0.01)), 0.05) == 401
+
+
+@pytest.mark.parametrize("delta, new_delta", [(0.01, 0.05), (0.025, 0.05), (0.05, 0.025)])
+def test_resample_poly_path(delta, new_delta):
+    npts = 4001
+    data = resample(sine(0.2, delta, npts), delta, new_delta)
+    expected = sine(0.2, new_delta, get_npts(npts, delta, new_delta))
+    assert data.dtype == np.float32 and data.size == expected.size
+    inner = slice(data.size // 10, -data.size // 10)
+    assert np.abs(data[inner] - expected[inner]).max() < 1e-2
+
+
+@pytest.mark.parametrize("delta, new_delta", [(0.01, 0.0371234), (0.05, 0.0137)])
+def test_resample_akima_path(delta, new_delta):
+    assert get_ratio(delta, new_delta) is None
+    npts = 4001
+    data = resample(sine(0.2, delta, npts), delta, new_delta)
+    expected = sine(0.2, new_delta, get_npts(npts, delta, new_delta))
+    assert data.size == expected.size
+    inner = slice(data.size // 10, -data.size // 10)
+    assert np.abs(data[inner] - expected[inner]).max() < 2e-2
+
+
+@pytest.mark.parametrize("new_delta, freq", [(0.05, 15.), (0.0371234, 40.)])
+def test_resample_removes_aliases(new_delta, freq):
+    # above the new Nyquist frequency: it must not fold back into the band; the interpolating
+    # path has only sac's two-pole `lp c 0.5/new_delta` against it, so it is tested further out
+    delta, npts = 0.01, 6001
+    data = resample(sine(freq, delta, npts), delta, new_delta)
+    inner = slice(data.size // 10, -data.size // 10)
+    assert np.abs(data[inner]).max() < 0.05
+
+
+def test_resample_batch_matches_rows():
+    rows = np.stack([sine(0.2, 0.01, 2001), sine(0.5, 0.01, 2001)])
+    batch = resample(rows, 0.01, 0.05)
+    for row, data in zip(rows, batch):
+        assert np.array_equal(resample(row, 0.01, 0.05), data)
+
+
+def test_resample_traces_headers():
+    traces = [SACTrace({'delta': 0.01, 'b': -5., 'npts': 2001}, sine(0.2, 0.01, 2001)),
+              SACTrace({'delta': 0.05, 'b': -5., 'npts': 401}, sine(0.2, 0.05, 401))]
+    unchanged = traces[1].data
+    resample_traces(traces, 0.05)
+    tr = traces[0]
+    assert tr.data.size == tr.header.npts == 401
+    assert tr.header.delta == np.float32(0.05)
+    assert tr.header.e == np.float32(-5.) + 400 * np.float32(0.05)
+    assert tr.header.depmax == tr.data.max()
+    assert traces[1].data is unchanged
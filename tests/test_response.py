@@ -0,0 +1,35 @@
+import gzip
+from pathlib import Path
+
+import numpy as np
+
+from SacPy.signal import demean, detrend, read_pz, remove_response, taper
+
+DATA = Path(__file__).resolve().parent / "data"
+# rms of the difference to sac's output, relative to its rms; measured 1.2e-4, mostly sac's single precision
+TOLERANCE = 1e-3
+
+
+def load(name: str) -> np.ndarray:
+    with gzip.open(DATA / name) as f:
+        return np.loadtxt(f, dtype=np.float32)
+
+
+def test_remove_response_matches_sac_transfer():
+    # KARC.LHZ.SAC.asc.gz, SAC_PZs_KARC_BHZ and sac's output KARC_corrected.sac.asc.gz come from ObsPy's test data
+    # (obspy/signal/tests/data, LGPL), written by
+    #     r KARC.LHZ.SAC; rmean; rtrend; taper type cosine width 0.03
+    #     transfer from polezero subtype SAC_PZs_KARC_BHZ to none freqlimits f1 f2 f3 f4
+    plow, phigh = 160., 4.
+    freqlimits = (1. / (plow + 0.0625 * plow), 1. / plow, 1. / phigh, 1. / (phigh - 0.25 * phigh))
+    data = taper(detrend(demean(load("KARC.LHZ.SAC.asc.gz"))), 0.03, 'cosine')
+    data = remove_response(data, 0.99999988079072466, DATA / "SAC_PZs_KARC_BHZ", freqlimits)
+    reference = load("KARC_corrected.sac.asc.gz")
+    assert np.sqrt(((data - reference) ** 2).sum() / (reference ** 2).sum()) < TOLERANCE
+
+
+def test_read_pz():
+    zeros_, poles, constant = read_pz(DATA / "SAC_PZs_KARC_BHZ")
+    assert zeros_ == (-999.026 + 0j, 0j, 0j, 0j)
+    assert len(poles) == 6 and poles[0] == complex(-0.148, 0.148)
+    assert constant == 4.540182e+20
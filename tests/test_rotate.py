@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from SacPy import SACTrace
+from SacPy.signal.rotate import check_triplet, get_window, rotate_ne_rt, rotate_stations, rotate_to_gcp, \
+    rotate_zne_lqt
+
+
+def unit(cmpaz: float, cmpinc: float) -> np.ndarray:
+    # (up, north, east) of a component from its sac orientation, cmpinc measured down from up
+    az, inc = np.radians(cmpaz), np.radians(cmpinc)
+    return np.array([np.cos(inc), np.sin(inc) * np.cos(az), np.sin(inc) * np.sin(az)])
+
+
+def make_triplet(motion: np.ndarray, baz: float, b=(0., 0., 0.), cmpaz=(0., 90.), delta: float = 0.05):
+    # Z, N, E records of a particle motion (3, npts) given as (up, north, east)
+    headers = [{'kcmpnm': 'BHZ', 'cmpaz': 0., 'cmpinc': 0.},
+               {'kcmpnm': 'BHN', 'cmpaz': cmpaz[0], 'cmpinc': 90.},
+               {'kcmpnm': 'BHE', 'cmpaz': cmpaz[1], 'cmpinc': 90.}]
+    traces = []
+    for header, begin in zip(headers, b):
+        header.update({'delta': delta, 'b': begin, 'baz': baz, 'knetwk': 'XX', 'kstnm': 'STA'})
+        data = unit(header['cmpaz'], header['cmpinc']) @ motion
+        traces.append(SACTrace(header, data.astype(np.float32)))
+    return tuple(traces)
+
+
+def random_motion(npts: int = 400, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((3, npts))
+
+
+def assert_oriented(traces, motion: np.ndarray):
+    # every output is the motion seen through its own cmpaz and cmpinc
+    for tr in traces:
+        expected = unit(tr.header.cmpaz, tr.header.cmpinc) @ motion
+        assert np.allclose(tr.data, expected, atol=2e-5), tr.header.kcmpnm
+
+
+@pytest.mark.parametrize("baz", [0., 37.5, 90., 200., 315.])
+def test_rotate_ne_rt(baz):
+    motion = random_motion()
+    r, t = rotate_ne_rt(motion[1][None], motion[2][None], baz)
+    raz = (baz + 180.) % 360.
+    assert np.allclose(r[0], unit(raz, 90.) @ motion)
+    assert np.allclose(t[0], unit(raz + 90., 90.) @ motion)
+
+
+def test_rotate_to_gcp_any_horizontals():
+    motion, baz = random_motion(), 123.
+    c1, c2 = unit(30., 90.) @ motion, unit(120., 90.) @ motion
+    r, t = rotate_to_gcp(c1[None], c2[None], 30., 120., baz)
+    r_ne, t_ne = rotate_ne_rt(motion[1][None], motion[2][None], baz)
+    assert np.allclose(r, r_ne) and np.allclose(t, t_ne)
+
+
+def test_rotate_zne_lqt_along_ray():
+    # a P wave arriving from baz at incidence inc shakes only L
+    baz, inc = 60., 25.
+    pulse = np.sin(np.linspace(0, 6, 200))
+    motion = unit((baz + 180.) % 360., inc)[:, None] * pulse
+    l_, q, t = rotate_zne_lqt(motion[0][None], motion[1][None], motion[2][None], baz, inc)
+    assert np.allclose(l_[0], pulse) and np.allclose(q, 0.) and np.allclose(t, 0.)
+
+
+@pytest.mark.parametrize("cmpaz", [(0., 90.), (20., 110.)])
+def test_rotate_stations_zrt_headers(cmpaz):
+    motion = random_motion()
+    (z, r, t), = rotate_stations([make_triplet(motion, 210., cmpaz=cmpaz)])
+    assert (z.header.kcmpnm, r.header.kcmpnm, t.header.kcmpnm) == ('BHZ', 'BHR', 'BHT')
+    assert_oriented((z, r, t), motion)
+
+
+def test_rotate_stations_lqt_headers():
+    motions = [random_motion(seed=1), random_motion(seed=2)]
+    triplets = [make_triplet(motions[0], 210.), make_triplet(motions[1], 45.)]
+    results = rotate_stations(triplets, inc=[20., 35.])
+    for (l_, q, t), motion, inc in zip(results, motions, (20., 35.)):
+        assert (l_.header.kcmpnm, q.header.kcmpnm, t.header.kcmpnm) == ('BHL', 'BHQ', 'BHT')
+        assert l_.header.cmpinc == pytest.approx(inc) and q.header.cmpinc == pytest.approx(90. - inc)
+        assert_oriented((l_, q, t), motion)
+
+
+def test_rotate_stations_common_window():
+    # N starts 5 samples late and E ends 3 samples early: every output is cut to the overlap
+    motion = random_motion(npts=400)
+    z, n, e = make_triplet(motion, 100., b=(0., 0.25, 0.))
+    n.data = n.data[:-5]
+    e.data = e.data[:-3]
+    start, size = get_window((z, n, e))
+    assert list(start) == [5, 0, 5] and size == 392
+    for tr in rotate_stations([(z, n, e)])[0]:
+        assert tr.header.b == pytest.approx(0.25) and tr.header.npts == tr.data.size == 392
+        assert tr.header.e == pytest.approx(0.25 + 391 * 0.05)
+
+
+def test_get_window_stays_inside_traces():
+    # start and size are rounded apart; a trace half a sample late must not be read past its end
+    delta, npts = 0.05, 72000
+    traces = [SACTrace({'delta': delta, 'b': b}, np.zeros(npts, dtype=np.float32))
+              for b in (-0.05, -0.05 + delta / 2, -0.05)]
+    start, size = get_window(tuple(traces))
+    assert (start + size <= npts).all()
+
+
+def test_get_window_requested_and_empty():
+    traces = tuple(SACTrace({'delta': 0.1, 'b': b}, np.zeros(100, dtype=np.float32)) for b in (0., 2., 4.))
+    start, size = get_window(traces, 5., 8.)
+    assert list(start) == [50, 30, 10] and size == 31
+    far = SACTrace({'delta': 0.1, 'b': 100.}, np.zeros(100, dtype=np.float32))
+    with pytest.raises(ValueError):
+        get_window((traces[0], traces[1], far))
+
+
+def test_check_triplet():
+    z, n, e = make_triplet(random_motion(), 10.)
+    check_triplet(z, n, e)
+    e.header.cmpaz = 80.
+    with pytest.raises(ValueError):
+        check_triplet(z, n, e)
+    e.header.cmpaz = 90.
+    n.header.baz = None
+    with pytest.raises(ValueError):
+        check_triplet(z, n, e)
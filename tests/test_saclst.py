@@ -0,0 +1,17 @@
+import numpy as np
+
+from SacPy import write, SACTrace
+from SacPy.cmd import SACLst
+from SacPy.object import dict_
+
+
+def test_get_headers_plain_values(tmp_path):
+    header = {'delta': 0.025, 'b': -10.5, 'kstnm': 'SCM', 'kt1': 'sP', 't1': 100.1, 'nzyear': 2019}
+    write(SACTrace(header, np.arange(100, dtype=np.float32)), tmp_path / "a.SAC", '>')
+    headers = SACLst(tmp_path / "a.SAC").get_headers()
+    assert isinstance(headers, dict_)
+    assert headers.delta == 0.025 and type(headers.delta) is float
+    assert headers['t1'] == 100.1
+    assert headers.nzyear == 2019. and type(headers.nzyear) is float
+    assert headers.kstnm == 'SCM' and 'o' not in headers
+    assert SACLst(tmp_path / "a.SAC").get_header('delta', 'kt1') == [0.025, 'sP']
@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+
+from SacPy import read, write, SACTrace
+from SacPy.io.layout import HEADER_SIZE, HEADER_TEMPLATE
+
+
+def make_sac_file(file, byteorder: str, npts: int, seed: int = 0) -> bytes:
+    # a SAC file built without the writer, its dependent statistics as sac `w` leaves them
+    data = np.random.default_rng(seed).standard_normal(npts).astype(byteorder + 'f4')
+    record = HEADER_TEMPLATE[byteorder].copy()
+    record['delta'], record['b'] = 0.025, -10.5
+    record['e'] = np.float32(record['b'] + (npts - 1) * record['delta']) if npts > 0 else -12345
+    record['npts'], record['nvhdr'], record['iftype'], record['leven'] = npts, 6, 1, 1
+    record['nzyear'], record['nzjday'], record['nzhour'] = 2019, 194, 0
+    record['gcarc'], record['t1'] = 60.5, 100.
+    record['kstnm'], record['knetwk'], record['kcmpnm'] = b'SCM'.ljust(8), b'AK'.ljust(8), b'BHZ'.ljust(8)
+    record['kt1'] = b'sP'.ljust(8)
+    if npts > 0:
+        record['depmin'], record['depmax'], record['depmen'] = data.min(), data.max(), data.mean()
+    buffer = record.tobytes() + data.tobytes()
+    with open(file, 'wb') as f:
+        f.write(buffer)
+    return buffer
+
+
+@pytest.mark.parametrize("byteorder", ['<', '>'])
+@pytest.mark.parametrize("npts", [1000, 1, 0])
+def test_read_write_round_trip(tmp_path, byteorder, npts):
+    source = make_sac_file(tmp_path / "source.SAC", byteorder, npts)
+    write(read(tmp_path / "source.SAC"), tmp_path / "copy.SAC")
+    assert (tmp_path / "copy.SAC").read_bytes() == source
+
+
+@pytest.mark.parametrize("byteorder", ['<', '>'])
+def test_write_swaps_byte_order(tmp_path, byteorder):
+    other = '>' if byteorder == '<' else '<'
+    make_sac_file(tmp_path / "source.SAC", byteorder, 500)
+    expected = make_sac_file(tmp_path / "expected.SAC", other, 500)
+    write(read(tmp_path / "source.SAC"), tmp_path / "swapped.SAC", other)
+    assert (tmp_path / "swapped.SAC").read_bytes() == expected
+
+    tr = read(tmp_path / "swapped.SAC")
+    assert tr._byteorder == other
+    assert np.array_equal(tr.data, read(tmp_path / "source.SAC").data)
+
+
+@pytest.mark.parametrize("byteorder", ['<', '>'])
+def test_written_trace_reads_back(tmp_path, byteorder):
+    data = np.linspace(-1., 1., 101, dtype=np.float32)
+    trace = SACTrace({'delta': 0.01, 'b': 0., 'kstnm': 'SCM', 'kt1': 'sP', 't1': 0.5, 'nzyear': 2019}, data)
+    write(trace, tmp_path / "new.SAC", byteorder)
+
+    tr = read(tmp_path / "new.SAC")
+    assert tr._byteorder == byteorder
+    assert np.array_equal(tr.data, data)
+    assert tr.header.npts == 101
+    assert tr.header.e == pytest.approx(1.)
+    assert (tr.header.depmin, tr.header.depmax) == (-1., 1.)
+    assert (tr.header.kstnm, tr.header.kt1, tr.header.nzyear) == ('SCM', 'sP', 2019)
+    assert tr.header.o is None
+
+    write(tr, tmp_path / "again.SAC")
+    assert (tmp_path / "again.SAC").read_bytes() == (tmp_path / "new.SAC").read_bytes()
+
+
+def test_write_npts_zero(tmp_path):
+    write(SACTrace({'delta': 0.01, 'b': 0.}, np.array([], dtype=np.float32)), tmp_path / "empty.SAC")
+    assert (tmp_path / "empty.SAC").stat().st_size == HEADER_SIZE
+
+    tr = read(tmp_path / "empty.SAC")
+    assert tr.header.npts == 0
+    assert tr.data.size == 0
+    assert read(tmp_path / "empty.SAC", mmap=True).data.size == 0
+
+
+@pytest.mark.parametrize("byteorder", ['<', '>'])
+def test_overwrite_mmapped_source(tmp_path, byteorder):
+    file = tmp_path / "source.SAC"
+    make_sac_file(file, byteorder, 1000)
+    before = read(file).data.copy()
+
+    tr = read(file, mmap=True)
+    mapped = tr.data
+    tr.header['t2'] = 200.
+    tr.data = mapped * 2
+    tr.write()
+
+    # the old mapping still sees the old samples, the file has the new ones
+    assert np.array_equal(mapped, before)
+    new = read(file)
+    assert new.header.t2 == 200.
+    assert np.array_equal(new.data, (before * 2).astype(np.float32))
+    assert new._byteorder == byteorder
+    assert list(tmp_path.iterdir()) == [file]
+
+
+def test_write_rejects_byte_order(tmp_path):
+    with pytest.raises(ValueError):
+        write(SACTrace({'delta': 0.01}, np.zeros(3, dtype=np.float32)), tmp_path / "x.SAC", '=')
+
+
+def test_write_rejects_headonly_trace(tmp_path):
+    source = make_sac_file(tmp_path / "source.SAC", '<', 500)
+    tr = read(tmp_path / "source.SAC", headonly=True)
+    tr.header.o = 0.
+    with pytest.raises(ValueError):
+        tr.write()
+    with pytest.raises(ValueError):
+        write(tr, tmp_path / "copy.SAC")
+    assert (tmp_path / "source.SAC").read_bytes() == source
+    assert not (tmp_path / "copy.SAC").exists()
+
+    assert tr.write_header() == 1
+    assert read(tmp_path / "source.SAC").header.o == 0.
+    assert (tmp_path / "source.SAC").read_bytes()[HEADER_SIZE:] == source[HEADER_SIZE:]
+
+
+def test_write_headonly_trace_with_new_data(tmp_path):
+    make_sac_file(tmp_path / "source.SAC", '<', 500)
+    tr = read(tmp_path / "source.SAC", headonly=True)
+    tr.data = np.ones(10, dtype=np.float32)
+    tr.write()
+    assert read(tmp_path / "source.SAC").header.npts == 10
+
+
+@pytest.mark.parametrize("byteorder", ['<', '>'])
+def test_write_header_patches_dirty_words(tmp_path, byteorder):
+    source = make_sac_file(tmp_path / "source.SAC", byteorder, 500)
+    tr = read(tmp_path / "source.SAC")
+    tr.header.o, tr.header.a, tr.header.kevnm = 1.5, 2.5, 'EV'
+    # o and a are neighbours, kevnm is a run of its own
+    assert tr.write_header() == 2
+    assert tr.header.dirty == set()
+    patched = (tmp_path / "source.SAC").read_bytes()
+
+    fields = HEADER_TEMPLATE[byteorder].dtype.fields
+    changed = {i for i in range(len(source)) if patched[i] != source[i]}
+    words = set()
+    for key in ('o', 'a', 'kevnm'):
+        words.update(range(fields[key][1], fields[key][1] + fields[key][0].itemsize))
+    assert changed and changed <= words
+
+    header = read(tmp_path / "source.SAC").header
+    assert (header.o, header.a, header.kevnm) == (1.5, 2.5, 'EV')
+    assert tr.write_header() == 0
+
+
+def test_write_header_rejects_npts(tmp_path):
+    source = make_sac_file(tmp_path / "source.SAC", '<', 500)
+    tr = read(tmp_path / "source.SAC")
+    tr.header.npts = 10
+    with pytest.raises(ValueError):
+        tr.write_header()
+    assert (tmp_path / "source.SAC").read_bytes() == source